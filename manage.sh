@@ -14,7 +14,11 @@ function show_help {
     echo "  db-status   Check database container status"
     echo "  db-logs     View database container logs"
     echo "  db-shell    Open a psql shell to the database"
+    echo "  db-migrate  Apply pending database migrations"
+    echo "  db-seed     Load the sample tasks"
+    echo "  db-archive  Move long-completed tasks to the archive table (extra args are passed on)"
     echo "  api-start   Start only the API service"
+    echo "  api-serve   Run the API with multiple worker processes (production)"
     echo "  api-stop    Stop only the API service"
     echo "  ui-start    Start only the frontend UI"
     echo "  ui-stop     Stop only the frontend UI"
@@ -24,6 +28,11 @@ function show_help {
     echo "  test-api    Run API tests"
     echo "  test-db     Run database tests"
     echo "  test-ui     Run frontend UI tests"
+    echo "  bench       Run the repository and API benchmark suites (extra args are passed on)"
+    echo "  bench-compare OLD NEW  Compare two benchmark result files"
+    echo "  load-test   Drive the running API with mixed traffic (extra args are passed on)"
+    echo "  bench-workers  Compare production server throughput across worker counts"
+    echo "  bench-startup  Time API cold starts and first requests per startup mode"
     echo "  otel-start  Start the OpenTelemetry collector and Jaeger"
     echo "  otel-stop   Stop the OpenTelemetry collector and Jaeger"
     echo "  help        Show this help message"
@@ -92,15 +101,39 @@ case "$1" in
         echo "Opening psql shell to database..."
         podman exec -it taskmgr-postgres psql -U taskmgr -d taskmgr_db
         ;;
+    db-migrate)
+        echo "Waiting for the database to accept connections..."
+        until podman exec taskmgr-postgres pg_isready -U taskmgr -d taskmgr_db > /dev/null 2>&1; do
+            sleep 1
+        done
+        echo "Applying database migrations..."
+        cd src/db && conda run -n taskmgr alembic upgrade head
+        cd "$OLDPWD"
+        ;;
+    db-seed)
+        echo "Loading sample tasks..."
+        podman exec -i taskmgr-postgres psql -U taskmgr -d taskmgr_db < "$(pwd)/src/db/scripts/seed.sql"
+        ;;
+    db-archive)
+        shift
+        cd src && conda run -n taskmgr python -m db.archive "$@"
+        cd "$OLDPWD"
+        ;;
     api-start)
         echo "Starting API service..."
         check_podman_machine
         cd src/api && conda run -n taskmgr uvicorn main:app --host 0.0.0.0 --port 8000 --reload
         ;;
+    api-serve)
+        shift
+        echo "Starting API service (production workers)..."
+        check_podman_machine
+        cd src/api && conda run -n taskmgr python server.py "$@"
+        ;;
     api-stop)
         echo "Stopping API service..."
-        # Find and kill the uvicorn process
-        pkill -f "uvicorn main:app" || echo "No API service running"
+        # Find and kill the uvicorn process, or drain the production server
+        pkill -f "uvicorn main:app" || pkill -TERM -f "python server.py" || echo "No API service running"
         ;;
     ui-start)
         echo "Starting frontend UI..."
@@ -121,6 +154,8 @@ case "$1" in
         # Start the database
         echo "Setting up the database..."
         $0 db-start
+        $0 db-migrate
+        $0 db-seed
         
         echo "\nBackend setup complete!"
         echo "To set up the frontend UI, run: ./manage.sh setup-ui"
@@ -180,6 +215,35 @@ case "$1" in
         cd "$OLDPWD"
         ;;
         
+    bench)
+        shift
+        echo "Running repository benchmarks..."
+        cd src && conda run -n taskmgr python -m db.benchmarks.bench_repository "$@"
+        echo "Running API route benchmarks..."
+        conda run -n taskmgr python -m api.benchmarks.bench_routes "$@"
+        cd "$OLDPWD"
+        ;;
+    bench-compare)
+        shift
+        cd src && conda run -n taskmgr python -m db.benchmarks.compare "$@"
+        cd "$OLDPWD"
+        ;;
+    load-test)
+        shift
+        cd src && conda run -n taskmgr python -m api.benchmarks.load_test "$@"
+        cd "$OLDPWD"
+        ;;
+    bench-workers)
+        shift
+        cd src && conda run -n taskmgr python -m api.benchmarks.bench_workers "$@"
+        cd "$OLDPWD"
+        ;;
+    bench-startup)
+        shift
+        cd src && conda run -n taskmgr python -m api.benchmarks.bench_startup "$@"
+        cd "$OLDPWD"
+        ;;
+
     otel-start)
         echo "Starting OpenTelemetry collector and Jaeger..."
         check_podman_machine
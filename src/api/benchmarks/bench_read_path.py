@@ -0,0 +1,88 @@
+"""
+Benchmark: ORM + response-model list reads vs the record read path.
+
+``orm`` is what ``GET /tasks`` did before: ``Task`` instances through the
+identity map, re-validated into ``TaskResponse`` and JSON-encoded by the
+response layer. ``records`` selects column tuples into ``TaskRecord`` and
+encodes them directly with ``api.encoding.encode_json``.
+
+Each size is seeded inside a transaction that is rolled back afterwards,
+so the benchmark leaves the database as it found it. CPU time is measured
+without tracing; peak memory is measured in a separate traced pass.
+
+Usage (from ``src/``, with the database running)::
+
+    python -m api.benchmarks.bench_read_path
+    python -m api.benchmarks.bench_read_path --sizes 1000 100000 --repeat 5
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from db.database import SessionLocal
+from db.models import Task
+from db.records import RECORD_COLUMNS, to_records
+from db.benchmarks.common import seed_tasks, summarize
+from api.encoding import encode_json
+from api.main import TaskResponse
+
+response_adapter = TypeAdapter(List[TaskResponse])
+
+def orm_path(db, floor: int) -> bytes:
+    """Load Task instances, validate into TaskResponse and encode."""
+    tasks = db.scalars(select(Task).where(Task.id > floor).order_by(Task.id)).all()
+    validated = response_adapter.validate_python(tasks)
+    body = json.dumps(response_adapter.dump_python(validated, mode="json"),
+                      separators=(",", ":")).encode()
+    db.expunge_all()
+    return body
+
+def records_path(db, floor: int) -> bytes:
+    """Load TaskRecords and encode them directly."""
+    rows = db.execute(select(*RECORD_COLUMNS).where(Task.id > floor).order_by(Task.id)).tuples()
+    return encode_json(to_records(rows))
+
+PATHS = {"orm": orm_path, "records": records_path}
+
+def measure(path, db, floor: int, rows: int, repeat: int) -> dict:
+    """Per-row CPU (median of ``repeat`` runs) and traced peak memory."""
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        path(db, floor)
+        samples.append(time.process_time() - start)
+    tracemalloc.start()
+    path(db, floor)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cpu = summarize(samples)
+    return {
+        "cpu_p50_ms": round(cpu["p50_ms"], 2),
+        "cpu_us_per_row": round(cpu["p50_ms"] * 1000 / rows, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "peak_bytes_per_row": peak // rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per path and size")
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        db = SessionLocal()
+        try:
+            floor = seed_tasks(db, rows)
+            for name, path in PATHS.items():
+                result = measure(path, db, floor, rows, args.repeat)
+                print(json.dumps({"path": name, "rows": rows, **result}))
+        finally:
+            db.rollback()
+            db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark suite: every route in api/main.py, in-process over ASGI.
+
+Requests go through the full FastAPI stack (validation, dependencies,
+encoding) via httpx's ASGI transport, without a network hop or server
+process. Tasks are seeded per size as in ``db.benchmarks.bench_repository``
+and the results are written in the same JSON format.
+
+Usage (from ``src/``, against a development database)::
+
+    python -m api.benchmarks.bench_routes
+    python -m api.benchmarks.bench_routes --sizes 1000 --only "GET /tasks/{id}"
+"""
+import argparse
+import asyncio
+import random
+from typing import List
+import httpx
+
+from db.database import SessionLocal, async_engine
+from db.pagination import encode_cursor
+from db.repository import TaskRepository
+from db.benchmarks.common import (Case, add_suite_arguments, case_iterations, print_result,
+                                  run_async_case, seeded_tasks, selected, write_results)
+from api.conditional import task_etag
+from api.main import app
+
+def request(client: httpx.AsyncClient, method: str, url, status: int = 200, **kwargs):
+    """Case body: send one request and check its status.
+
+    ``url`` may be a callable taking the setup value.
+    """
+    async def run(args):
+        target = url(args) if callable(url) else url
+        body = kwargs["json"](args) if callable(kwargs.get("json")) else kwargs.get("json")
+        headers = kwargs["headers"](args) if callable(kwargs.get("headers")) else kwargs.get("headers")
+        response = await client.request(method, target, json=body, headers=headers)
+        if response.status_code != status:
+            raise RuntimeError(f"{method} {target}: {response.status_code} {response.text[:200]}")
+    return run
+
+def new_task_ids(count: int):
+    """Setup helper: create ``count`` tasks to be deleted by the timed request."""
+    def setup():
+        with SessionLocal() as db:
+            tasks = TaskRepository(db).create_tasks_bulk(
+                [{"title": "bench delete me"} for _ in range(count)])
+            return [task.id for task in tasks]
+    return setup
+
+def current_etag(task_id: int) -> dict:
+    with SessionLocal() as db:
+        return {"If-None-Match": task_etag(task_id, TaskRepository(db).get_task_version(task_id))}
+
+def build_cases(client: httpx.AsyncClient, first: int, rows: int) -> List[Case]:
+    """All route cases against ``rows`` seeded tasks numbered from ``first``."""
+    rng = random.Random(0)
+
+    def pick():
+        return rng.randint(first, first + rows - 1)
+
+    deep_cursor = encode_cursor({"id": first + rows // 2})
+    bulk = [{"title": f"bench bulk {i}", "priority": "Low"} for i in range(100)]
+    return [
+        Case("GET /tasks/{id}", request(client, "GET", lambda task_id: f"/tasks/{task_id}"), pick),
+        Case("GET /tasks/{id} [304]",
+             request(client, "GET", lambda args: f"/tasks/{args[0]}", 304, headers=lambda args: args[1]),
+             lambda: (lambda task_id: (task_id, current_etag(task_id)))(pick())),
+        Case("GET /tasks?limit=100", request(client, "GET", "/tasks?limit=100")),
+        Case("GET /tasks?limit=100&cursor", request(client, "GET", f"/tasks?limit=100&cursor={deep_cursor}")),
+        Case("GET /tasks?limit=100&fields",
+             request(client, "GET", "/tasks?limit=100&fields=title,due_date,priority,completed")),
+        Case("GET /tasks?limit=100&sort=priority",
+             request(client, "GET", "/tasks?limit=100&sort=priority&order=desc&completed=false")),
+        Case("GET /tasks?limit=100&sort=due_date", request(client, "GET", "/tasks?limit=100&sort=due_date")),
+        Case("GET /tasks/search [rare]", request(client, "GET", "/tasks/search?q=zeppelin")),
+        Case("GET /tasks/search [two words]", request(client, "GET", "/tasks/search?q=deploy%20budget")),
+        Case("GET /tasks/stats", request(client, "GET", "/tasks/stats")),
+        Case("GET /tasks", request(client, "GET", "/tasks"), full_scan=True),
+        Case("GET /tasks?completed=false", request(client, "GET", "/tasks?completed=false"), full_scan=True),
+        Case("GET /tasks/export [ndjson]", request(client, "GET", "/tasks/export"), full_scan=True),
+        Case("GET /tasks/export [csv]", request(client, "GET", "/tasks/export?format=csv"), full_scan=True),
+        Case("POST /tasks", request(client, "POST", "/tasks", 201, json={"title": "bench create"})),
+        Case("POST /tasks/bulk [100]", request(client, "POST", "/tasks/bulk", 201, json=bulk)),
+        Case("PUT /tasks/{id}", request(client, "PUT", lambda task_id: f"/tasks/{task_id}",
+                                        json={"title": "bench updated"}), pick),
+        Case("POST /tasks/{id}/complete",
+             request(client, "POST", lambda task_id: f"/tasks/{task_id}/complete"), pick),
+        Case("POST /tasks/{id}/pending",
+             request(client, "POST", lambda task_id: f"/tasks/{task_id}/pending"), pick),
+        Case("PATCH /tasks [10 ids]",
+             request(client, "PATCH", "/tasks",
+                     json=lambda ids: {"where": {"ids": ids}, "update": {"priority": "Medium"}}),
+             lambda: [pick() for _ in range(10)]),
+        Case("DELETE /tasks/{id}", request(client, "DELETE", lambda ids: f"/tasks/{ids[0]}", 204),
+             new_task_ids(1)),
+        Case("DELETE /tasks [10 ids]", request(client, "DELETE", "/tasks", json=lambda ids: {"ids": ids}),
+             new_task_ids(10)),
+        Case("GET /admin/cache", request(client, "GET", "/admin/cache")),
+        Case("GET /admin/pool", request(client, "GET", "/admin/pool")),
+    ]
+
+async def run_suite(args) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for rows in args.sizes:
+            results[str(rows)] = {}
+            with seeded_tasks(rows) as first:
+                for case in selected(build_cases(client, first, rows), args.only):
+                    iterations = case_iterations(case, args.iterations, rows, args.full_scan_max)
+                    if iterations:
+                        result = await run_async_case(case, iterations, rows)
+                    else:
+                        result = {"skipped": f"whole-table case above {args.full_scan_max} rows"}
+                    results[str(rows)][case.name] = result
+                    print_result(rows, case.name, result)
+    await async_engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_suite_arguments(parser)
+    args = parser.parse_args()
+    results = asyncio.run(run_suite(args))
+    print(f"Results written to {write_results('routes', args, results)}")
+
+if __name__ == "__main__":
+    main()
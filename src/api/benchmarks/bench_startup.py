@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark: time to first response and first-request latency.
+
+Each configuration starts a fresh single-process server (``uvicorn
+main:app``) with its own environment ``--rounds`` times and measures:
+
+- ``ready_ms``: from spawning the process to the first answered request
+- the ``GET /admin/startup`` report (import time and lifespan phases)
+- the latency of the first and second request to a few hot routes, which
+  shows what pool pre-warming moved out of the request path
+
+It also lists the slowest modules under ``python -X importtime -c "import
+main"``, so an import that suddenly costs more is easy to spot.
+
+Usage (from ``src/``, with the database running and nothing on the port)::
+
+    python -m api.benchmarks.bench_startup --rounds 3 --prewarm 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+# First requests whose latency is compared; ids are filled in after start-up
+ROUTES = ["/tasks/{id}", "/tasks?limit=50", "/tasks?limit=50&sort=due_date", "/tasks/search?q=report"]
+
+def configurations(prewarm: int) -> dict:
+    return {
+        "migrate": {"DB_STARTUP_MODE": "migrate", "DB_POOL_PREWARM": "0"},
+        "check": {"DB_STARTUP_MODE": "check", "DB_POOL_PREWARM": "0"},
+        f"check+prewarm{prewarm}": {"DB_STARTUP_MODE": "check", "DB_POOL_PREWARM": str(prewarm)},
+    }
+
+def cold_start(environment: dict, port: int, timeout: float = 60.0) -> dict:
+    """Start one server, time its readiness and first requests, then stop it."""
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env={**os.environ, **environment})
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with {server.returncode} during startup")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"Server did not answer within {timeout:.0f}s")
+            try:
+                report = httpx.get(f"{url}/admin/startup", timeout=1.0).json()
+                break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        ready_ms = (time.perf_counter() - started) * 1000
+        with httpx.Client(base_url=url, timeout=10.0) as client:
+            task_id = client.get("/tasks", params={"limit": 1, "fields": "title"}).json()[0]["id"]
+            latencies = {}
+            for route in ROUTES:
+                path = route.format(id=task_id)
+                timings = []
+                for _ in range(2):
+                    start = time.perf_counter()
+                    client.get(path).raise_for_status()
+                    timings.append((time.perf_counter() - start) * 1000)
+                latencies[route] = timings
+        return {"ready_ms": ready_ms, "report": report, "latencies": latencies}
+    finally:
+        server.terminate()
+        server.wait(30)
+
+def slowest_imports(limit: int) -> list:
+    """Modules with the highest cumulative import time when importing the app."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=API_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3, help="cold starts per configuration")
+    parser.add_argument("--prewarm", type=int, default=5, help="connections for the pre-warmed configuration")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--imports", type=int, default=15, help="slowest imports to list (0 to skip)")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, environment in configurations(args.prewarm).items():
+        runs = [cold_start(environment, args.port) for _ in range(args.rounds)]
+        results[name] = runs
+        median = lambda values: statistics.median(values)
+        print(f"\n== {name} ({args.rounds} cold starts, medians) ==")
+        print(f"ready {median([run['ready_ms'] for run in runs]):.0f} ms, "
+              f"import {median([run['report']['import_ms'] for run in runs]):.0f} ms, "
+              f"lifespan {median([run['report']['startup_ms'] for run in runs]):.0f} ms")
+        for phase in runs[0]["report"]["phases"]:
+            print(f"  {phase:<24} {median([run['report']['phases'][phase] for run in runs]):8.1f} ms")
+        print(f"  {'first request':<32} {'1st':>8} {'2nd':>8}  (ms)")
+        for route in ROUTES:
+            first = median([run["latencies"][route][0] for run in runs])
+            second = median([run["latencies"][route][1] for run in runs])
+            print(f"  {route:<32} {first:8.2f} {second:8.2f}")
+
+    if args.imports:
+        print(f"\nSlowest imports (cumulative ms) for 'import main':")
+        for ms, name in slowest_imports(args.imports):
+            print(f"{ms:9.1f}  {name}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
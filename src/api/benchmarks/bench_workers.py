@@ -0,0 +1,116 @@
+"""
+Throughput of the production server (``api/server.py``) by worker count.
+
+For each ``--workers`` value a server is started on ``--port``, warmed up,
+and driven with the closed-loop load generator at ``--concurrency``
+(default mix). It is then stopped with SIGTERM, which also checks that
+the workers drain and exit cleanly. The table shows throughput, latency
+and the speed-up over the first worker count.
+
+The load generator runs in this process, so on a small machine it
+competes with the workers for CPU; compare counts up to the number of
+cores minus one.
+
+Usage (from ``src/``, with the database running and nothing on the port)::
+
+    python -m api.benchmarks.bench_workers --workers 1 2 4 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+from api.benchmarks.load_test import DEFAULT_MIX, delete_created, parse_mix, prime, run_stage
+
+SERVER = Path(__file__).resolve().parents[1] / "server.py"
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, str(SERVER), "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER.parent)
+
+def wait_ready(url: str, server: subprocess.Popen, timeout: float = 60.0) -> None:
+    """Wait until the server answers, failing if it exits first."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with {server.returncode} during startup")
+        try:
+            if httpx.get(f"{url}/admin/pool", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not answer within {timeout:.0f}s")
+
+def stop_server(server: subprocess.Popen, timeout: float = 60.0) -> float:
+    """SIGTERM the server and return how long it took to drain."""
+    start = time.perf_counter()
+    server.send_signal(signal.SIGTERM)
+    try:
+        code = server.wait(timeout)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        raise RuntimeError("Server did not shut down after SIGTERM")
+    if code != 0:
+        raise RuntimeError(f"Server exited with {code} after SIGTERM")
+    return time.perf_counter() - start
+
+async def measure(args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        pool = await prime(client)
+        try:
+            if args.warmup:
+                await run_stage(client, args, pool, "concurrency", args.concurrency, args.warmup)
+            return await run_stage(client, args, pool, "concurrency", args.concurrency, args.duration)
+        finally:
+            await delete_created(client, pool)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1],
+                        help="worker counts to compare")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unrecorded seconds before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    args = parser.parse_args()
+    args.url = f"http://127.0.0.1:{args.port}"
+    args.max_in_flight = args.concurrency
+
+    results = []
+    for workers in dict.fromkeys(args.workers):
+        server = start_server(workers, args.port)
+        try:
+            wait_ready(args.url, server)
+            stage = asyncio.run(measure(args))
+        finally:
+            drain = stop_server(server)
+        total = stage["total"]
+        results.append({"workers": workers, "drain_seconds": drain, **total})
+        print(f"workers={workers}: {total['throughput_rps']:.1f} req/s, p99 {total['p99_ms']:.1f} ms, "
+              f"{total['errors']} errors, drained in {drain:.1f}s", flush=True)
+
+    base = results[0]["throughput_rps"] or 1.0
+    print(f"\n{'workers':>8} {'req/s':>9} {'speed-up':>9} {'p50':>9} {'p99':>9} {'errors':>8}  (ms)")
+    for result in results:
+        print(f"{result['workers']:>8} {result['throughput_rps']:9.1f} {result['throughput_rps'] / base:8.2f}x "
+              f"{result['p50_ms']:9.2f} {result['p99_ms']:9.2f} {result['error_rate']:8.2%}")
+    if args.output:
+        args.output.write_text(json.dumps({"concurrency": args.concurrency, "duration": args.duration,
+                                           "results": results}, indent=2))
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
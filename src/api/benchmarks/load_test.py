@@ -0,0 +1,341 @@
+"""
+Load generator: mixed traffic against a running API.
+
+Closed loop (``--concurrency``): N workers each send their next request as
+soon as the previous one is answered. Open loop (``--rate``): requests
+arrive at the given rate (Poisson arrivals) however fast the server
+answers, and latency is measured from the scheduled arrival so queueing
+delay is not hidden (no coordinated omission). Several values run one
+stage each, which shows the saturation point: throughput stops following
+the offered rate while p99 and pool waits climb.
+
+Every stage reports throughput, error rate and latency percentiles per
+endpoint plus ``/admin/pool`` checkout statistics. Tasks created by the
+run are deleted at the end unless ``--keep`` is given.
+
+Usage (from ``src/``, with the API running)::
+
+    python -m api.benchmarks.load_test --concurrency 8 32 128 --duration 30
+    python -m api.benchmarks.load_test --rate 100 200 400 800 --mix get=60,list=30,create=10
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+import httpx
+
+DEFAULT_MIX = "list=35,get=40,create=10,update=8,complete=7"
+PRIORITIES = ["Low", "Medium", "High"]
+SEARCH_TERMS = ["report", "meeting", "deploy", "review", "budget"]
+PERCENTILES = {"p50_ms": 50, "p90_ms": 90, "p99_ms": 99, "p999_ms": 99.9}
+# Most ids one DELETE /tasks accepts (MAX_BULK_TASKS in api/main.py)
+DELETE_CHUNK_SIZE = 10000
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Microsecond values are counted in 2**SUB_BUCKET_BITS linear sub-buckets
+    per power of two, so recording is O(1) and every reported percentile is
+    within 1% of the true value.
+    """
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts: Dict[tuple, int] = defaultdict(int)
+        self.count = 0
+        self.max = 0
+
+    def _key(self, value: int) -> tuple:
+        magnitude = max(value.bit_length() - self.SUB_BUCKET_BITS, 0)
+        return magnitude, value >> magnitude
+
+    def record(self, seconds: float) -> None:
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[self._key(value)] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for key, count in other.counts.items():
+            self.counts[key] += count
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Milliseconds below which ``pct`` percent of the values fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for magnitude, sub_bucket in sorted(self.counts):
+            seen += self.counts[magnitude, sub_bucket]
+            if seen >= target:
+                highest = ((sub_bucket + 1) << magnitude) - 1
+                return min(highest, self.max) / 1000
+        return self.max / 1000
+
+@dataclass
+class Operation:
+    """One kind of request in the mix."""
+    label: str
+    expected: int
+    send: Callable[[httpx.AsyncClient, "TaskPool", random.Random], Awaitable[httpx.Response]]
+
+class TaskPool:
+    """Task ids to read and modify, plus the ones this run created."""
+
+    def __init__(self, ids: List[int]):
+        self.ids = ids
+        self.created: List[int] = []
+
+    def pick(self, rng: random.Random) -> int:
+        return rng.choice(self.ids)
+
+    def add(self, task_id: int) -> None:
+        self.ids.append(task_id)
+        self.created.append(task_id)
+
+async def list_tasks(client, pool, rng):
+    return await client.get("/tasks", params={"limit": 50})
+
+async def get_task(client, pool, rng):
+    return await client.get(f"/tasks/{pool.pick(rng)}")
+
+async def create_task(client, pool, rng):
+    response = await client.post("/tasks", json={
+        "title": f"load test task {rng.randrange(1_000_000)}",
+        "priority": rng.choice(PRIORITIES),
+    })
+    if response.status_code == 201:
+        pool.add(response.json()["id"])
+    return response
+
+async def update_task(client, pool, rng):
+    return await client.put(f"/tasks/{pool.pick(rng)}", json={"priority": rng.choice(PRIORITIES)})
+
+async def complete_task(client, pool, rng):
+    return await client.post(f"/tasks/{pool.pick(rng)}/complete")
+
+async def search_tasks(client, pool, rng):
+    return await client.get("/tasks/search", params={"q": rng.choice(SEARCH_TERMS)})
+
+async def get_stats(client, pool, rng):
+    return await client.get("/tasks/stats")
+
+OPERATIONS = {
+    "list": Operation("GET /tasks?limit=50", 200, list_tasks),
+    "get": Operation("GET /tasks/{id}", 200, get_task),
+    "create": Operation("POST /tasks", 201, create_task),
+    "update": Operation("PUT /tasks/{id}", 200, update_task),
+    "complete": Operation("POST /tasks/{id}/complete", 200, complete_task),
+    "search": Operation("GET /tasks/search", 200, search_tasks),
+    "stats": Operation("GET /tasks/stats", 200, get_stats),
+}
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``name=weight,...`` into operation weights."""
+    mix = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("The mix needs at least one operation with a positive weight")
+    return mix
+
+class Recorder:
+    """Latency histograms and error counts per endpoint for one stage."""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    def observe(self, label: str, seconds: float, error: Optional[str]) -> None:
+        self.latency[label].record(seconds)
+        if error:
+            self.errors[label][error] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        total = LatencyHistogram()
+        for label in sorted(self.latency):
+            histogram = self.latency[label]
+            total.merge(histogram)
+            endpoints[label] = _summarize(histogram, sum(self.errors[label].values()), elapsed)
+            endpoints[label]["error_kinds"] = dict(self.errors[label])
+        errors = sum(sum(counter.values()) for counter in self.errors.values())
+        return {"endpoints": endpoints, "total": _summarize(total, errors, elapsed)}
+
+def _summarize(histogram: LatencyHistogram, errors: int, elapsed: float) -> dict:
+    return {
+        "requests": histogram.count,
+        "errors": errors,
+        "error_rate": errors / histogram.count if histogram.count else 0.0,
+        "throughput_rps": histogram.count / elapsed if elapsed else 0.0,
+        **{name: histogram.percentile(pct) for name, pct in PERCENTILES.items()},
+        "max_ms": histogram.max / 1000,
+    }
+
+async def send(client, operation: Operation, pool: TaskPool, rng: random.Random, recorder: Recorder,
+               started: float, slots: Optional[asyncio.Semaphore] = None) -> None:
+    """Issue one request and record its latency since ``started``."""
+    async with slots or nullcontext():
+        try:
+            response = await operation.send(client, pool, rng)
+            error = None if response.status_code == operation.expected else str(response.status_code)
+        except httpx.HTTPError as failure:
+            error = type(failure).__name__
+    recorder.observe(operation.label, time.perf_counter() - started, error)
+
+def choose(mix: Dict[str, float], rng: random.Random) -> Operation:
+    return OPERATIONS[rng.choices(list(mix), weights=list(mix.values()))[0]]
+
+async def closed_loop(client, mix, pool, recorder, concurrency: int, duration: float, seed: int) -> None:
+    """``concurrency`` workers sending back-to-back requests for ``duration`` seconds."""
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng: random.Random):
+        while time.perf_counter() < deadline:
+            await send(client, choose(mix, rng), pool, rng, recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker(random.Random(seed + n)) for n in range(concurrency)))
+
+async def open_loop(client, mix, pool, recorder, rate: float, duration: float, seed: int,
+                    max_in_flight: int) -> None:
+    """Poisson arrivals at ``rate`` per second for ``duration`` seconds.
+
+    At most ``max_in_flight`` requests are outstanding; later arrivals wait
+    for a slot and that wait counts towards their latency.
+    """
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(max_in_flight)
+    in_flight = set()
+    start = scheduled = time.perf_counter()
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled - start >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(client, choose(mix, rng), pool, rng, recorder, scheduled, slots))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    await asyncio.gather(*in_flight)
+
+async def prime(client, minimum: int = 20) -> TaskPool:
+    """Collect existing task ids, creating a few tasks if there are too few."""
+    response = await client.get("/tasks", params={"limit": 1000, "fields": "title"})
+    response.raise_for_status()
+    pool = TaskPool([task["id"] for task in response.json()])
+    if len(pool.ids) < minimum:
+        response = await client.post("/tasks/bulk", json=[
+            {"title": f"load test task {n}"} for n in range(minimum - len(pool.ids))])
+        response.raise_for_status()
+        for task in response.json():
+            pool.add(task["id"])
+    return pool
+
+async def delete_created(client, pool: TaskPool) -> None:
+    """Delete the tasks this run created, DELETE_CHUNK_SIZE ids per request.
+
+    Every chunk is attempted; raises if any of them was not deleted.
+    """
+    failed = []
+    for start in range(0, len(pool.created), DELETE_CHUNK_SIZE):
+        chunk = pool.created[start:start + DELETE_CHUNK_SIZE]
+        response = await client.request("DELETE", "/tasks", json={"ids": chunk})
+        if not response.is_success:
+            failed.append(f"{len(chunk)} ids: {response.status_code} {response.text[:200]}")
+    if failed:
+        raise RuntimeError(f"Could not delete the tasks this run created ({'; '.join(failed)})")
+
+async def pool_snapshot(client) -> Optional[dict]:
+    try:
+        response = await client.get("/admin/pool")
+    except httpx.HTTPError:
+        return None
+    return response.json() if response.status_code == 200 else None
+
+async def run_stage(client, args, pool, mode: str, level: float, duration: float) -> dict:
+    recorder = Recorder()
+    start = time.perf_counter()
+    if mode == "concurrency":
+        await closed_loop(client, args.mix, pool, recorder, int(level), duration, args.seed)
+    else:
+        await open_loop(client, args.mix, pool, recorder, level, duration, args.seed, args.max_in_flight)
+    result = recorder.summary(time.perf_counter() - start)
+    result[mode] = level
+    return result
+
+def print_stage(result: dict, mode: str) -> None:
+    print(f"\n== {mode} {result[mode]:g} ==")
+    print(f"{'endpoint':<28} {'req/s':>9} {'errors':>8} {'p50':>9} {'p90':>9} {'p99':>9} "
+          f"{'p99.9':>9} {'max':>9}  (ms)")
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for label, stats in rows:
+        print(f"{label:<28} {stats['throughput_rps']:9.1f} {stats['error_rate']:8.2%} "
+              f"{stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} {stats['p99_ms']:9.2f} "
+              f"{stats['p999_ms']:9.2f} {stats['max_ms']:9.2f}")
+    async_pool = (result.get("pool") or {}).get("async")
+    if async_pool:
+        print(f"pool: {async_pool['checkouts']} checkouts, {async_pool['timeouts']} timeouts, "
+              f"max wait {async_pool['max_wait_ms']:.1f} ms")
+
+async def run(args) -> List[dict]:
+    mode = "rate" if args.rate else "concurrency"
+    levels = args.rate or args.concurrency
+    limits = httpx.Limits(max_connections=args.max_in_flight if args.rate else max(levels))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        pool = await prime(client)
+        if args.warmup:
+            await run_stage(client, args, pool, mode, levels[0], args.warmup)
+        stages = []
+        try:
+            for level in levels:
+                result = await run_stage(client, args, pool, mode, level, args.duration)
+                result["pool"] = await pool_snapshot(client)
+                print_stage(result, mode)
+                stages.append(result)
+        finally:
+            if not args.keep:
+                await delete_created(client, pool)
+    return stages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, nargs="+", default=[16],
+                      help="closed loop: concurrent workers (one stage per value)")
+    load.add_argument("--rate", type=float, nargs="+",
+                      help="open loop: arrivals per second (one stage per value)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unrecorded seconds before the first stage")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default {DEFAULT_MIX}; also search, stats)")
+    parser.add_argument("--max-in-flight", type=int, default=1000,
+                        help="open loop: most outstanding requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the tasks the run created")
+    parser.add_argument("--output", type=Path, help="also write the stage results as JSON")
+    args = parser.parse_args()
+
+    stages = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps({"url": args.url, "duration": args.duration, "stages": stages},
+                                          indent=2))
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+ETag and Last-Modified helpers for conditional task requests.
+
+Task ETags are weak and derived from ``id`` and ``updated_at``, so they can
+be checked against the database (or cache) without loading the row. List
+ETags hash the request's query string together with ``max(updated_at)`` and
+``count(*)`` of the filtered set. Page ETags hash the ids and ``updated_at``
+of the rows on the page and the next cursor, so a page is validated from
+the rows it returns rather than from an aggregate over the whole table.
+"""
+import hashlib
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, List, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+def _micros(value: Optional[datetime]) -> int:
+    if value is None:
+        return 0
+    return (value.replace(tzinfo=None) - EPOCH) // MICROSECOND
+
+def task_etag(task_id: int, updated_at: Optional[datetime]) -> str:
+    """Weak ETag for a single task."""
+    return f'W/"{task_id}-{_micros(updated_at)}"'
+
+def list_etag(query: str, latest: Optional[datetime], count: int) -> str:
+    """Weak ETag for a task listing."""
+    digest = hashlib.sha1(f"{query}|{_micros(latest)}|{count}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def page_etag(query: str, records: Iterable, next_cursor: Optional[str]) -> str:
+    """Weak ETag for one keyset page."""
+    digest = hashlib.sha1(f"{query}|{next_cursor or ''}".encode())
+    for record in records:
+        digest.update(f"|{record.id}-{_micros(record.updated_at)}".encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+def parse_task_etag(etag: str) -> Optional[Tuple[int, datetime]]:
+    """Recover ``(id, updated_at)`` from a task ETag, or None if it is not one."""
+    opaque = _opaque(etag)
+    try:
+        task_id, micros = opaque.split("-")
+        return int(task_id), EPOCH + int(micros) * MICROSECOND
+    except ValueError:
+        return None
+
+def etag_list(header: Optional[str]) -> List[str]:
+    """Split an If-Match / If-None-Match header into its entity tags."""
+    if not header:
+        return []
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match / If-Match header."""
+    tags = etag_list(header)
+    return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+def last_modified(updated_at: datetime) -> str:
+    """Format a naive-UTC timestamp as an HTTP date."""
+    return format_datetime(updated_at.replace(tzinfo=UTC), usegmt=True)
+
+def not_modified_since(header: Optional[str], updated_at: Optional[datetime]) -> bool:
+    """Evaluate If-Modified-Since (whole-second resolution, per HTTP dates)."""
+    if not header or updated_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return updated_at.replace(tzinfo=UTC, microsecond=0) <= since
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag.strip('"')
@@ -1,7 +1,6 @@
 """
 Configuration settings for the API.
 """
-import os
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -14,25 +13,30 @@ class Settings(BaseSettings):
     API_DESCRIPTION: str = "API for managing tasks in the Task Manager application"
     API_VERSION: str = "1.0.0"
     
-    # Database settings
-    DB_USER: str = os.getenv("DB_USER", "taskmgr")
-    DB_PASSWORD: str = os.getenv("DB_PASSWORD", "taskmgr_password")
-    DB_HOST: str = os.getenv("DB_HOST", "localhost")
-    DB_PORT: str = os.getenv("DB_PORT", "5432")
-    DB_NAME: str = os.getenv("DB_NAME", "taskmgr_db")
-    DATABASE_URL: str = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # Database and pool settings live in db.config.DatabaseSettings
     
     # CORS settings
     CORS_ORIGINS: list[str] = ["*"]  # In production, replace with specific origins
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: list[str] = ["*"]
     CORS_ALLOW_HEADERS: list[str] = ["*"]
+
+    # OpenTelemetry (see api.telemetry); off by default
+    TELEMETRY_ENABLED: bool = False
+    TELEMETRY_EXPORTER: str = "otlp"  # otlp, console or file
+    TELEMETRY_FILE: str = "telemetry.jsonl"
+    TELEMETRY_SAMPLE_RATE: float = 0.1  # share of traces kept, 0.0 - 1.0
+    TELEMETRY_SQL_SPANS: bool = False  # a span per SQL statement, for chasing a query
+    TELEMETRY_METRICS_INTERVAL_MS: int = 60000
+    TELEMETRY_SERVICE_NAME: str = "taskmgr-api"
+    OTLP_ENDPOINT: str = "localhost:4317"
     
     class Config:
         """Pydantic settings config."""
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = True
+        extra = "ignore"  # DB_* variables belong to db.config
 
 # Create settings instance
 settings = Settings()
@@ -0,0 +1,37 @@
+"""
+Direct JSON encoding for read-only task records.
+
+Read endpoints hand ``TaskRecord`` lists (or projected records) straight
+to ``encode_json`` and return the bytes, skipping response-model validation. ``orjson`` is used
+when installed (it serializes slotted dataclasses and datetimes natively);
+otherwise the standard library encoder produces the same document.
+"""
+import json
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+def _default(value):
+    if is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in fields(value)}
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def encode_json(content) -> bytes:
+    """Encode records (or lists/dicts of them) as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+class RecordResponse(Response):
+    """JSON response whose body is encoded with ``encode_json``."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
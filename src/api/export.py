@@ -0,0 +1,67 @@
+"""
+Streaming encoders for the task export endpoint.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Mapping
+
+# Rows buffered into each chunk written to the response
+ROWS_PER_CHUNK = 500
+
+EXPORT_COLUMNS = ["id", "title", "description", "due_date", "priority",
+                  "completed", "created_at", "updated_at"]
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def encode_ndjson(rows: AsyncIterator[Mapping]) -> AsyncIterator[bytes]:
+    """Encode rows as newline-delimited JSON, one object per line."""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps({column: row[column] for column in EXPORT_COLUMNS},
+                                default=_json_default))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+async def encode_csv(rows: AsyncIterator[Mapping]) -> AsyncIterator[bytes]:
+    """Encode rows as CSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    async for row in rows:
+        writer.writerow([_csv_value(row[column]) for column in EXPORT_COLUMNS])
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+ENCODERS = {
+    ExportFormat.NDJSON: encode_ndjson,
+    ExportFormat.CSV: encode_csv,
+}
@@ -0,0 +1,100 @@
+"""
+Observing every TaskRepository / AsyncTaskRepository method call.
+
+``instrument_repositories(observer)`` replaces each public repository
+method with a wrapper that calls ``observer.start(operation, repository,
+stream)`` before the call and ``observer.finish(state, rows, error)`` after
+it, and returns a function that puts the original methods back. Generator
+methods (streams) finish when the caller stops iterating. Used by
+``api.telemetry`` (spans) and ``api.metrics`` (Prometheus).
+"""
+import functools
+import inspect
+from typing import Callable
+
+from db.repository import TaskRepository
+from db.async_repository import AsyncTaskRepository
+
+# Repository classes whose public methods are observed, by label
+REPOSITORIES = {"sync": TaskRepository, "async": AsyncTaskRepository}
+
+def row_count(result) -> int:
+    """Rows a repository method returned or touched."""
+    if result is None:
+        return 0
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])  # (page, cursor)
+    return 1
+
+def _wrap(method, observer, operation: str, repository: str):
+    start, finish = observer.start, observer.finish
+
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            state, rows, error = start(operation, repository, True), 0, None
+            try:
+                async for item in method(*args, **kwargs):
+                    rows += 1
+                    yield item
+            except Exception as failure:
+                error = failure
+                raise
+            finally:
+                finish(state, rows, error)
+    elif inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            state, rows, error = start(operation, repository, True), 0, None
+            try:
+                for item in method(*args, **kwargs):
+                    rows += 1
+                    yield item
+            except Exception as failure:
+                error = failure
+                raise
+            finally:
+                finish(state, rows, error)
+    elif inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            state = start(operation, repository, False)
+            try:
+                result = await method(*args, **kwargs)
+            except Exception as error:
+                finish(state, 0, error)
+                raise
+            finish(state, row_count(result), None)
+            return result
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            state = start(operation, repository, False)
+            try:
+                result = method(*args, **kwargs)
+            except Exception as error:
+                finish(state, 0, error)
+                raise
+            finish(state, row_count(result), None)
+            return result
+    return wrapper
+
+def instrument_repositories(observer) -> Callable[[], None]:
+    """Wrap every public repository method; return the function that undoes it."""
+    originals = []
+    for repository, cls in REPOSITORIES.items():
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method):
+                continue
+            originals.append((cls, name, method))
+            setattr(cls, name, _wrap(method, observer, name, repository))
+
+    def restore():
+        for cls, name, method in reversed(originals):
+            setattr(cls, name, method)
+        originals.clear()
+    return restore
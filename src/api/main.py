@@ -1,31 +1,90 @@
 """
 Main FastAPI application for the Task Manager API.
 """
+import asyncio
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import sys
 import os
 from pathlib import Path
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Response, Body, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from contextlib import asynccontextmanager
 
+# Largest batch accepted by POST /tasks/bulk
+MAX_BULK_TASKS = 10000
+
+# Most hits GET /tasks/search returns per request
+MAX_SEARCH_RESULTS = 100
+
 # Add the parent directory to the path to import the db package
 sys.path.append(str(Path(__file__).parent.parent))
 
-from db.database import get_db, init_db
-from db.repository import TaskRepository
+from db.config import settings as db_settings
+from db.database import (get_async_db, init_db, check_db, engine, async_engine, AsyncSessionLocal,
+                         replica_engines, replicas, slow_queries)
+from db.warmup import prewarm
+from db.pool import pool_status
+from db.slow_query import SlowQueryOrder
+from db.async_repository import AsyncTaskRepository
+from db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortKey, SortOrder
+from db.repository import BULK_CHUNK_SIZE, SEARCH_LIMIT
+from db.cache import ReadOnlyTaskCache, task_cache
+from db.replicas import valid_token
+from db.records import narrow, select_fields
+from api.config import settings
+from api.telemetry import setup_telemetry
+from api.startup import StartupReport
+from api.instrumentation import instrument_repositories
+from api.metrics import (REGISTRY, CONTENT_TYPE, MetricsMiddleware, MultiprocessMetrics, RepositoryMetrics,
+                         pool_collector)
+from api.export import ExportFormat, ENCODERS, MEDIA_TYPES
+from api.encoding import RecordResponse
+from api.conditional import (task_etag, list_etag, page_etag, parse_task_etag, etag_list, etag_matches,
+                             last_modified, not_modified_since)
 from db.models import Task
 
+# Import and lifespan timings for GET /admin/startup
+startup = StartupReport(IMPORT_STARTED)
+
 # Initialize database on startup using lifespan
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events for the application."""
-    # Startup: initialize the database
-    init_db()
+    # Startup: tracing and metrics when TELEMETRY_ENABLED, then the database.
+    # uvicorn only accepts connections once this part has finished.
+    startup.begin()
+    with startup.phase("telemetry"):
+        telemetry = setup_telemetry(settings, app, engines=[engine, async_engine.sync_engine])
+        restore_repositories = instrument_repositories(RepositoryMetrics())
+    with startup.phase(f"schema_{db_settings.DB_STARTUP_MODE}"):
+        if db_settings.DB_STARTUP_MODE == "check":
+            await check_db()
+        else:
+            init_db()
+    prewarm_connections = db_settings.prewarm_connections()
+    if prewarm_connections > 0:
+        with startup.phase("pool_prewarm"):
+            report = await prewarm(AsyncSessionLocal, prewarm_connections)
+            startup.details["prewarm"] = {**report, "requested": db_settings.DB_POOL_PREWARM}
+    startup.ready()
+    if shared_metrics is not None:
+        shared_metrics.start()
     yield
-    # Shutdown: cleanup can be done here if needed
+    # Shutdown: close pooled async connections bound to this event loop
+    await async_engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+    restore_repositories()
+    if shared_metrics is not None:
+        shared_metrics.stop()
+    if telemetry is not None:
+        telemetry.shutdown()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -42,8 +101,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "X-Consistency-Token"],
 )
 
+# Request latency for GET /metrics; outermost, so it times the whole stack
+app.add_middleware(MetricsMiddleware)
+REGISTRY.add_collector(pool_collector({"sync": engine, "async": async_engine,
+                                       **{f"replica{number}": replica
+                                          for number, replica in enumerate(replica_engines)}}))
+# Samples of every worker when server.py runs several (None in a single process)
+shared_metrics = MultiprocessMetrics.from_env(REGISTRY)
+
 # Pydantic models for request and response
 class TaskBase(BaseModel):
     """Base model for Task data."""
@@ -74,93 +142,460 @@ class TaskResponse(TaskBase):
     # Use ConfigDict instead of class Config
     model_config = ConfigDict(from_attributes=True)
 
+class TaskFieldsResponse(BaseModel):
+    """Model for a Task projected with `fields=`: only the requested fields are present."""
+    id: int = Field(..., description="Task ID (always included)")
+    title: Optional[str] = Field(None, description="Task title")
+    description: Optional[str] = Field(None, description="Task description")
+    due_date: Optional[datetime] = Field(None, description="Due date for the task")
+    priority: Optional[str] = Field(None, description="Task priority (Low, Medium, High)")
+    completed: Optional[bool] = Field(None, description="Whether the task is completed")
+    created_at: Optional[datetime] = Field(None, description="When the task was created")
+    updated_at: Optional[datetime] = Field(None, description="When the task was last updated")
+
+class TaskSearchResult(TaskResponse):
+    """Model for a full-text search hit."""
+    rank: float = Field(..., description="Relevance; higher is better")
+    title_highlight: str = Field(..., description="HTML-escaped title with matches wrapped in <mark>")
+    description_highlight: Optional[str] = Field(None, description="HTML-escaped best description fragments with matches wrapped in <mark>")
+
+class TaskPriorityCounts(BaseModel):
+    """Model for task counts per priority."""
+    Low: int
+    Medium: int
+    High: int
+    none: int = Field(..., description="Tasks without a priority")
 
+class TaskStats(BaseModel):
+    """Model for aggregate task counts."""
+    total: int
+    completed: int
+    pending: int
+    overdue: int = Field(..., description="Pending tasks past their due date")
+    due_this_week: int = Field(..., description="Pending tasks due within the next 7 days")
+    by_priority: TaskPriorityCounts
+
+class TaskSelection(BaseModel):
+    """Selects tasks for a bulk operation by id list and/or filter."""
+    ids: Optional[List[int]] = Field(None, max_length=MAX_BULK_TASKS, description="Task IDs")
+    completed: Optional[bool] = Field(None, description="Only tasks with this completion status")
+    priority: Optional[str] = Field(None, description="Only tasks with this priority")
+    due_before: Optional[datetime] = Field(None, description="Only tasks due before this time")
+    due_after: Optional[datetime] = Field(None, description="Only tasks due at or after this time")
+
+class TaskBulkUpdate(BaseModel):
+    """Model for updating every task matched by a selection."""
+    where: TaskSelection = Field(..., description="Tasks to update")
+    update: TaskUpdate = Field(..., description="Fields to set on every matched task")
+
+class TaskBulkResult(BaseModel):
+    """Model for the result of a bulk update or delete."""
+    count: int = Field(..., description="Number of tasks affected")
+    ids: List[int] = Field(..., description="IDs of the affected tasks")
+
+def set_task_validators(response: Response, task) -> None:
+    """Attach ETag and Last-Modified for a single task."""
+    response.headers["ETag"] = task_etag(task.id, task.updated_at)
+    if task.updated_at is not None:
+        response.headers["Last-Modified"] = last_modified(task.updated_at)
+
+# Sent after a write; sending it back makes reads wait for a replica that has the write
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+async def get_read_db(x_consistency_token: Optional[str] = Header(None), primary=Depends(get_async_db)):
+    """Session for a read-only route: a replica when one is configured and has
+    replayed `X-Consistency-Token`, otherwise the primary session."""
+    if x_consistency_token is not None and not valid_token(x_consistency_token):
+        raise HTTPException(status_code=400, detail="Invalid consistency token")
+    async with replicas.read_session(x_consistency_token) as replica:
+        yield replica if replica is not None else primary
+
+def read_repository(db) -> AsyncTaskRepository:
+    """Repository for a read route; replica reads use the cache without filling it."""
+    if task_cache is not None and db.info.get("replica"):
+        return AsyncTaskRepository(db, ReadOnlyTaskCache(task_cache))
+    return AsyncTaskRepository(db, task_cache)
+
+async def set_consistency_token(response: Response, db) -> None:
+    """Attach the primary's position after a write, when reads may go to replicas."""
+    token = await replicas.write_token(db)
+    if token is not None:
+        response.headers[CONSISTENCY_HEADER] = token
 
 # API endpoints
-@app.get("/tasks", response_model=List[TaskResponse], tags=["tasks"])
+@app.get("/tasks", response_model=List[Union[TaskResponse, TaskFieldsResponse]], tags=["tasks"])
 async def get_tasks(
+    request: Request,
     completed: Optional[bool] = Query(None, description="Filter by completion status"),
-    db=Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,due_date,priority,completed"),
+    sort: Optional[SortKey] = Query(None, description="Sort by due_date, priority or created_at (ties broken by id)"),
+    order: SortOrder = Query(SortOrder.ASC, description="Sort direction"),
+    include_archived: bool = Query(False, description="Also return archived (long-completed) tasks"),
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_read_db)
 ):
     """
     Get all tasks, optionally filtered by completion status.
+
+    When `limit` or `cursor` is given, a single page is returned ordered by id
+    and the cursor for the following page is sent in the `X-Next-Cursor`
+    header (absent on the last page).
+
+    For a full listing the `ETag` covers the whole filtered set (latest
+    `updated_at` and row count); sending it back in `If-None-Match` yields
+    304 without loading any rows. For a page it covers the ids and
+    `updated_at` of the returned rows and the next cursor, so the page is
+    loaded and 304 only saves the response body.
+
+    `fields` limits both the selected columns and the returned objects to
+    the named fields (`id` is always included), so list views can skip the
+    unbounded `description`. Such objects match `TaskFieldsResponse`, where
+    every other field is optional.
+
+    `sort` orders by due date (undated tasks last), priority (Low < Medium <
+    High, unset first) or creation time, in `order` direction; sorted pages
+    are served from matching indexes. Without `sort`, pages follow id order.
+
+    Tasks moved to the archive (see `db/archive.py`) are left out unless
+    `include_archived` is set; they are merged in the same order.
     """
-    repo = TaskRepository(db)
-    if completed is not None:
-        tasks = repo.get_tasks_by_status(completed)
+    repo = read_repository(db)
+    field_names = None
+    if fields is not None:
+        try:
+            field_names = select_fields(name.strip() for name in fields.split(",") if name.strip())
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    paginated = limit is not None or cursor is not None
+    descending = order is SortOrder.DESC
+    # ETags are computed from updated_at, so load it even when it is not returned
+    load_names = field_names
+    if field_names is not None and "updated_at" not in field_names:
+        load_names = select_fields((*field_names, "updated_at"))
+    headers = {}
+    if paginated:
+        try:
+            tasks, next_cursor = await repo.get_task_records_page(limit or DEFAULT_PAGE_SIZE, cursor, completed,
+                                                                  load_names, sort, descending, include_archived)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # A page is validated from its own rows: no aggregate over the table
+        etag = page_etag(request.url.query, tasks, next_cursor)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
     else:
-        tasks = repo.get_all_tasks()
-    return tasks
+        if if_none_match:
+            # The aggregate is cheaper than the full listing it may save
+            latest, count = await repo.get_tasks_version(completed, include_archived)
+            etag = list_etag(request.url.query, latest, count)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+        tasks = await repo.get_task_records(completed, load_names, sort, descending, include_archived)
+        # The full filtered set is loaded, so its aggregate is free
+        latest = max((task.updated_at for task in tasks if task.updated_at), default=None)
+        etag = list_etag(request.url.query, latest, len(tasks))
+    if load_names != field_names:
+        tasks = narrow(tasks, field_names)
+    headers["ETag"] = etag
+    # Records are read-only and match TaskResponse (TaskFieldsResponse when projected), so skip validation
+    return RecordResponse(tasks, headers=headers)
+
+@app.get("/tasks/stats", response_model=TaskStats, tags=["tasks"])
+async def get_task_stats(db=Depends(get_read_db)):
+    """
+    Get task counts by status and priority, plus overdue and due this week.
+
+    Computed in one aggregate query and memoized for a few seconds
+    (`TASK_STATS_TTL`); any task write clears the memo.
+    """
+    repo = read_repository(db)
+    return await repo.get_stats()
+
+@app.get("/tasks/search", response_model=List[TaskSearchResult], tags=["tasks"])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (web-search syntax)"),
+    completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_RESULTS, description="Maximum number of hits"),
+    db=Depends(get_read_db)
+):
+    """
+    Search task titles and descriptions, best matches first.
+
+    Supports quoted phrases, `or` and `-word`. Title matches outrank
+    description matches; highlights mark the matched words.
+    """
+    repo = read_repository(db)
+    return RecordResponse(await repo.search_tasks(q, completed, limit))
+
+@app.get("/tasks/export", tags=["tasks"])
+async def export_tasks(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Export format (ndjson or csv)"),
+    completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    db=Depends(get_read_db)
+):
+    """
+    Stream every task as NDJSON or CSV.
+
+    Rows are read from a server-side cursor and written as they arrive, so
+    memory use does not grow with the size of the table.
+    """
+    repo = read_repository(db)
+    # The session stays open while the body streams: since FastAPI 0.118,
+    # yield dependencies are closed after the response is sent
+    return StreamingResponse(
+        ENCODERS[format](repo.stream_tasks(completed)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'}
+    )
+
+@app.patch("/tasks", response_model=TaskBulkResult, tags=["tasks"])
+async def update_tasks(body: TaskBulkUpdate, response: Response, db=Depends(get_async_db)):
+    """
+    Update every task matched by an id list and/or filter in one statement.
+    """
+    repo = AsyncTaskRepository(db, task_cache)
+    update_data = {k: v for k, v in body.update.model_dump().items() if v is not None}
+    try:
+        ids = await repo.update_tasks(update_data, **body.where.model_dump())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    await set_consistency_token(response, db)
+    return TaskBulkResult(count=len(ids), ids=ids)
+
+@app.delete("/tasks", response_model=TaskBulkResult, tags=["tasks"])
+async def delete_tasks(selection: TaskSelection, response: Response, db=Depends(get_async_db)):
+    """
+    Delete every task matched by an id list and/or filter in one statement.
+    """
+    repo = AsyncTaskRepository(db, task_cache)
+    try:
+        ids = await repo.delete_tasks(**selection.model_dump())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    await set_consistency_token(response, db)
+    return TaskBulkResult(count=len(ids), ids=ids)
 
 @app.get("/tasks/{task_id}", response_model=TaskResponse, tags=["tasks"])
-async def get_task(task_id: int, db=Depends(get_db)):
+async def get_task(
+    task_id: int,
+    include_archived: bool = Query(False, description="Also look the task up in the archive"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db=Depends(get_read_db)
+):
     """
     Get a single task by ID.
+
+    Honours `If-None-Match` and `If-Modified-Since` with a 304, checked
+    against the task's `updated_at` only. An archived task is 404 unless
+    `include_archived` is set.
     """
-    repo = TaskRepository(db)
-    task = repo.get_task_by_id(task_id)
+    repo = read_repository(db)
+    if if_none_match or if_modified_since:
+        version = await repo.get_task_version(task_id, include_archived)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        etag = task_etag(task_id, version)
+        # If-None-Match takes precedence over If-Modified-Since
+        unchanged = (etag_matches(if_none_match, etag) if if_none_match
+                     else not_modified_since(if_modified_since, version))
+        if unchanged:
+            return Response(status_code=304,
+                            headers={"ETag": etag, "Last-Modified": last_modified(version)})
+    task = await repo.get_task_record(task_id, include_archived)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    response = RecordResponse(task)
+    set_task_validators(response, task)
+    return response
 
 @app.post("/tasks", response_model=TaskResponse, status_code=201, tags=["tasks"])
-async def create_task(task: TaskCreate, db=Depends(get_db)):
+async def create_task(task: TaskCreate, response: Response, db=Depends(get_async_db)):
     """
     Create a new task.
     """
-    repo = TaskRepository(db)
-    return repo.create_task(
+    repo = AsyncTaskRepository(db, task_cache)
+    created = await repo.create_task(
         title=task.title,
         description=task.description,
         due_date=task.due_date,
         priority=task.priority
     )
+    await set_consistency_token(response, db)
+    return created
+
+@app.post("/tasks/bulk", response_model=List[TaskResponse], status_code=201, tags=["tasks"])
+async def create_tasks_bulk(
+    response: Response,
+    tasks: List[TaskCreate] = Body(..., min_length=1, max_length=MAX_BULK_TASKS),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=5000, description="Tasks per INSERT statement"),
+    db=Depends(get_async_db)
+):
+    """
+    Create many tasks in a single transaction.
+
+    Either every task is created or none is.
+    """
+    repo = AsyncTaskRepository(db, task_cache)
+    created = await repo.create_tasks_bulk([task.model_dump() for task in tasks], chunk_size)
+    await set_consistency_token(response, db)
+    return created
 
 @app.put("/tasks/{task_id}", response_model=TaskResponse, tags=["tasks"])
-async def update_task(task_id: int, task: TaskUpdate, db=Depends(get_db)):
+async def update_task(
+    task_id: int,
+    task: TaskUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db=Depends(get_async_db)
+):
     """
     Update an existing task.
+
+    With `If-Match`, the update only applies if the task still has that
+    ETag; otherwise 412 is returned and nothing is written.
     """
-    repo = TaskRepository(db)
+    repo = AsyncTaskRepository(db, task_cache)
     
     # Convert Pydantic model to dict and remove None values
     update_data = {k: v for k, v in task.model_dump().items() if v is not None}
+
+    expected_version = None
+    if if_match is not None and "*" not in etag_list(if_match):
+        versions = [parse_task_etag(tag) for tag in etag_list(if_match)]
+        versions = [version for tag_id, version in filter(None, versions) if tag_id == task_id]
+        if not versions:
+            raise HTTPException(status_code=412, detail="Task has been modified")
+        expected_version = versions[0]
     
-    updated_task = repo.update_task(task_id, **update_data)
+    updated_task = await repo.update_task(task_id, if_updated_at=expected_version, **update_data)
     if updated_task is None:
+        if expected_version is not None and await repo.get_task_version(task_id) is not None:
+            raise HTTPException(status_code=412, detail="Task has been modified")
         raise HTTPException(status_code=404, detail="Task not found")
     
+    set_task_validators(response, updated_task)
+    await set_consistency_token(response, db)
     return updated_task
 
 @app.delete("/tasks/{task_id}", status_code=204, tags=["tasks"])
-async def delete_task(task_id: int, db=Depends(get_db)):
+async def delete_task(task_id: int, response: Response, db=Depends(get_async_db)):
     """
     Delete a task.
     """
-    repo = TaskRepository(db)
-    success = repo.delete_task(task_id)
+    repo = AsyncTaskRepository(db, task_cache)
+    success = await repo.delete_task(task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
+    await set_consistency_token(response, db)
     return None
 
 @app.post("/tasks/{task_id}/complete", response_model=TaskResponse, tags=["tasks"])
-async def mark_task_completed(task_id: int, db=Depends(get_db)):
+async def mark_task_completed(task_id: int, response: Response, db=Depends(get_async_db)):
     """
     Mark a task as completed.
     """
-    repo = TaskRepository(db)
-    task = repo.mark_task_completed(task_id)
+    repo = AsyncTaskRepository(db, task_cache)
+    task = await repo.mark_task_completed(task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    await set_consistency_token(response, db)
     return task
 
 @app.post("/tasks/{task_id}/pending", response_model=TaskResponse, tags=["tasks"])
-async def mark_task_pending(task_id: int, db=Depends(get_db)):
+async def mark_task_pending(task_id: int, response: Response, db=Depends(get_async_db)):
     """
     Mark a task as pending.
     """
-    repo = TaskRepository(db)
-    task = repo.mark_task_pending(task_id)
+    repo = AsyncTaskRepository(db, task_cache)
+    task = await repo.mark_task_pending(task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    await set_consistency_token(response, db)
     return task
+
+@app.get("/admin/cache", tags=["admin"])
+async def get_cache_stats():
+    """
+    Get hit/miss/eviction counters for the single-task cache.
+    """
+    if task_cache is None:
+        return {"enabled": False}
+    # Counting Redis keys is a SCAN; keep it off the event loop
+    stats = await asyncio.to_thread(task_cache.stats) if task_cache.blocking else task_cache.stats()
+    return {"enabled": True, **stats}
+
+@app.get("/admin/pool", tags=["admin"])
+async def get_pool_stats():
+    """
+    Get live connection pool counters and checkout wait histograms.
+
+    `async` is the pool serving requests; `sync` serves migrations and
+    scripts. Sustained checkouts near `size` + `DB_MAX_OVERFLOW`, slow buckets
+    filling up or any `timeouts` mean the pool is undersized for the
+    number of concurrent requests per worker. `replicas` lists the pools of
+    the read replicas (`DB_REPLICA_URLS`), in order.
+    """
+    return {"async": pool_status(async_engine.pool), "sync": pool_status(engine.pool),
+            "replicas": [pool_status(replica.pool) for replica in replica_engines]}
+
+@app.get("/admin/replicas", tags=["admin"])
+async def get_replica_stats():
+    """
+    Get read routing counters.
+
+    `replica_reads` were served by a replica; `primary_fallbacks` went to
+    the primary because no replica had caught up with the request's
+    consistency token within `max_wait_ms` or none was reachable (`errors`).
+    `waits` counts catch-up polls.
+    """
+    return {"enabled": replicas.enabled, **replicas.stats()}
+
+@app.get("/admin/startup", tags=["admin"])
+async def get_startup_report():
+    """
+    Get how long this worker took to import and to start.
+
+    `import_ms` covers importing the application module (framework imports
+    included); `phases` breaks down the lifespan startup: telemetry set-up,
+    the schema migration or version check (`DB_STARTUP_MODE`) and pool
+    pre-warming (`DB_POOL_PREWARM`).
+    """
+    return startup.as_dict()
+
+@app.get("/admin/slow-queries", tags=["admin"])
+async def get_slow_queries(
+    limit: int = Query(10, ge=1, le=100, description="Number of statements to return"),
+    order: SlowQueryOrder = Query(SlowQueryOrder.TOTAL, description="Rank by total, max or mean time, or count"),
+):
+    """
+    Get the slowest normalized statements seen since startup.
+
+    Only executions slower than `DB_SLOW_QUERY_MS` are counted. Literals and
+    parameters are replaced by `?`; `last_plan` summarises the most recent
+    sampled `EXPLAIN (ANALYZE, BUFFERS)` when `DB_SLOW_QUERY_EXPLAIN_RATE` is
+    above 0. Full records are written to `DB_SLOW_QUERY_LOG` when it is set.
+    """
+    if slow_queries is None:
+        return {"enabled": False, "threshold_ms": 0, "statements": []}
+    return {"enabled": True, "threshold_ms": slow_queries.threshold * 1000,
+            "statements": slow_queries.top(limit, order)}
+
+@app.get("/metrics", tags=["admin"], response_class=Response)
+async def get_metrics():
+    """
+    Prometheus metrics: request latency per route, in-flight requests,
+    requests over the 200 ms budget, repository call counts, durations and
+    rows, and connection pool gauges. Under a multi-worker server the
+    samples of all workers are summed.
+    """
+    if shared_metrics is not None:
+        return Response(await asyncio.to_thread(shared_metrics.render), media_type=CONTENT_TYPE)
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+# Everything above, framework imports included, counts as import time
+startup.imported()
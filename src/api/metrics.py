@@ -0,0 +1,372 @@
+"""
+Prometheus metrics for the API, served as text at ``GET /metrics``.
+
+- ``taskmgr_http_request_duration_seconds{method,route,status}`` (histogram)
+- ``taskmgr_http_requests_in_flight`` (gauge)
+- ``taskmgr_http_requests_over_budget_total{method,route}``: requests slower
+  than the spec's 200 ms budget
+- ``taskmgr_db_operation_duration_seconds{operation,repository}`` (histogram;
+  its ``_count`` is the number of calls per repository method)
+- ``taskmgr_db_rows_total`` / ``taskmgr_db_operation_errors_total``
+- ``taskmgr_db_pool_*``: pool gauges and the checkout wait histogram of each
+  engine in ``db.database``, read at scrape time
+
+Recording is lock-light: every thread writes to its own shard of each
+metric, so the hot path is a dict lookup and an add with no lock or
+contention; the lock is only taken when a thread records for the first
+time and when a scrape merges the shards.
+
+Under ``server.py`` with several workers each process has its own
+registry, so a scrape would only see whichever worker answered it. The
+supervisor then sets ``TASKMGR_METRICS_DIR`` to a directory it owns:
+every worker writes its exposition there once a second (and on each
+scrape and at shutdown), and ``GET /metrics`` sums the files of all
+workers (see ``MultiprocessMetrics``).
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from db.pool import WAIT_BUCKETS_MS, pool_status
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# The spec's latency target for a single request
+LATENCY_BUDGET_SECONDS = 0.2
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Directory the workers of one server share their samples through (set by api.server)
+MULTIPROCESS_DIR_ENV = "TASKMGR_METRICS_DIR"
+# Seconds between a worker's writes of its samples to that directory
+SNAPSHOT_INTERVAL = 1.0
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _bound(value: float) -> str:
+    return format(value, "g")
+
+def histogram_lines(name: str, label_names, label_values, bounds, counts, total: float) -> List[str]:
+    """Exposition lines of one histogram series; ``counts`` is per bucket, +Inf last."""
+    lines, cumulative = [], 0
+    for bound, count in zip(list(map(_bound, bounds)) + ["+Inf"], counts):
+        cumulative += count
+        labels = _labels(label_names, label_values, f'le="{bound}"')
+        lines.append(f"{name}_bucket{labels} {cumulative}")
+    lines.append(f"{name}_sum{_labels(label_names, label_values)} {total}")
+    lines.append(f"{name}_count{_labels(label_names, label_values)} {cumulative}")
+    return lines
+
+class _Metric:
+    """A metric whose samples are recorded in per-thread shards."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[dict] = []
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def _merged(self) -> dict:
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            # dict() copies atomically, so the owning thread may keep adding series
+            for labels, value in dict(shard).items():
+                merged[labels] = self._combine(merged.get(labels), value)
+        return merged
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._merged().items()):
+            lines.extend(self._sample_lines(labels, value))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        values = self._shard()
+        values[labels] = values.get(labels, 0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._merged().get(labels, 0)
+
+    @staticmethod
+    def _combine(merged, value):
+        return (merged or 0) + value
+
+    def _sample_lines(self, labels, value):
+        return [f"{self.name}{_labels(self.label_names, labels)} {value}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=REQUEST_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float) -> None:
+        values = self._shard()
+        series = values.get(labels)
+        if series is None:
+            # One count per bucket, then +Inf, then the running sum
+            series = values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, labels: tuple) -> int:
+        series = self._merged().get(labels)
+        return sum(series[:-1]) if series else 0
+
+    @staticmethod
+    def _combine(merged, value):
+        return list(value) if merged is None else [a + b for a, b in zip(merged, value)]
+
+    def _sample_lines(self, labels, series):
+        return histogram_lines(self.name, self.label_names, labels, self.buckets, series[:-1], series[-1])
+
+class Registry:
+    """Metrics plus collectors that produce lines at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def merge_expositions(expositions: Iterable[Tuple[str, bool]]) -> str:
+    """Sum the samples of several ``(text, alive)`` expositions, series by series.
+
+    Counters and histograms of exited processes are kept, so totals never go
+    backwards when a worker is replaced; their gauges are dropped.
+    """
+    families: Dict[str, dict] = {}
+    for text, alive in expositions:
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# "):
+                _, keyword, name, rest = (line.split(" ", 3) + [""])[:4]
+                family = families.setdefault(name, {"help": "", "kind": "untyped", "samples": {}})
+                family["help" if keyword == "HELP" else "kind"] = rest
+            elif line and family is not None:
+                if not alive and family["kind"] == "gauge":
+                    continue
+                series, value = line.rsplit(" ", 1)
+                family["samples"][series] = family["samples"].get(series, 0.0) + float(value)
+    lines = []
+    for name, family in families.items():
+        lines += [f"# HELP {name} {family['help']}", f"# TYPE {name} {family['kind']}"]
+        lines += [f"{series} {_number(value)}" for series, value in family["samples"].items()]
+    return "\n".join(lines) + "\n"
+
+class MultiprocessMetrics:
+    """A registry shared by the worker processes of one server through ``directory``.
+
+    Each process writes its own exposition to ``<pid>.prom`` (atomically,
+    every ``interval`` seconds while started); ``render`` refreshes this
+    process's file and merges all of them. Samples recorded by a worker
+    that crashed after its last write are lost.
+    """
+
+    def __init__(self, registry: Registry, directory: str, interval: float = SNAPSHOT_INTERVAL):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, registry: Registry) -> Optional["MultiprocessMetrics"]:
+        directory = os.getenv(MULTIPROCESS_DIR_ENV)
+        return cls(registry, directory) if directory else None
+
+    def write(self) -> None:
+        path = os.path.join(self.directory, f"{os.getpid()}.prom")
+        with self._lock:
+            with open(path + ".tmp", "w") as file:
+                file.write(self.registry.render())
+            os.replace(path + ".tmp", path)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def render(self) -> str:
+        self.write()
+        expositions = []
+        for entry in os.scandir(self.directory):
+            stem, extension = os.path.splitext(entry.name)
+            if extension == ".prom" and stem.isdigit():
+                with open(entry.path) as file:
+                    expositions.append((file.read(), _alive(int(stem))))
+        return merge_expositions(expositions)
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "taskmgr_http_request_duration_seconds", "Time to handle a request, by route template.",
+    ("method", "route", "status")))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "taskmgr_http_requests_in_flight", "Requests currently being handled."))
+REQUESTS_OVER_BUDGET = REGISTRY.register(Counter(
+    "taskmgr_http_requests_over_budget_total",
+    f"Requests that took longer than the {LATENCY_BUDGET_SECONDS * 1000:g} ms budget.", ("method", "route")))
+DB_OPERATION_DURATION = REGISTRY.register(Histogram(
+    "taskmgr_db_operation_duration_seconds", "Duration of TaskRepository methods.",
+    ("operation", "repository"), QUERY_BUCKETS))
+DB_ROWS = REGISTRY.register(Counter(
+    "taskmgr_db_rows_total", "Rows returned or written by TaskRepository methods.", ("operation", "repository")))
+DB_ERRORS = REGISTRY.register(Counter(
+    "taskmgr_db_operation_errors_total", "TaskRepository calls that raised.", ("operation", "repository")))
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency, in-flight requests and budget overruns.
+
+    Requests are labelled with the matched route template (``/tasks/{task_id}``),
+    or ``unmatched``, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.observe((scope["method"], route, str(status)), elapsed)
+            if elapsed > LATENCY_BUDGET_SECONDS:
+                REQUESTS_OVER_BUDGET.inc((scope["method"], route))
+
+class RepositoryMetrics:
+    """Observer for ``api.instrumentation.instrument_repositories``."""
+
+    def start(self, operation: str, repository: str, stream: bool):
+        return (operation, repository), time.perf_counter()
+
+    def finish(self, state, rows: int, error) -> None:
+        labels, start = state
+        DB_OPERATION_DURATION.observe(labels, time.perf_counter() - start)
+        DB_ROWS.inc(labels, rows)
+        if error is not None:
+            DB_ERRORS.inc(labels)
+
+def pool_collector(engines: Dict[str, object]) -> Callable[[], List[str]]:
+    """Collector for the pool gauges and checkout waits of ``engines`` (by label).
+
+    Engines rather than pools are passed because ``dispose()`` replaces the pool.
+    """
+    gauges = {
+        "size": "Connections the pool keeps open.",
+        "checked_out": "Connections currently in use.",
+        "checked_in": "Idle connections in the pool.",
+        "overflow": "Connections open beyond the pool size.",
+    }
+    wait_name = "taskmgr_db_pool_checkout_wait_seconds"
+
+    def collect() -> List[str]:
+        statuses = {label: pool_status(engine.pool) for label, engine in engines.items()}
+        lines = []
+        for key, documentation in gauges.items():
+            name = f"taskmgr_db_pool_{key}"
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{engine="{label}"}} {status[key]}'
+                      for label, status in statuses.items() if key in status]
+        for key, documentation in (("checkouts", "Connection checkouts."),
+                                   ("timeouts", "Checkouts that timed out waiting for a connection.")):
+            name = f"taskmgr_db_pool_{key}_total"
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{engine="{label}"}} {status[key]}'
+                      for label, status in statuses.items() if key in status]
+        lines += [f"# HELP {wait_name} Time spent waiting for a pooled connection.",
+                  f"# TYPE {wait_name} histogram"]
+        for label, status in statuses.items():
+            if "wait_histogram" in status:
+                counts = list(status["wait_histogram"].values())
+                total = status["avg_wait_ms"] * status["checkouts"] / 1000
+                lines += histogram_lines(wait_name, ("engine",), (label,),
+                                         [bound / 1000 for bound in WAIT_BUCKETS_MS], counts, total)
+        return lines
+    return collect
@@ -1,8 +1,43 @@
 """
 Server module for running the FastAPI application with uvicorn.
+
+``python server.py`` runs the production server: the application is
+imported (and the database migrated) once in a supervisor process, which
+binds the listening socket and forks ``--workers`` uvicorn workers that
+share it. Each worker starts with empty connection pools (see
+``db.database._dispose_after_fork``) and runs the app lifespan itself,
+with ``DB_STARTUP_MODE=check`` since the schema is already migrated.
+
+With more than one worker the task cache must be shared between them
+(``TASK_CACHE_URL=redis://...``): a write in one worker cannot invalidate
+another worker's in-process cache, which would keep serving the old task
+for up to ``TASK_CACHE_TTL``. Without a shared backend the cache is turned
+off for the workers, and the supervisor logs which of the two applies.
+
+Each worker keeps its own Prometheus registry; the supervisor gives them a
+shared directory (``TASKMGR_METRICS_DIR``) where every worker writes its
+samples, so ``GET /metrics`` on any worker serves the sum of all of them.
+
+On SIGTERM or SIGINT the supervisor forwards SIGTERM to every worker; a
+worker stops accepting connections, finishes the requests in flight (up
+to ``--graceful-timeout`` seconds) and exits. Workers still running after
+that are killed. A worker that dies on its own is replaced, unless it
+dies right after starting, which shuts the server down. The supervisor
+exits with 1 when it shut down because of such a worker or had to kill
+workers that did not drain, and with 0 otherwise.
+
+``python server.py --reload`` runs a single auto-reloading process for
+development.
 """
-import uvicorn
+import argparse
+import logging
 import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import uvicorn
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,12 +47,158 @@ load_dotenv()
 HOST = os.getenv("API_HOST", "0.0.0.0")
 PORT = int(os.getenv("API_PORT", "8000"))
 
+# Worker processes (default: one per core) and seconds a worker may take to drain
+WORKERS = int(os.getenv("API_WORKERS", "0")) or os.cpu_count() or 1
+GRACEFUL_TIMEOUT = float(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+
+APP = "main:app"
+
+# A worker that exits sooner than this after starting is not restarted
+MIN_WORKER_UPTIME = 5.0
+
+logger = logging.getLogger("uvicorn.error")
+
+# TASK_CACHE_URL schemes whose cache every worker process sees
+SHARED_CACHE_SCHEMES = ("redis://", "rediss://")
+
+def configure_worker_cache(workers: int) -> None:
+    """Turn the task cache off unless ``workers`` processes would share it.
+
+    Must run before ``db.cache`` is imported, which builds the cache from
+    the environment.
+    """
+    if workers <= 1 or os.getenv("TASK_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return
+    url = os.getenv("TASK_CACHE_URL", "")
+    if url.startswith(SHARED_CACHE_SCHEMES):
+        logger.info("%d workers share the task cache at %s", workers, url.split("://")[0] + "://")
+        return
+    os.environ["TASK_CACHE_ENABLED"] = "false"
+    logger.warning("Task cache disabled: %d workers need a shared TASK_CACHE_URL (redis://...), "
+                   "an in-process cache would serve stale tasks across workers", workers)
+
+def configure_worker_metrics(workers: int):
+    """Create the directory ``workers`` processes share their metrics through.
+
+    Must run before ``api.main`` is imported; returns the directory, or None
+    for a single worker.
+    """
+    if workers <= 1:
+        return None
+    directory = tempfile.mkdtemp(prefix="taskmgr-metrics-")
+    os.environ["TASKMGR_METRICS_DIR"] = directory
+    return directory
+
+class Supervisor:
+    """Pre-forking process manager for uvicorn workers sharing one socket."""
+
+    def __init__(self, config: uvicorn.Config, workers: int, graceful_timeout: float = GRACEFUL_TIMEOUT):
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.socket = None
+        self.children = {}  # pid -> start time
+        self.stopping_since = None
+        self.killed = False
+        self.failed = False
+        self.metrics_dir = None
+
+    def preload(self) -> None:
+        """Import the app and apply migrations before any worker exists."""
+        configure_worker_cache(self.workers)
+        self.metrics_dir = configure_worker_metrics(self.workers)
+        self.config.load()
+        from db.config import settings as db_settings
+        from db.database import engine, init_db
+
+        if db_settings.DB_STARTUP_MODE == "migrate":
+            init_db()
+            engine.dispose()
+        # Migrated once here, so workers only check the schema version
+        db_settings.DB_STARTUP_MODE = "check"
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                uvicorn.Server(self.config).run(sockets=[self.socket])
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def stop(self, signum, frame) -> None:
+        if self.stopping_since is None:
+            logger.info("Received %s, draining %d workers", signal.Signals(signum).name, len(self.children))
+            self.stopping_since = time.monotonic()
+            for pid in self.children:
+                os.kill(pid, signal.SIGTERM)
+
+    def reap(self) -> None:
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping_since is not None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                logger.error("Worker %d exited with %d right after starting; shutting down", pid, code)
+                self.failed = True
+                self.stop(signal.SIGTERM, None)
+            else:
+                logger.warning("Worker %d exited with %d; starting a replacement", pid, code)
+                self.spawn()
+
+    def run(self) -> int:
+        """Serve until SIGTERM/SIGINT; returns 1 after a worker failure or kill, else 0."""
+        self.preload()
+        self.socket = self.config.bind_socket()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        while self.children:
+            self.reap()
+            # uvicorn enforces the timeout itself; this covers a worker stuck elsewhere
+            if (self.stopping_since is not None and not self.killed
+                    and time.monotonic() - self.stopping_since > self.graceful_timeout + 5):
+                for pid in self.children:
+                    logger.warning("Worker %d did not drain in time; killing it", pid)
+                    os.kill(pid, signal.SIGKILL)
+                self.killed = True
+            time.sleep(0.1)
+        self.socket.close()
+        if self.metrics_dir is not None:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        logger.info("All workers stopped")
+        return 1 if self.failed or self.killed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Task Manager API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes (default: CPU count)")
+    parser.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT,
+                        help="seconds a worker may take to finish in-flight requests on shutdown")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--reload", action="store_true", help="single auto-reloading process for development")
+    args = parser.parse_args()
+
+    if args.reload:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=True, log_level=args.log_level)
+        return
+    config = uvicorn.Config(APP, host=args.host, port=args.port, log_level=args.log_level,
+                            timeout_graceful_shutdown=args.graceful_timeout)
+    sys.exit(Supervisor(config, args.workers, args.graceful_timeout).run())
+
 if __name__ == "__main__":
-    """Run the FastAPI application with uvicorn."""
-    uvicorn.run(
-        "main:app",
-        host=HOST,
-        port=PORT,
-        reload=True,
-        log_level="info"
-    )
+    main()
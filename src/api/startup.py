@@ -0,0 +1,49 @@
+"""
+Startup timings: how long ``api.main`` took to import and how long each
+lifespan phase took before the worker started serving.
+
+The report is logged when startup completes and served at
+``GET /admin/startup``, so a slower import or warm-up shows up on every
+deploy rather than only in a profiler.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+class StartupReport:
+    """Import time plus per-phase timings of the latest lifespan startup."""
+
+    def __init__(self, import_started: float):
+        self.import_started = import_started
+        self.import_ms: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.details: Dict[str, object] = {}
+        self.startup_ms: Optional[float] = None
+        self._started: Optional[float] = None
+
+    def imported(self) -> None:
+        self.import_ms = round((time.perf_counter() - self.import_started) * 1000, 1)
+
+    def begin(self) -> None:
+        self.phases, self.details, self.startup_ms = {}, {}, None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def ready(self) -> None:
+        self.startup_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        phases = ", ".join(f"{name} {ms:g} ms" for name, ms in self.phases.items())
+        logger.info("Startup: import %g ms, lifespan %g ms (%s)", self.import_ms, self.startup_ms, phases)
+
+    def as_dict(self) -> dict:
+        return {"import_ms": self.import_ms, "startup_ms": self.startup_ms,
+                "phases": self.phases, **self.details}
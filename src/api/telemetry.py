@@ -0,0 +1,164 @@
+"""
+Opt-in OpenTelemetry tracing and metrics for the API.
+
+Off unless ``TELEMETRY_ENABLED`` is set. ``setup_telemetry`` (called from
+the app's lifespan) then:
+
+- traces requests (FastAPI instrumentation), SQL statements (SQLAlchemy
+  instrumentation, only when ``TELEMETRY_SQL_SPANS`` is true) and every ``TaskRepository`` / ``AsyncTaskRepository``
+  method, with the number of rows returned or written as ``db.rows``
+- records ``http.server.duration`` per route and
+  ``taskmgr.db.operation.duration`` per repository method (milliseconds)
+- samples traces with ``TELEMETRY_SAMPLE_RATE``, default 0.1 (parent-based, so a trace
+  is kept or dropped as a whole); metrics are never sampled
+- exports over OTLP/gRPC to ``OTLP_ENDPOINT`` (``TELEMETRY_EXPORTER=otlp``),
+  to stdout (``console``) or as JSON lines to ``TELEMETRY_FILE`` (``file``),
+  so it also works without a collector running
+
+The OpenTelemetry packages are only imported when telemetry is enabled.
+"""
+import os
+import time
+from typing import Iterable, Optional
+
+from api.instrumentation import REPOSITORIES, instrument_repositories
+
+EXPORTERS = ("otlp", "console", "file")
+
+class Telemetry:
+    """Providers and instrumentation installed by ``setup_telemetry``."""
+
+    def __init__(self, tracer_provider, meter_provider, output=None):
+        from opentelemetry import context, trace
+        self._context, self._trace = context, trace
+        self.tracer_provider = tracer_provider
+        self.meter_provider = meter_provider
+        self.output = output
+        self.app = None
+        self.engines = []
+        self.tracer = tracer_provider.get_tracer(__name__)
+        self.duration = meter_provider.get_meter(__name__).create_histogram(
+            "taskmgr.db.operation.duration", unit="ms",
+            description="Duration of TaskRepository methods, including result processing")
+        self._restore_repositories = lambda: None
+
+    def instrument_app(self, app) -> None:
+        """Trace requests and record ``http.server.duration``."""
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        # One span per request; the per-message ASGI send/receive spans
+        # roughly double the tracing cost and add nothing here.
+        FastAPIInstrumentor.instrument_app(app, tracer_provider=self.tracer_provider,
+                                           meter_provider=self.meter_provider, exclude_spans=["receive", "send"])
+        # The lifespan runs after the middleware stack is built; rebuild it
+        # so the instrumentation middleware is included.
+        app.middleware_stack = app.build_middleware_stack()
+        self.app = app
+
+    def instrument_engines(self, engines: Iterable) -> None:
+        """Trace every SQL statement run on ``engines``."""
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        self.engines = list(engines)
+        SQLAlchemyInstrumentor().instrument(engines=self.engines, tracer_provider=self.tracer_provider,
+                                            meter_provider=self.meter_provider)
+
+    def instrument_repositories(self) -> None:
+        """Give every repository method a span and a duration measurement."""
+        self._restore_repositories = instrument_repositories(self)
+
+    def start(self, operation: str, repository: str, stream: bool):
+        """Observer hook: open the span of a repository call."""
+        attributes = {"db.operation": operation, "taskmgr.repository": repository}
+        cls = REPOSITORIES[repository].__name__
+        span = self.tracer.start_span(f"{cls}.{operation}", attributes=attributes)
+        # Streams stay open while the caller iterates, so their span is not
+        # made current (it would leak into the consumer's context).
+        token = None if stream else self._context.attach(self._trace.set_span_in_context(span))
+        return span, token, attributes, time.perf_counter()
+
+    def finish(self, state, rows: int, error: Optional[Exception]) -> None:
+        """Observer hook: record the duration and end the span."""
+        span, token, attributes, start = state
+        self.duration.record((time.perf_counter() - start) * 1000, attributes)
+        if token is not None:
+            self._context.detach(token)
+        if span.is_recording():
+            if error is not None:
+                span.record_exception(error)
+                description = f"{type(error).__name__}: {error}"
+                span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, description))
+            else:
+                span.set_attribute("db.rows", rows)
+            span.end()
+
+    def shutdown(self) -> None:
+        """Remove the instrumentation and flush pending spans and metrics."""
+        self._restore_repositories()
+        if self.app is not None:
+            from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+            FastAPIInstrumentor.uninstrument_app(self.app)
+        if self.engines:
+            from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+            SQLAlchemyInstrumentor().uninstrument()
+        self.tracer_provider.shutdown()
+        self.meter_provider.shutdown()
+        if self.output is not None:
+            self.output.close()
+
+def _exporters(settings, output):
+    """Span exporter and metric exporter for ``settings.TELEMETRY_EXPORTER``."""
+    if settings.TELEMETRY_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        return (OTLPSpanExporter(endpoint=settings.OTLP_ENDPOINT, insecure=True),
+                OTLPMetricExporter(endpoint=settings.OTLP_ENDPOINT, insecure=True))
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+    if output is None:
+        return ConsoleSpanExporter(), ConsoleMetricExporter()
+    return (ConsoleSpanExporter(out=output, formatter=lambda span: span.to_json(indent=None) + os.linesep),
+            ConsoleMetricExporter(out=output,
+                                  formatter=lambda metrics: metrics.to_json(indent=None) + os.linesep))
+
+def setup_telemetry(settings, app=None, engines: Iterable = (), span_exporter=None,
+                    metric_reader=None) -> Optional[Telemetry]:
+    """Install tracing and metrics if ``settings.TELEMETRY_ENABLED``; return None otherwise.
+
+    ``span_exporter`` / ``metric_reader`` replace the configured exporters
+    (tests use in-memory ones). Call ``Telemetry.shutdown`` on exit.
+    """
+    if not settings.TELEMETRY_ENABLED:
+        return None
+    if settings.TELEMETRY_EXPORTER not in EXPORTERS:
+        raise ValueError(f"TELEMETRY_EXPORTER must be one of {', '.join(EXPORTERS)}")
+    try:
+        from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    except ImportError as error:
+        raise RuntimeError("TELEMETRY_ENABLED requires the opentelemetry-sdk package") from error
+
+    output = None
+    if span_exporter is None or metric_reader is None:
+        if settings.TELEMETRY_EXPORTER == "file":
+            output = open(settings.TELEMETRY_FILE, "a", encoding="utf-8")
+        default_span_exporter, metric_exporter = _exporters(settings, output)
+        span_exporter = span_exporter or default_span_exporter
+        metric_reader = metric_reader or PeriodicExportingMetricReader(
+            metric_exporter, export_interval_millis=settings.TELEMETRY_METRICS_INTERVAL_MS)
+
+    resource = Resource.create({SERVICE_NAME: settings.TELEMETRY_SERVICE_NAME})
+    tracer_provider = TracerProvider(resource=resource,
+                                     sampler=ParentBased(TraceIdRatioBased(settings.TELEMETRY_SAMPLE_RATE)))
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+
+    telemetry = Telemetry(tracer_provider, meter_provider, output)
+    telemetry.instrument_repositories()
+    if app is not None:
+        telemetry.instrument_app(app)
+    if engines and settings.TELEMETRY_SQL_SPANS:
+        telemetry.instrument_engines(engines)
+    return telemetry
@@ -6,6 +6,14 @@ from datetime import datetime, timedelta, UTC
 import pytest
 from fastapi.testclient import TestClient
 from opentelemetry import trace
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from api.tests.conftest import TEST_ASYNC_DATABASE_URL
+from db.cache import task_cache
+from db.models import ArchivedTask, Task
+from db.replicas import ReplicaRouter
+from db.repository import TaskRepository
 
 # Import our OpenTelemetry plugin to ensure it's loaded
 import api.tests.pytest_otel_plugin
@@ -49,6 +57,162 @@ def test_get_tasks_filtered_by_completed(client):
     for task in pending_tasks:
         assert task["completed"] is False
 
+def test_get_tasks_paginated(client):
+    """Test walking the task list page by page with cursors."""
+    for i in range(3):
+        response = client.post("/tasks", json={"title": f"Paged Task {i}"})
+        assert response.status_code == 201
+
+    seen_ids = []
+    response = client.get("/tasks?limit=2")
+    while True:
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen_ids.extend(task["id"] for task in page)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        response = client.get(f"/tasks?limit=2&cursor={next_cursor}")
+
+    # Pages are ordered by id, without gaps or duplicates
+    all_ids = sorted(task["id"] for task in client.get("/tasks").json())
+    assert seen_ids == all_ids
+
+def test_get_tasks_paginated_filtered(client):
+    """Test that pagination combines with the completion filter."""
+    response = client.get("/tasks?completed=false&limit=1")
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page) == 1
+    assert page[0]["completed"] is False
+
+    response = client.get(f"/tasks?completed=false&limit=1&cursor={response.headers['X-Next-Cursor']}")
+    assert response.status_code == 200
+    assert response.json()[0]["id"] > page[0]["id"]
+
+def test_get_tasks_sparse_fields(client):
+    """Test that fields= limits the returned keys and always keeps id."""
+    response = client.get("/tasks?fields=title,priority&limit=2")
+    assert response.status_code == 200
+    tasks = response.json()
+    assert tasks and all(set(task) == {"id", "title", "priority"} for task in tasks)
+    assert response.headers["X-Next-Cursor"]
+
+    unpaginated = client.get("/tasks?fields=title,completed&completed=false")
+    assert all(set(task) == {"id", "title", "completed"} for task in unpaginated.json())
+    etag = unpaginated.headers["ETag"]
+    assert client.get("/tasks?fields=title,completed&completed=false",
+                      headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.get("/tasks?fields=title,secret")
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+def test_get_tasks_sorted_by_priority(client):
+    """Test sort=priority orders by rank, not alphabetically, and pages."""
+    rank = {None: 0, "Low": 1, "Medium": 2, "High": 3}
+    response = client.get("/tasks?sort=priority&order=desc&completed=false")
+    assert response.status_code == 200
+    ranks = [rank[task["priority"]] for task in response.json()]
+    assert ranks == sorted(ranks, reverse=True)
+
+    first = client.get("/tasks?sort=priority&order=desc&completed=false&limit=2")
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/tasks?sort=priority&order=desc&completed=false&limit=2&cursor={cursor}")
+    assert [t["id"] for t in first.json() + second.json()] == [t["id"] for t in response.json()][:4]
+
+    # A cursor is only valid for the ordering that produced it
+    assert client.get(f"/tasks?sort=due_date&limit=2&cursor={cursor}").status_code == 400
+    assert client.get("/tasks?sort=title").status_code == 422
+
+def test_get_tasks_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/tasks?limit=2&cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+def test_projected_listing_is_documented(client):
+    """Test that the listing schema allows the partial objects fields= returns."""
+    schema = client.get("/openapi.json").json()
+    items = schema["paths"]["/tasks"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+    assert {"$ref": "#/components/schemas/TaskFieldsResponse"} in items["anyOf"]
+    assert schema["components"]["schemas"]["TaskFieldsResponse"]["required"] == ["id"]
+
+def test_get_task_stats(client):
+    """Test the stats counts and that writes refresh them."""
+    before = client.get("/tasks/stats").json()
+    assert before["total"] == before["completed"] + before["pending"]
+    assert before["total"] == sum(before["by_priority"].values())
+
+    overdue = (datetime.now(UTC) - timedelta(days=1)).isoformat()
+    created = client.post("/tasks", json={"title": "Late", "due_date": overdue, "priority": "High"}).json()
+    try:
+        after = client.get("/tasks/stats").json()
+        assert after["total"] == before["total"] + 1
+        assert after["overdue"] == before["overdue"] + 1
+        assert after["by_priority"]["High"] == before["by_priority"]["High"] + 1
+    finally:
+        client.delete(f"/tasks/{created['id']}")
+    assert client.get("/tasks/stats").json() == before
+
+def test_bulk_create_refreshes_stats(client):
+    """Test that tasks created in bulk are counted by the next stats request."""
+    before = client.get("/tasks/stats").json()
+    created = client.post("/tasks/bulk", json=[{"title": f"Bulk Stats {n}"} for n in range(3)]).json()
+    try:
+        assert client.get("/tasks/stats").json()["total"] == before["total"] + 3
+    finally:
+        client.request("DELETE", "/tasks", json={"ids": [task["id"] for task in created]})
+
+def test_search_tasks(client):
+    """Test ranked full-text search with highlights and the completed filter."""
+    in_title = client.post("/tasks", json={"title": "Quarterly zeppelin audit"}).json()
+    in_description = client.post("/tasks", json={"title": "Paperwork",
+                                                  "description": "File the zeppelin permits"}).json()
+    try:
+        response = client.get("/tasks/search?q=zeppelins")
+        assert response.status_code == 200
+        hits = response.json()
+        # Stemmed match; title hits rank above description hits
+        assert [hit["id"] for hit in hits] == [in_title["id"], in_description["id"]]
+        assert hits[0]["title_highlight"] == "Quarterly <mark>zeppelin</mark> audit"
+        assert hits[0]["description_highlight"] is None
+        assert "<mark>zeppelin</mark>" in hits[1]["description_highlight"]
+        assert hits[0]["rank"] > hits[1]["rank"]
+
+        client.post(f"/tasks/{in_title['id']}/complete")
+        pending = client.get("/tasks/search?q=zeppelin&completed=false").json()
+        assert [hit["id"] for hit in pending] == [in_description["id"]]
+
+        assert client.get("/tasks/search?q=zeppelin -permits").json()[0]["id"] == in_title["id"]
+        assert client.get("/tasks/search?q=").status_code == 422
+    finally:
+        client.delete(f"/tasks/{in_title['id']}")
+        client.delete(f"/tasks/{in_description['id']}")
+
+def test_export_tasks_ndjson(client):
+    """Test streaming all tasks as NDJSON."""
+    response = client.get("/tasks/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    all_tasks = client.get("/tasks").json()
+    assert [task["id"] for task in exported] == sorted(task["id"] for task in all_tasks)
+    assert set(exported[0]) == set(all_tasks[0])
+
+def test_export_tasks_csv_filtered(client):
+    """Test streaming completed tasks as CSV."""
+    response = client.get("/tasks/export?format=csv&completed=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    lines = response.text.splitlines()
+    assert lines[0] == "id,title,description,due_date,priority,completed,created_at,updated_at"
+    completed_count = len(client.get("/tasks?completed=true").json())
+    assert len(lines) - 1 == completed_count
+
 def test_get_task_by_id(client):
     """Test getting a single task by ID."""
     # First get all tasks to get a valid ID
@@ -70,6 +234,20 @@ def test_get_task_by_id(client):
     assert response.status_code == 404
     assert response.json()["detail"] == "Task not found"
 
+def test_read_path_matches_response_model(client):
+    """Test that directly encoded reads keep the TaskResponse shape."""
+    from api.main import TaskResponse
+    created = client.post("/tasks", json={"title": "Encoded Task",
+                                          "due_date": "2030-01-02T03:04:05.123456"}).json()
+
+    task = client.get(f"/tasks/{created['id']}").json()
+    assert task == created
+    assert TaskResponse.model_validate(task).title == "Encoded Task"
+
+    listed = [t for t in client.get("/tasks").json() if t["id"] == created["id"]]
+    assert listed == [created]
+    client.delete(f"/tasks/{created['id']}")
+
 def test_create_task(client):
     """Test creating a new task."""
     task_data = {
@@ -109,6 +287,98 @@ def test_create_task_minimal(client):
     assert created_task["priority"] is None
     assert created_task["completed"] is False
 
+def test_create_tasks_bulk(client):
+    """Test creating several tasks in one request."""
+    tasks_data = [
+        {"title": f"Bulk Task {i}", "priority": "Low", "description": f"Bulk task number {i}"}
+        for i in range(5)
+    ]
+
+    # A chunk size of 2 spreads the batch over three INSERT statements
+    response = client.post("/tasks/bulk?chunk_size=2", json=tasks_data)
+    assert response.status_code == 201
+
+    created_tasks = response.json()
+    assert [task["title"] for task in created_tasks] == [task["title"] for task in tasks_data]
+    assert len({task["id"] for task in created_tasks}) == 5
+    for task in created_tasks:
+        assert task["completed"] is False
+        assert task["created_at"] is not None
+
+    # Verify the tasks were actually created
+    response = client.get(f"/tasks/{created_tasks[-1]['id']}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Bulk Task 4"
+
+def test_create_tasks_bulk_validation(client):
+    """Test that one invalid task rejects the whole batch."""
+    response = client.post("/tasks/bulk", json=[{"title": "Valid"}, {"title": ""}])
+    assert response.status_code == 422
+
+    response = client.post("/tasks/bulk", json=[])
+    assert response.status_code == 422
+
+def test_bulk_complete_overdue_tasks(client):
+    """Test completing every overdue pending task in one request."""
+    now = datetime.now(UTC)
+    overdue = client.post("/tasks/bulk", json=[
+        {"title": "Overdue Task 1", "due_date": (now - timedelta(days=2)).isoformat()},
+        {"title": "Overdue Task 2", "due_date": (now - timedelta(days=1)).isoformat()},
+    ]).json()
+    upcoming = client.post("/tasks", json={
+        "title": "Upcoming Task", "due_date": (now + timedelta(days=30)).isoformat()
+    }).json()
+
+    response = client.patch("/tasks", json={
+        "where": {"completed": False, "due_before": now.isoformat()},
+        "update": {"completed": True},
+    })
+    assert response.status_code == 200
+    result = response.json()
+    assert result["count"] == len(result["ids"])
+    assert {task["id"] for task in overdue} <= set(result["ids"])
+    assert upcoming["id"] not in result["ids"]
+
+    for task in overdue:
+        assert client.get(f"/tasks/{task['id']}").json()["completed"] is True
+    assert client.get(f"/tasks/{upcoming['id']}").json()["completed"] is False
+
+def test_bulk_update_by_ids(client):
+    """Test updating an explicit list of tasks."""
+    created = client.post("/tasks/bulk", json=[{"title": "Bulk Edit 1"}, {"title": "Bulk Edit 2"}]).json()
+    ids = [task["id"] for task in created]
+
+    response = client.patch("/tasks", json={"where": {"ids": ids}, "update": {"priority": "High"}})
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == sorted(ids)
+    for task_id in ids:
+        assert client.get(f"/tasks/{task_id}").json()["priority"] == "High"
+
+def test_bulk_update_requires_selection_and_fields(client):
+    """Test that bulk updates need a selection and something to set."""
+    response = client.patch("/tasks", json={"where": {}, "update": {"completed": True}})
+    assert response.status_code == 400
+
+    response = client.patch("/tasks", json={"where": {"ids": [1]}, "update": {}})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No fields to update"
+
+def test_bulk_delete_by_ids(client):
+    """Test deleting an explicit list of tasks."""
+    created = client.post("/tasks/bulk", json=[{"title": "Bulk Delete 1"}, {"title": "Bulk Delete 2"}]).json()
+    ids = [task["id"] for task in created]
+
+    response = client.request("DELETE", "/tasks", json={"ids": ids + [999999]})
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == sorted(ids)
+    assert response.json()["count"] == 2
+    for task_id in ids:
+        assert client.get(f"/tasks/{task_id}").status_code == 404
+
+    # Nothing selected: refuse rather than delete the whole table
+    response = client.request("DELETE", "/tasks", json={})
+    assert response.status_code == 400
+
 def test_update_task(client):
     """Test updating an existing task."""
     # First create a task to update
@@ -273,3 +543,197 @@ def test_mark_nonexistent_task_pending(client):
     response = client.post("/tasks/9999/pending")
     assert response.status_code == 404
     assert response.json()["detail"] == "Task not found"
+
+def test_cached_task_reflects_updates(client):
+    """Test that repeated reads are cached and writes invalidate them."""
+    response = client.post("/tasks", json={"title": "Hot Task"})
+    task_id = response.json()["id"]
+
+    before = client.get("/admin/cache").json()
+    assert before["enabled"] is True
+
+    client.get(f"/tasks/{task_id}")
+    client.get(f"/tasks/{task_id}")
+    after = client.get("/admin/cache").json()
+    assert after["hits"] >= before["hits"] + 1
+
+    client.put(f"/tasks/{task_id}", json={"title": "Hot Task Renamed"})
+    assert client.get(f"/tasks/{task_id}").json()["title"] == "Hot Task Renamed"
+
+    client.post(f"/tasks/{task_id}/complete")
+    assert client.get(f"/tasks/{task_id}").json()["completed"] is True
+
+    client.request("DELETE", "/tasks", json={"ids": [task_id]})
+    assert client.get(f"/tasks/{task_id}").status_code == 404
+
+def test_get_task_conditional(client):
+    """Test ETag / Last-Modified revalidation of a single task."""
+    task_id = client.post("/tasks", json={"title": "Conditional Task"}).json()["id"]
+
+    response = client.get(f"/tasks/{task_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    modified = response.headers["Last-Modified"]
+    response = client.get(f"/tasks/{task_id}", headers={"If-Modified-Since": modified})
+    assert response.status_code == 304
+
+    # A change produces a new ETag and a full response
+    client.put(f"/tasks/{task_id}", json={"title": "Conditional Task Changed"})
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    response = client.get("/tasks/999999", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+def test_get_tasks_conditional(client):
+    """Test ETag revalidation of a task listing."""
+    response = client.get("/tasks?completed=false")
+    etag = response.headers["ETag"]
+
+    response = client.get("/tasks?completed=false", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Paged listings validate the same way
+    page_etag = client.get("/tasks?limit=2").headers["ETag"]
+    assert client.get("/tasks?limit=2", headers={"If-None-Match": page_etag}).status_code == 304
+
+    client.post("/tasks", json={"title": "Invalidates Listing"})
+    response = client.get("/tasks?completed=false", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_get_tasks_page_etag_follows_rows(client):
+    """Test that a page ETag changes when a row on the page changes, even if updated_at is not returned."""
+    page = client.get("/tasks?fields=title&limit=2")
+    assert all(set(task) == {"id", "title"} for task in page.json())
+    etag = page.headers["ETag"]
+    assert client.get("/tasks?fields=title&limit=2", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/tasks/{page.json()[0]['id']}", json={"completed": True})
+    response = client.get("/tasks?fields=title&limit=2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_search_highlights_are_escaped(client):
+    """Test that highlights escape HTML in task text and only add <mark> tags."""
+    created = client.post("/tasks", json={"title": "<script>alert('zeppelin')</script>",
+                                          "description": "Fix the <b>zeppelin</b> & \"rig\""}).json()
+    try:
+        hit = next(hit for hit in client.get("/tasks/search?q=zeppelin").json() if hit["id"] == created["id"])
+        for highlight in (hit["title_highlight"], hit["description_highlight"]):
+            assert "<mark>zeppelin</mark>" in highlight
+            unmarked = highlight.replace("<mark>", "").replace("</mark>", "")
+            assert not set("<>\"'") & set(unmarked), highlight
+        assert "&gt;alert(&#39;<mark>zeppelin</mark>&#39;)&lt;" in hit["title_highlight"]
+        assert hit["title"] == "<script>alert('zeppelin')</script>"
+    finally:
+        client.delete(f"/tasks/{created['id']}")
+
+def test_update_task_if_match(client):
+    """Test that If-Match rejects stale writes."""
+    response = client.post("/tasks", json={"title": "Guarded Task"})
+    task_id = response.json()["id"]
+    etag = client.get(f"/tasks/{task_id}").headers["ETag"]
+
+    response = client.put(f"/tasks/{task_id}", json={"title": "First Writer"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    # The second writer still holds the old ETag
+    response = client.put(f"/tasks/{task_id}", json={"title": "Second Writer"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/tasks/{task_id}").json()["title"] == "First Writer"
+
+    response = client.put(f"/tasks/{task_id}", json={"title": "Second Writer"}, headers={"If-Match": new_etag})
+    assert response.status_code == 200
+
+    response = client.put("/tasks/999999", json={"title": "Missing"}, headers={"If-Match": "*"})
+    assert response.status_code == 404
+
+def test_pool_stats(client):
+    """Test that pool counters and wait histograms are exposed."""
+    response = client.get("/admin/pool")
+    assert response.status_code == 200
+    stats = response.json()
+    assert {"async", "sync"} <= set(stats)
+    assert "wait_histogram" in stats["sync"]
+    assert stats["sync"]["checked_out"] >= 0
+
+def test_slow_queries(client):
+    """Test that the slow-query summary is served and ranked."""
+    client.get("/tasks")
+    response = client.get("/admin/slow-queries", params={"limit": 5, "order": "count"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["enabled"] is True
+    assert len(body["statements"]) <= 5
+    counts = [entry["count"] for entry in body["statements"]]
+    assert counts == sorted(counts, reverse=True)
+    assert client.get("/admin/slow-queries", params={"order": "rows"}).status_code == 422
+
+def test_startup_report(client):
+    """Test that import time and lifespan phases are reported."""
+    report = client.get("/admin/startup").json()
+    assert report["import_ms"] > 0
+    assert report["startup_ms"] >= 0
+    assert set(report["phases"]) >= {"telemetry", "schema_migrate"}
+
+def test_consistency_token_routes_reads_to_replica(client, monkeypatch):
+    """Test that writes return a token and reads carrying it are served by a replica."""
+    import api.main
+
+    # The test database under a second address stands in for a replica
+    replica = create_async_engine(TEST_ASYNC_DATABASE_URL.replace("localhost", "127.0.0.1"), poolclass=NullPool)
+    router = ReplicaRouter([async_sessionmaker(replica, expire_on_commit=False)])
+    monkeypatch.setattr(api.main, "replicas", router)
+
+    created = client.post("/tasks", json={"title": "Read your writes"})
+    token = created.headers["X-Consistency-Token"]
+    task_id = created.json()["id"]
+    try:
+        response = client.get(f"/tasks/{task_id}", headers={"X-Consistency-Token": token})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Read your writes"
+        assert router.stats()["replica_reads"] == 1
+        bad = client.get(f"/tasks/{task_id}", headers={"X-Consistency-Token": "latest"})
+        assert bad.status_code == 400
+    finally:
+        deleted = client.delete(f"/tasks/{task_id}")
+        assert deleted.status_code == 204 and "X-Consistency-Token" in deleted.headers
+
+def test_no_consistency_token_without_replicas(client):
+    """Test that writes add no token, and no extra query, when no replicas are configured."""
+    created = client.post("/tasks", json={"title": "Primary only"})
+    assert "X-Consistency-Token" not in created.headers
+    client.delete(f"/tasks/{created.json()['id']}")
+
+def test_archived_tasks_only_with_include_archived(client, db_session):
+    """Test that an archived task is hidden from reads unless include_archived is set."""
+    task_id = client.post("/tasks", json={"title": "Archived long ago"}).json()["id"]
+    client.post(f"/tasks/{task_id}/complete")
+    db_session.query(Task).filter(Task.id == task_id).update({"updated_at": datetime(2000, 1, 1)})
+    db_session.commit()
+    try:
+        assert TaskRepository(db_session, task_cache).archive_tasks(datetime(2001, 1, 1)) == [task_id]
+        assert client.get(f"/tasks/{task_id}").status_code == 404
+        response = client.get(f"/tasks/{task_id}", params={"include_archived": True})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Archived long ago"
+        listed = client.get("/tasks", params={"completed": True, "fields": "title"}).json()
+        assert task_id not in [task["id"] for task in listed]
+        page = client.get("/tasks", params={"completed": True, "include_archived": True,
+                                            "sort": "created_at", "order": "desc", "limit": 10}).json()
+        assert task_id in [task["id"] for task in page]
+    finally:
+        db_session.query(ArchivedTask).filter(ArchivedTask.id == task_id).delete()
+        db_session.query(Task).filter(Task.id == task_id).delete()
+        db_session.commit()
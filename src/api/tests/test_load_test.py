@@ -0,0 +1,59 @@
+"""
+Tests for the load generator's latency histogram, mix parsing and cleanup.
+"""
+import argparse
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from api.benchmarks.load_test import DELETE_CHUNK_SIZE, LatencyHistogram, TaskPool, delete_created, parse_mix
+
+def test_percentiles_are_within_one_percent():
+    """Test that percentiles of 1..10000 ms stay within 1% of the exact values."""
+    histogram = LatencyHistogram()
+    for ms in range(1, 10001):
+        histogram.record(ms / 1000)
+    for pct, exact in ((50, 5000), (90, 9000), (99, 9900), (99.9, 9990)):
+        assert exact <= histogram.percentile(pct) <= exact * 1.01
+    assert histogram.percentile(100) == 10000
+
+def test_percentiles_of_empty_and_merged_histograms():
+    """Test an empty histogram and one merged from two halves."""
+    assert LatencyHistogram().percentile(99) == 0.0
+    low, high = LatencyHistogram(), LatencyHistogram()
+    for _ in range(99):
+        low.record(0.001)
+    high.record(0.5)
+    low.merge(high)
+    assert low.count == 100
+    assert low.percentile(99) == pytest.approx(1, rel=0.01)
+    assert low.percentile(100) == 500
+
+def test_parse_mix():
+    """Test weights, the default weight of 1, and rejected mixes."""
+    assert parse_mix("get=60,list=30.5,create") == {"get": 60, "list": 30.5, "create": 1}
+    assert parse_mix("get=1,") == {"get": 1}
+    for text in ("", "get=0", "fetch=10"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix(text)
+
+def test_cleanup_deletes_in_chunks_and_reports_failures():
+    """Test that created tasks are deleted at most DELETE_CHUNK_SIZE at a time and failures raise."""
+    requests = []
+
+    def handler(request):
+        ids = json.loads(request.content)["ids"]
+        requests.append(len(ids))
+        return httpx.Response(500 if len(requests) == 2 else 200, json={"count": len(ids), "ids": ids})
+
+    async def cleanup():
+        pool = TaskPool([])
+        pool.created = list(range(DELETE_CHUNK_SIZE * 2 + 5))
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            await delete_created(client, pool)
+
+    with pytest.raises(RuntimeError, match="10000 ids: 500"):
+        asyncio.run(cleanup())
+    assert requests == [DELETE_CHUNK_SIZE, DELETE_CHUNK_SIZE, 5]
@@ -0,0 +1,107 @@
+"""
+Tests for the Prometheus metrics registry and GET /metrics.
+"""
+import asyncio
+import subprocess
+import sys
+import threading
+
+from api.metrics import (Counter, Gauge, Histogram, LATENCY_BUDGET_SECONDS, MetricsMiddleware,
+                         MultiprocessMetrics, Registry, REQUESTS_OVER_BUDGET)
+
+def sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with ``prefix``."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not found")
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets render cumulatively with sum and count."""
+    registry = Registry()
+    histogram = registry.register(Histogram("latency", "Test latency.", ("route",), (0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("/tasks",), value)
+    text = registry.render()
+    assert "# TYPE latency histogram" in text
+    assert sample(text, 'latency_bucket{route="/tasks",le="0.1"}') == 2
+    assert sample(text, 'latency_bucket{route="/tasks",le="1"}') == 3
+    assert sample(text, 'latency_bucket{route="/tasks",le="+Inf"}') == 4
+    assert sample(text, 'latency_count{route="/tasks"}') == 4
+    assert sample(text, 'latency_sum{route="/tasks"}') == 3.65
+
+def test_counter_merges_thread_shards():
+    """Test that increments from many threads are all counted."""
+    counter = Counter("hits", "Test hits.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("a",))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(("a",))
+    assert counter.value(("a",)) == 8001
+
+def test_label_values_are_escaped():
+    """Test that quotes and backslashes in label values are escaped."""
+    counter = Counter("odd", "Odd labels.", ("value",))
+    counter.inc(('say "hi"\\',))
+    assert 'odd{value="say \\"hi\\"\\\\"} 1' in "\n".join(counter.render())
+
+def test_slow_requests_count_against_budget():
+    """Test that a request slower than the budget increments the over-budget counter."""
+    async def app(scope, receive, send):
+        await asyncio.sleep(LATENCY_BUDGET_SECONDS + 0.01)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        pass
+
+    before = REQUESTS_OVER_BUDGET.value(("GET", "unmatched"))
+    asyncio.run(MetricsMiddleware(app)({"type": "http", "method": "GET"}, None, send))
+    assert REQUESTS_OVER_BUDGET.value(("GET", "unmatched")) == before + 1
+
+def test_worker_samples_are_summed(tmp_path):
+    """Test that a shared directory merges workers, keeping an exited worker's counters but not its gauges."""
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    in_flight = registry.register(Gauge("in_flight", "In flight."))
+    latency = registry.register(Histogram("latency", "Latency.", (), (0.1,)))
+    requests.inc(("/tasks",), 2)
+    in_flight.inc()
+    latency.observe((), 0.05)
+
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    (tmp_path / f"{exited.pid}.prom").write_text(registry.render())
+
+    text = MultiprocessMetrics(registry, str(tmp_path)).render()
+    assert sample(text, 'requests_total{route="/tasks"}') == 4
+    assert sample(text, "in_flight") == 1
+    assert sample(text, 'latency_bucket{le="0.1"}') == 2
+    assert sample(text, "latency_sum") == 0.1
+    assert text.count("# TYPE requests_total counter") == 1
+
+def test_metrics_endpoint(client):
+    """Test that GET /metrics exposes request, repository and pool metrics."""
+    created = client.post("/tasks", json={"title": "Metrics task"}).json()
+    client.get(f"/tasks/{created['id']}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, 'taskmgr_http_request_duration_seconds_count{method="GET",route="/tasks/{task_id}",'
+                        'status="200"}') >= 1
+    assert sample(text, 'taskmgr_db_operation_duration_seconds_count{operation="create_task",'
+                        'repository="async"}') >= 1
+    assert sample(text, 'taskmgr_db_rows_total{operation="create_task",repository="async"}') >= 1
+    assert sample(text, "taskmgr_http_requests_in_flight") >= 1
+    assert 'taskmgr_db_pool_size{engine="async"}' in text
+    assert 'taskmgr_db_pool_checkout_wait_seconds_bucket{engine="async",le="+Inf"}' in text
+
+    client.delete(f"/tasks/{created['id']}")
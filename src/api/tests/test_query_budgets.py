@@ -0,0 +1,94 @@
+"""
+Per-route budgets for SQL statements and database time.
+
+Each case makes one request against the ASGI app and fails if it runs
+more statements than its budget. A change that adds a round trip to a
+route has to raise the budget here.
+
+Database time depends on the machine and its load, so time budgets only
+fail the test when ``QUERY_BUDGET_TIME_FACTOR`` is set; every budget is
+multiplied by it (1 on a quiet machine, more on shared CI). Without it an
+overrun is reported as a warning.
+"""
+import os
+import warnings
+
+import pytest
+
+# Multiplier for the DB time budgets; 0 (the default) only warns on an overrun
+TIME_FACTOR = float(os.getenv("QUERY_BUDGET_TIME_FACTOR", "0"))
+
+def no_options(client, task):
+    return {}
+
+def if_none_match(url):
+    """Request options sending back the current ETag of ``url``."""
+    def options(client, task):
+        return {"headers": {"If-None-Match": client.get(url.format(id=task["id"])).headers["ETag"]}}
+    return options
+
+def if_match(client, task):
+    return {"headers": {"If-Match": client.get(f"/tasks/{task['id']}").headers["ETag"]}}
+
+def body(value):
+    return lambda client, task: {"json": value(task) if callable(value) else value}
+
+# name -> (method, url, request options(client, task), statement budget, DB time budget in ms).
+# Options are built before measuring, so looking up an ETag does not count.
+BUDGETS = {
+    "list": ("GET", "/tasks", no_options, 1, 50),
+    "list_fields": ("GET", "/tasks?fields=title", no_options, 1, 50),
+    "list_page": ("GET", "/tasks?limit=20", no_options, 1, 50),
+    "list_sorted_page": ("GET", "/tasks?limit=20&sort=due_date&order=desc", no_options, 1, 50),
+    "list_not_modified": ("GET", "/tasks?limit=20", if_none_match("/tasks?limit=20"), 1, 50),
+    "list_all_not_modified": ("GET", "/tasks", if_none_match("/tasks"), 1, 50),
+    "stats": ("GET", "/tasks/stats", no_options, 1, 50),
+    "search": ("GET", "/tasks/search?q=budget", no_options, 1, 100),
+    "export": ("GET", "/tasks/export", no_options, 1, 100),
+    "get": ("GET", "/tasks/{id}", no_options, 1, 20),
+    "get_not_modified": ("GET", "/tasks/{id}", if_none_match("/tasks/{id}"), 1, 20),
+    # A live task is found before the archive is consulted
+    "get_include_archived": ("GET", "/tasks/{id}?include_archived=true", no_options, 1, 20),
+    "list_page_include_archived": ("GET", "/tasks?limit=20&include_archived=true", no_options, 1, 100),
+    "create": ("POST", "/tasks", body({"title": "Budget created"}), 1, 20),
+    "create_bulk": ("POST", "/tasks/bulk", body([{"title": f"Budget bulk {n}"} for n in range(10)]), 1, 50),
+    "update": ("PUT", "/tasks/{id}", body({"title": "Budget renamed"}), 1, 20),
+    "update_if_match": ("PUT", "/tasks/{id}",
+                        lambda client, task: {**if_match(client, task), "json": {"priority": "High"}}, 1, 20),
+    "complete": ("POST", "/tasks/{id}/complete", no_options, 1, 20),
+    "pending": ("POST", "/tasks/{id}/pending", no_options, 1, 20),
+    "bulk_update": ("PATCH", "/tasks", body(lambda task: {"where": {"ids": [task["id"]]},
+                                                          "update": {"priority": "Low"}}), 1, 20),
+    "delete": ("DELETE", "/tasks/{id}", no_options, 1, 20),
+    "bulk_delete": ("DELETE", "/tasks", body(lambda task: {"ids": [task["id"]]}), 1, 20),
+    "cache": ("GET", "/admin/cache", no_options, 0, 0),
+    "pool": ("GET", "/admin/pool", no_options, 0, 0),
+    "startup": ("GET", "/admin/startup", no_options, 0, 0),
+    "replicas": ("GET", "/admin/replicas", no_options, 0, 0),
+    "metrics": ("GET", "/metrics", no_options, 0, 0),
+}
+
+@pytest.mark.parametrize("name", BUDGETS)
+def test_route_query_budget(client, query_counter, name):
+    """Test that a route stays within its statement and DB time budget."""
+    method, url, options, max_statements, max_ms = BUDGETS[name]
+    task = client.post("/tasks", json={"title": "Budget task", "description": "budget probe"}).json()
+    created = []
+    try:
+        kwargs = options(client, task)
+        with query_counter.measure() as queries:
+            response = client.request(method, url.format(id=task["id"]), **kwargs)
+        assert response.status_code < 400, response.text
+        if method == "POST" and url.startswith("/tasks/bulk"):
+            created = [item["id"] for item in response.json()]
+        elif method == "POST" and url == "/tasks":
+            created = [response.json()["id"]]
+        statements = "\n".join(statement for statement, _ in queries.statements)
+        assert queries.count <= max_statements, f"{name} ran {queries.count} statements:\n{statements}"
+        budget_ms = max_ms * (TIME_FACTOR or 1)
+        if queries.duration_ms > budget_ms:
+            message = f"{name} spent {queries.duration_ms:.1f} ms in the database (budget {budget_ms:g} ms)"
+            assert not TIME_FACTOR, message
+            warnings.warn(message)
+    finally:
+        client.request("DELETE", "/tasks", json={"ids": [task["id"], *created]})
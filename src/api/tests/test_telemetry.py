@@ -0,0 +1,85 @@
+"""
+Tests for the opt-in OpenTelemetry instrumentation.
+"""
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from api.config import Settings
+from api.instrumentation import row_count
+from api.telemetry import setup_telemetry
+from db.repository import TaskRepository
+
+@pytest.fixture
+def telemetry_factory():
+    """Build telemetry with in-memory exporters and shut it down afterwards."""
+    installed = []
+
+    def build(**overrides):
+        # Keep every trace and SQL span unless a test asks otherwise
+        settings = Settings(**{"TELEMETRY_ENABLED": True, "TELEMETRY_SAMPLE_RATE": 1.0,
+                               "TELEMETRY_SQL_SPANS": True, **overrides})
+        spans, metrics = InMemorySpanExporter(), InMemoryMetricReader()
+        telemetry = setup_telemetry(settings, span_exporter=spans, metric_reader=metrics)
+        installed.append(telemetry)
+        return telemetry, spans, metrics
+
+    yield build
+    for telemetry in installed:
+        telemetry.shutdown()
+
+def recorded_operations(reader):
+    """Repository method names with duration measurements."""
+    operations = set()
+    for resource_metrics in reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name == "taskmgr.db.operation.duration":
+                    operations.update(point.attributes["db.operation"] for point in metric.data.data_points)
+    return operations
+
+def test_disabled_by_default():
+    """Test that nothing is installed unless TELEMETRY_ENABLED is set."""
+    original = TaskRepository.get_all_tasks
+    assert setup_telemetry(Settings(TELEMETRY_ENABLED=False)) is None
+    assert TaskRepository.get_all_tasks is original
+
+def test_repository_spans_carry_row_counts(db_session, telemetry_factory):
+    """Test that repository methods get spans with db.rows and a duration metric."""
+    telemetry, spans, metrics = telemetry_factory()
+    repo = TaskRepository(db_session)
+    task = repo.create_task(title="Traced task")
+    repo.get_task_by_id(task.id)
+    rows = list(repo.stream_tasks())
+    repo.delete_task(task.id)
+    telemetry.tracer_provider.force_flush()
+
+    finished = {span.name: span for span in spans.get_finished_spans()}
+    assert finished["TaskRepository.create_task"].attributes["db.rows"] == 1
+    assert finished["TaskRepository.stream_tasks"].attributes["db.rows"] == len(rows)
+    assert finished["TaskRepository.delete_task"].attributes["db.operation"] == "delete_task"
+    assert {"create_task", "get_task_by_id", "stream_tasks", "delete_task"} <= recorded_operations(metrics)
+
+def test_sampling_drops_traces_but_keeps_metrics(db_session, telemetry_factory):
+    """Test that a zero sample rate records no spans while durations are still measured."""
+    telemetry, spans, metrics = telemetry_factory(TELEMETRY_SAMPLE_RATE=0.0)
+    TaskRepository(db_session).get_tasks_version()
+    telemetry.tracer_provider.force_flush()
+    assert spans.get_finished_spans() == ()
+    assert "get_tasks_version" in recorded_operations(metrics)
+
+def test_shutdown_restores_repository(telemetry_factory):
+    """Test that shutdown removes the method wrappers."""
+    original = TaskRepository.get_all_tasks
+    telemetry, _, _ = telemetry_factory()
+    assert TaskRepository.get_all_tasks is not original
+    telemetry.shutdown()
+    assert TaskRepository.get_all_tasks is original
+
+def test_row_count():
+    """Test how repository results map to db.rows."""
+    assert row_count(None) == 0
+    assert row_count(True) == 1
+    assert row_count([1, 2, 3]) == 3
+    assert row_count(([1, 2], "cursor")) == 2
+    assert row_count({"total": 5}) == 1
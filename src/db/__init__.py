@@ -1,7 +1,7 @@
 """
 Database package for the Task Manager application.
 """
-from .database import init_db, get_db, db_session
+from .database import init_db, get_db, get_async_db, db_session
 from .models import Task, PriorityLevel
 
-__all__ = ["init_db", "get_db", "db_session", "Task", "PriorityLevel"]
+__all__ = ["init_db", "get_db", "get_async_db", "db_session", "Task", "PriorityLevel"]
@@ -0,0 +1,77 @@
+"""
+Move long-completed tasks out of ``tasks`` into ``tasks_archive``.
+
+A task qualifies once it is completed and has not been updated for
+``--older-than-days`` days (marking a task completed sets ``updated_at``).
+Tasks move in batches of ``--batch-size``, one short transaction each, so
+row locks are held briefly and rows a request is writing are skipped
+rather than waited for. ``--pause`` sleeps between batches to spread the
+load on a busy database. Safe to run repeatedly, e.g. nightly from cron.
+
+Archived tasks keep their ids and are read-only. Reads leave them out
+unless asked (``include_archived``), so ``tasks`` and its indexes only
+carry the working set.
+
+The job drops archived tasks from the task cache it can reach, which is
+only the shared one (``TASK_CACHE_URL=redis://...``). It cannot reach the
+in-process cache of a running API process (the default for a single
+worker; ``server.py`` turns it off for several): that process keeps
+serving an archived task it had cached from ``GET /tasks/{id}`` for up to
+``TASK_CACHE_TTL`` seconds (default 30) after the move, while ``PUT``,
+``DELETE`` and the complete/pending routes already answer 404 for it.
+Use a shared cache, or accept that window, when archiving under traffic.
+
+Usage (from ``src/``)::
+
+    python -m db.archive --older-than-days 90 --batch-size 1000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Optional
+
+from .cache import task_cache
+from .repository import ARCHIVE_BATCH_SIZE, TaskRepository
+
+# Completed tasks untouched for this long are archived
+ARCHIVE_AFTER_DAYS = 90
+
+def archive_completed(session_factory: Callable, older_than: timedelta,
+                      batch_size: int = ARCHIVE_BATCH_SIZE, pause: float = 0.0,
+                      max_batches: Optional[int] = None) -> dict:
+    """Archive qualifying tasks batch by batch until none are left; returns totals."""
+    started = time.perf_counter()
+    before = datetime.now(UTC) - older_than
+    archived = batches = 0
+    with session_factory() as session:
+        repo = TaskRepository(session, task_cache)
+        while max_batches is None or batches < max_batches:
+            ids = repo.archive_tasks(before, batch_size)
+            if not ids:
+                break
+            archived += len(ids)
+            batches += 1
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    return {"archived": archived, "batches": batches, "before": before.isoformat(),
+            "seconds": round(time.perf_counter() - started, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--older-than-days", type=float, default=ARCHIVE_AFTER_DAYS,
+                        help="archive tasks completed and untouched for this many days")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="tasks moved per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    args = parser.parse_args()
+
+    from .database import SessionLocal
+    result = archive_completed(SessionLocal, timedelta(days=args.older_than_days), args.batch_size,
+                               args.pause, args.max_batches)
+    print(f"Archived {result['archived']} tasks completed before {result['before']} "
+          f"in {result['batches']} batches ({result['seconds']:.1f}s)")
+
+if __name__ == "__main__":
+    main()
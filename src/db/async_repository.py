@@ -0,0 +1,240 @@
+"""
+Async repository module for database operations.
+"""
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime, UTC
+from sqlalchemy import select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import ArchivedTask, Task, PriorityLevel
+from .cache import TaskCache, restore
+from .records import TaskRecord, TaskSearchRecord, RECORD_COLUMNS, projection, to_records
+from .pagination import SortKey, build_page_query, split_page
+from .repository import (STREAM_BATCH_SIZE, BULK_CHUNK_SIZE, ARCHIVE_BATCH_SIZE, build_stream_query,
+                         build_create, build_update, build_delete, build_version_query,
+                         build_records_query, build_search_query, SEARCH_LIMIT,
+                         build_stats_query, stats_from_row,
+                         build_bulk_insert, build_bulk_update, build_bulk_delete,
+                         build_archived_query, build_archived_record_query, build_archive_batch,
+                         restore_archived)
+
+class AsyncTaskRepository:
+    """Repository for Task operations over an AsyncSession.
+
+    Mirrors TaskRepository method for method so callers can switch between
+    the two by adding or dropping ``await``.
+    """
+
+    def __init__(self, db_session: AsyncSession, cache: Optional[TaskCache] = None):
+        self.db_session = db_session
+        self.cache = cache
+
+    async def _cached(self, method, *args):
+        """Call a cache method, in a worker thread when its backend waits on the network."""
+        if self.cache.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _invalidate(self, task_ids) -> None:
+        if self.cache is not None and task_ids:
+            await self._cached(self.cache.invalidate, task_ids)
+
+    async def get_all_tasks(self, include_archived: bool = False) -> List[Task]:
+        """Get all tasks; archived tasks follow as detached Tasks when asked for."""
+        result = await self.db_session.scalars(select(Task))
+        tasks = list(result.all())
+        if include_archived:
+            tasks += map(restore_archived, await self.db_session.scalars(build_archived_query()))
+        return tasks
+
+    async def get_task_by_id(self, task_id: int, include_archived: bool = False) -> Optional[Task]:
+        """Get a task by ID, through the cache when one is configured (archived ones never are)."""
+        if self.cache is not None:
+            values, since = await self._cached(self.cache.lookup, task_id)
+            if values is not None:
+                return restore(values)
+        result = await self.db_session.scalars(select(Task).where(Task.id == task_id))
+        task = result.first()
+        if task is not None and self.cache is not None:
+            await self._cached(self.cache.set, task, since)
+        if task is None and include_archived:
+            archived = await self.db_session.get(ArchivedTask, task_id)
+            task = restore_archived(archived) if archived is not None else None
+        return task
+
+    async def get_task_version(self, task_id: int, include_archived: bool = False) -> Optional[datetime]:
+        """Get a task's ``updated_at`` without loading the row, or None if missing."""
+        if self.cache is not None:
+            task = await self._cached(self.cache.get, task_id)
+            if task is not None:
+                return task.updated_at
+        version = await self.db_session.scalar(select(Task.updated_at).where(Task.id == task_id))
+        if version is None and include_archived:
+            version = await self.db_session.scalar(
+                select(ArchivedTask.updated_at).where(ArchivedTask.id == task_id))
+        return version
+
+    async def get_tasks_version(self, completed: Optional[bool] = None,
+                                include_archived: bool = False) -> Tuple[Optional[datetime], int]:
+        """Get ``(max(updated_at), count)`` for a listing, to validate it cheaply."""
+        result = await self.db_session.execute(build_version_query(completed, include_archived))
+        latest, count = result.one()
+        return latest, count
+
+    async def get_stats(self) -> dict:
+        """Count tasks by status and priority, plus overdue and due-this-week."""
+        if self.cache is not None:
+            stats, since = await self._cached(self.cache.lookup_stats)
+            if stats is not None:
+                return stats
+        result = await self.db_session.execute(build_stats_query(datetime.now(UTC)))
+        stats = stats_from_row(result.one())
+        if self.cache is not None:
+            await self._cached(self.cache.set_stats, stats, since)
+        return stats
+
+    async def get_tasks_by_status(self, completed: bool, include_archived: bool = False) -> List[Task]:
+        """Get tasks by completion status; archived ones too when asked for."""
+        result = await self.db_session.scalars(select(Task).where(Task.completed == completed))
+        tasks = list(result.all())
+        if include_archived:
+            tasks += map(restore_archived, await self.db_session.scalars(build_archived_query(completed)))
+        return tasks
+
+    async def get_task_records(self, completed: Optional[bool] = None,
+                               fields: Optional[Tuple[str, ...]] = None,
+                               sort: Optional[SortKey] = None, descending: bool = False,
+                               include_archived: bool = False) -> List[TaskRecord]:
+        """Get all tasks as read-only records, optionally limited to ``fields`` and sorted."""
+        record, columns = projection(fields)
+        result = await self.db_session.execute(
+            build_records_query(completed, columns, sort, descending, include_archived))
+        return to_records(result.tuples(), record)
+
+    async def get_task_record(self, task_id: int, include_archived: bool = False) -> Optional[TaskRecord]:
+        """Get one task as a read-only record, through the cache when configured (archived ones never are)."""
+        if self.cache is not None:
+            values, since = await self._cached(self.cache.lookup, task_id)
+            if values is not None:
+                return TaskRecord(**values)
+        result = await self.db_session.execute(select(*RECORD_COLUMNS).where(Task.id == task_id))
+        records = to_records(result.tuples())
+        if records and self.cache is not None:
+            await self._cached(self.cache.set, records[0], since)
+        if not records and include_archived:
+            result = await self.db_session.execute(build_archived_record_query(task_id))
+            records = to_records(result.tuples())
+        return records[0] if records else None
+
+    async def get_task_records_page(self, limit: int, cursor: Optional[str] = None,
+                                    completed: Optional[bool] = None,
+                                    fields: Optional[Tuple[str, ...]] = None,
+                                    sort: Optional[SortKey] = None,
+                                    descending: bool = False,
+                                    include_archived: bool = False) -> Tuple[List[TaskRecord], Optional[str]]:
+        """Get one keyset page of read-only records and the next cursor."""
+        record, columns = projection(fields)
+        result = await self.db_session.execute(
+            build_page_query(limit, cursor, completed, columns, sort, descending, include_archived))
+        rows, next_cursor = split_page(result.all(), limit, sort, descending)
+        return to_records(rows, record), next_cursor
+
+    async def search_tasks(self, text: str, completed: Optional[bool] = None,
+                           limit: int = SEARCH_LIMIT) -> List[TaskSearchRecord]:
+        """Full-text search over title and description, best matches first."""
+        result = await self.db_session.execute(build_search_query(text, completed, limit))
+        return to_records(result.tuples(), TaskSearchRecord)
+
+    async def get_tasks_page(self, limit: int, cursor: Optional[str] = None,
+                             completed: Optional[bool] = None) -> Tuple[List[Task], Optional[str]]:
+        """Get one keyset page of tasks and the cursor for the next page."""
+        result = await self.db_session.scalars(build_page_query(limit, cursor, completed))
+        return split_page(list(result.all()), limit)
+
+    async def stream_tasks(self, completed: Optional[bool] = None,
+                           batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[RowMapping]:
+        """Stream task rows from a server-side cursor, ``batch_size`` at a time."""
+        result = await self.db_session.stream(build_stream_query(completed).execution_options(yield_per=batch_size))
+        async for row in result.mappings():
+            yield row
+
+    async def get_tasks_by_priority(self, priority: PriorityLevel) -> List[Task]:
+        """Get tasks by priority."""
+        result = await self.db_session.scalars(select(Task).where(Task.priority == priority))
+        return list(result.all())
+
+    async def create_task(self, title: str, description: Optional[str] = None,
+                          due_date: Optional[datetime] = None,
+                          priority: Optional[PriorityLevel] = None) -> Task:
+        """Create a new task with a single INSERT ... RETURNING."""
+        result = await self.db_session.scalars(build_create(title, description, due_date, priority))
+        task = result.one()
+        await self.db_session.commit()
+        await self._invalidate([task.id])
+        return task
+
+    async def create_tasks_bulk(self, tasks: List[dict],
+                                chunk_size: int = BULK_CHUNK_SIZE) -> List[Task]:
+        """Create many tasks in one transaction, one INSERT per chunk."""
+        statement, rows = build_bulk_insert(tasks, chunk_size)
+        result = await self.db_session.scalars(statement, rows)
+        created = list(result.all())
+        await self.db_session.commit()
+        await self._invalidate([task.id for task in created])
+        return created
+
+    async def update_task(self, task_id: int, if_updated_at: Optional[datetime] = None,
+                          **kwargs) -> Optional[Task]:
+        """Update a task with a single UPDATE ... RETURNING, optionally conditional."""
+        statement = build_update(task_id, kwargs, if_updated_at)
+        if statement is None:
+            task = await self.get_task_by_id(task_id)
+            if task is not None and if_updated_at is not None and task.updated_at != if_updated_at:
+                return None
+            return task
+        result = await self.db_session.scalars(statement)
+        task = result.first()
+        await self.db_session.commit()
+        if task is not None:
+            await self._invalidate([task.id])
+        return task
+
+    async def delete_task(self, task_id: int) -> bool:
+        """Delete a task with a single DELETE ... RETURNING."""
+        deleted_id = await self.db_session.scalar(build_delete(task_id))
+        await self.db_session.commit()
+        await self._invalidate([task_id])
+        return deleted_id is not None
+
+    async def update_tasks(self, values: dict, **criteria) -> List[int]:
+        """Update every task matching ``criteria`` in one statement."""
+        result = await self.db_session.scalars(build_bulk_update(values, **criteria))
+        ids = list(result.all())
+        await self.db_session.commit()
+        await self._invalidate(ids)
+        return ids
+
+    async def delete_tasks(self, **criteria) -> List[int]:
+        """Delete every task matching ``criteria`` in one statement."""
+        result = await self.db_session.scalars(build_bulk_delete(**criteria))
+        ids = list(result.all())
+        await self.db_session.commit()
+        await self._invalidate(ids)
+        return ids
+
+    async def archive_tasks(self, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> List[int]:
+        """Move one batch of long-completed tasks to the archive and commit; returns their ids."""
+        result = await self.db_session.scalars(build_archive_batch(before, batch_size))
+        ids = list(result.all())
+        await self.db_session.commit()
+        await self._invalidate(ids)
+        return ids
+
+    async def mark_task_completed(self, task_id: int) -> Optional[Task]:
+        """Mark a task as completed."""
+        return await self.update_task(task_id, completed=True)
+
+    async def mark_task_pending(self, task_id: int) -> Optional[Task]:
+        """Mark a task as pending."""
+        return await self.update_task(task_id, completed=False)
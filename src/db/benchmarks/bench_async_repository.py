@@ -0,0 +1,96 @@
+"""
+Benchmark: blocking TaskRepository vs AsyncTaskRepository inside an event loop.
+
+Simulates ``async def`` request handlers running on one uvicorn worker. In
+``sync`` mode each handler calls the blocking repository directly, which is
+what the API did before it moved to AsyncSession: every query stalls the
+loop, so concurrent handlers run one after another. In ``async`` mode the
+handlers await AsyncTaskRepository and their queries overlap.
+
+Usage (from ``src/``, with the database running)::
+
+    python -m db.benchmarks.bench_async_repository --rate 500 --requests 2000
+    python -m db.benchmarks.bench_async_repository --slow-ms 50   # one slow query in 20
+"""
+import argparse
+import asyncio
+import json
+import random
+from sqlalchemy import text
+
+from db.database import SessionLocal, AsyncSessionLocal, async_engine
+from db.repository import TaskRepository
+from db.async_repository import AsyncTaskRepository
+from db.benchmarks.common import summarize
+
+SLOW_QUERY_EVERY = 20
+
+def sync_request(task_id: int, slow_seconds: float) -> None:
+    """One request handled with the blocking repository."""
+    db = SessionLocal()
+    try:
+        if slow_seconds:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": slow_seconds})
+        TaskRepository(db).get_task_by_id(task_id)
+    finally:
+        db.close()
+
+async def async_request(task_id: int, slow_seconds: float) -> None:
+    """One request handled with the async repository."""
+    async with AsyncSessionLocal() as db:
+        if slow_seconds:
+            await db.execute(text("SELECT pg_sleep(:s)"), {"s": slow_seconds})
+        await AsyncTaskRepository(db).get_task_by_id(task_id)
+
+async def run_mode(mode: str, task_ids, rate: float, requests: int, slow_ms: float) -> dict:
+    """Issue ``requests`` handlers at ``rate`` per second (open loop).
+
+    Latency is measured from each request's scheduled arrival, so time spent
+    queued behind a blocked event loop counts against it.
+    """
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async def handle(n: int, arrival: float):
+        task_id = random.choice(task_ids)
+        slow = slow_ms / 1000 if slow_ms and n % SLOW_QUERY_EVERY == 0 else 0
+        if mode == "sync":
+            # Deliberately blocks the loop, like a sync call in an async def
+            sync_request(task_id, slow)
+        else:
+            await async_request(task_id, slow)
+        latencies.append(loop.time() - arrival)
+
+    start = loop.time()
+    handlers = []
+    for n in range(requests):
+        arrival = start + n / rate
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        handlers.append(asyncio.create_task(handle(n, arrival)))
+    await asyncio.gather(*handlers)
+    elapsed = loop.time() - start
+    await async_engine.dispose()
+    return {"mode": mode, "requests_per_sec": requests / elapsed, **summarize(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=500, help="arrivals per second")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--slow-ms", type=float, default=0,
+                        help="add a pg_sleep of this length to one request in %d" % SLOW_QUERY_EVERY)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        task_ids = [task.id for task in TaskRepository(db).get_all_tasks()]
+    finally:
+        db.close()
+    if not task_ids:
+        raise SystemExit("No tasks in the database to benchmark against")
+
+    for mode in ("sync", "async"):
+        result = asyncio.run(run_mode(mode, task_ids, args.rate, args.requests, args.slow_ms))
+        print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
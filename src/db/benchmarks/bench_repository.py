@@ -0,0 +1,133 @@
+"""
+Benchmark suite: every TaskRepository method at realistic table sizes.
+
+For each size, tasks are bulk-loaded (server-side generate_series, then
+committed), every repository method is timed with a fresh session per
+call like a request would use, and the seeded rows are removed again.
+Results (p50/p95/p99, peak allocations, the spec's 200 ms budget at up to
+1,000 rows) are written as JSON for ``db.benchmarks.compare``.
+
+Usage (from ``src/``, against a development database)::
+
+    python -m db.benchmarks.bench_repository
+    python -m db.benchmarks.bench_repository --sizes 1000 --iterations 50 --only search page
+"""
+import argparse
+import random
+from typing import List
+
+from db.database import SessionLocal
+from db.models import PriorityLevel
+from db.cache import TaskCache
+from db.pagination import SortKey, encode_cursor
+from db.records import select_fields
+from db.repository import TaskRepository
+from db.benchmarks.common import (Case, add_suite_arguments, case_iterations, print_result,
+                                  run_case, seeded_tasks, selected, write_results)
+
+LIST_FIELDS = select_fields(["title", "due_date", "priority", "completed"])
+
+def repository_call(method, cache=None):
+    """Wrap ``method(repository, args)`` in a per-call session."""
+    def run(args):
+        with SessionLocal() as db:
+            return method(TaskRepository(db, cache), args)
+    return run
+
+def new_task_ids(count: int):
+    """Setup helper: create ``count`` tasks to be deleted by the timed call."""
+    def setup():
+        with SessionLocal() as db:
+            tasks = TaskRepository(db).create_tasks_bulk(
+                [{"title": "bench delete me"} for _ in range(count)])
+            return [task.id for task in tasks]
+    return setup
+
+def build_cases(first: int, rows: int) -> List[Case]:
+    """All repository cases against ``rows`` seeded tasks numbered from ``first``."""
+    rng = random.Random(0)
+
+    def pick():
+        return rng.randint(first, first + rows - 1)
+
+    def picks(count=10):
+        return lambda: [pick() for _ in range(count)]
+
+    def deep_cursor():
+        return encode_cursor({"id": first + rows // 2})
+
+    hot_ids = [pick() for _ in range(100)]
+    cache = TaskCache(ttl=3600)
+    return [
+        # Single-row reads
+        Case("get_task_by_id", repository_call(lambda r, task_id: r.get_task_by_id(task_id)), pick),
+        Case("get_task_by_id[cached]",
+             repository_call(lambda r, task_id: r.get_task_by_id(task_id), cache),
+             lambda: rng.choice(hot_ids)),
+        Case("get_task_record", repository_call(lambda r, task_id: r.get_task_record(task_id)), pick),
+        Case("get_task_version", repository_call(lambda r, task_id: r.get_task_version(task_id)), pick),
+        # Aggregates
+        Case("get_tasks_version", repository_call(lambda r, _: r.get_tasks_version())),
+        Case("get_tasks_version[pending]", repository_call(lambda r, _: r.get_tasks_version(False))),
+        Case("get_stats", repository_call(lambda r, _: r.get_stats())),
+        # Pages and search
+        Case("get_tasks_page", repository_call(lambda r, _: r.get_tasks_page(100))),
+        Case("get_task_records_page", repository_call(lambda r, _: r.get_task_records_page(100))),
+        Case("get_task_records_page[deep]",
+             repository_call(lambda r, cursor: r.get_task_records_page(100, cursor)), deep_cursor),
+        Case("get_task_records_page[fields]",
+             repository_call(lambda r, _: r.get_task_records_page(100, fields=LIST_FIELDS))),
+        Case("get_task_records_page[pending,priority desc]",
+             repository_call(lambda r, _: r.get_task_records_page(
+                 100, completed=False, sort=SortKey.PRIORITY, descending=True))),
+        Case("get_task_records_page[due_date]",
+             repository_call(lambda r, _: r.get_task_records_page(100, sort=SortKey.DUE_DATE))),
+        Case("search_tasks[rare]", repository_call(lambda r, _: r.search_tasks("zeppelin"))),
+        Case("search_tasks[two words]", repository_call(lambda r, _: r.search_tasks("deploy budget"))),
+        # Whole-table reads
+        Case("get_all_tasks", repository_call(lambda r, _: r.get_all_tasks()), full_scan=True),
+        Case("get_tasks_by_status", repository_call(lambda r, _: r.get_tasks_by_status(False)),
+             full_scan=True),
+        Case("get_tasks_by_priority",
+             repository_call(lambda r, _: r.get_tasks_by_priority(PriorityLevel.HIGH)), full_scan=True),
+        Case("get_task_records", repository_call(lambda r, _: r.get_task_records()), full_scan=True),
+        Case("get_task_records[fields]",
+             repository_call(lambda r, _: r.get_task_records(fields=LIST_FIELDS)), full_scan=True),
+        Case("stream_tasks", repository_call(lambda r, _: sum(1 for _ in r.stream_tasks())),
+             full_scan=True),
+        # Writes
+        Case("create_task", repository_call(lambda r, _: r.create_task(title="bench create"))),
+        Case("create_tasks_bulk[100]", repository_call(
+            lambda r, _: r.create_tasks_bulk([{"title": f"bench bulk {i}"} for i in range(100)]))),
+        Case("update_task", repository_call(
+            lambda r, task_id: r.update_task(task_id, title="bench updated")), pick),
+        Case("mark_task_completed", repository_call(lambda r, task_id: r.mark_task_completed(task_id)), pick),
+        Case("mark_task_pending", repository_call(lambda r, task_id: r.mark_task_pending(task_id)), pick),
+        Case("update_tasks[10 ids]", repository_call(
+            lambda r, ids: r.update_tasks({"priority": "Low"}, ids=ids)), picks()),
+        Case("delete_task", repository_call(lambda r, ids: r.delete_task(ids[0])), new_task_ids(1)),
+        Case("delete_tasks[10 ids]", repository_call(lambda r, ids: r.delete_tasks(ids=ids)),
+             new_task_ids(10)),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_suite_arguments(parser)
+    args = parser.parse_args()
+
+    results = {}
+    for rows in args.sizes:
+        results[str(rows)] = {}
+        with seeded_tasks(rows) as first:
+            for case in selected(build_cases(first, rows), args.only):
+                iterations = case_iterations(case, args.iterations, rows, args.full_scan_max)
+                if iterations:
+                    result = run_case(case, iterations, rows)
+                else:
+                    result = {"skipped": f"whole-table case above {args.full_scan_max} rows"}
+                results[str(rows)][case.name] = result
+                print_result(rows, case.name, result)
+    print(f"Results written to {write_results('repository', args, results)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: TaskRepository.search_tasks latency as the table grows.
+
+Seeds synthetic tasks inside a transaction (rolled back afterwards) and
+times a rare term (one row in 10,000), a common term (one row in ten) and a
+two-word query at each size. With the GIN index the rare term stays flat
+as the table grows; common terms cost what ranking their hits costs.
+
+Usage (from ``src/``, with the database running)::
+
+    python -m db.benchmarks.bench_search
+    python -m db.benchmarks.bench_search --sizes 100000 --repeat 50
+"""
+import argparse
+import json
+import time
+from sqlalchemy import text
+
+from db.database import SessionLocal
+from db.repository import TaskRepository
+from db.benchmarks.common import seed_tasks, summarize
+
+QUERIES = {
+    "rare": "zeppelin",
+    "common": "invoice",
+    "two_words": "deploy budget",
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20, help="timed searches per query and size")
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        db = SessionLocal()
+        try:
+            seed_tasks(db, rows)
+            db.execute(text("ANALYZE tasks"))
+            repository = TaskRepository(db)
+            for name, query in QUERIES.items():
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    repository.search_tasks(query)
+                    samples.append(time.perf_counter() - start)
+                print(json.dumps({"rows": rows, "query": name, **summarize(samples)}))
+        finally:
+            db.rollback()
+            db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Shared helpers for the database and API benchmarks.
+
+The suite runners (``bench_repository``, ``api.benchmarks.bench_routes``)
+describe each operation as a ``Case``, time it with ``run_case`` /
+``run_async_case`` against tasks committed by ``seeded_tasks``, and save
+the results with ``write_results`` for ``compare`` to diff between runs.
+"""
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import delete, func, select, text
+
+from db.models import Task
+
+# The spec's latency target for typical operations (p95, up to 1,000 tasks)
+BUDGET_MS = 200
+BUDGET_MAX_ROWS = 1000
+
+# Where result files go unless --output is given
+RESULTS_DIR = Path(__file__).resolve().parents[3] / "bench-results"
+
+# Vocabulary for seeded titles; "zeppelin" lands on one row in 10,000
+SEED_WORDS = ["report", "invoice", "meeting", "deploy", "review", "budget", "backup",
+              "release", "hiring", "audit"]
+
+SEED_SQL = text("""
+    INSERT INTO tasks (title, description, due_date, priority, completed)
+    SELECT 'bench ' || (:words)[1 + n % 10] || ' task ' || n
+               || CASE WHEN n % 10000 = 0 THEN ' zeppelin' ELSE '' END,
+           'benchmark row ' || n || ' about the ' || (:words)[1 + (n / 10) % 10],
+           CURRENT_TIMESTAMP + (n % 30) * INTERVAL '1 day',
+           (ARRAY['Low', 'Medium', 'High'])[1 + n % 3], n % 2 = 0
+    FROM generate_series(1, :rows) AS n
+""")
+
+def seed_tasks(db, rows: int) -> int:
+    """Insert ``rows`` synthetic tasks in the session's transaction.
+
+    Returns the highest id that existed before, so callers can select the
+    seeded rows. Roll the session back to remove them.
+    """
+    floor = db.scalar(select(func.coalesce(func.max(Task.id), 0)))
+    db.execute(SEED_SQL, {"rows": rows, "words": SEED_WORDS})
+    return floor
+
+@contextmanager
+def seeded_tasks(rows: int):
+    """Commit ``rows`` synthetic tasks for a benchmark run, then remove them.
+
+    Yields the first seeded id (the rows are numbered consecutively from
+    it; the sequence may have moved past ``max(id)``). Every task above the
+    previous maximum, including ones the run creates, is deleted afterwards
+    and the table vacuumed. Run against a development database only.
+    """
+    from db.database import SessionLocal, engine
+
+    with SessionLocal() as db:
+        floor = seed_tasks(db, rows)
+        first = db.scalar(select(func.min(Task.id)).where(Task.id > floor))
+        db.commit()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("ANALYZE tasks")
+    try:
+        yield first
+    finally:
+        with SessionLocal() as db:
+            db.execute(delete(Task).where(Task.id > floor))
+            db.commit()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("VACUUM ANALYZE tasks")
+
+@dataclass
+class Case:
+    """One benchmarked operation.
+
+    ``run`` receives whatever ``setup`` returns (untimed, once per
+    iteration). ``full_scan`` cases read the whole table and are run fewer
+    times, and skipped above ``--full-scan-max`` rows.
+    """
+    name: str
+    run: Callable
+    setup: Optional[Callable] = None
+    full_scan: bool = False
+
+def _result(samples: List[float], peak: int, rows: int) -> dict:
+    result = {**summarize(samples), "peak_alloc_kb": round(peak / 1024, 1)}
+    if rows <= BUDGET_MAX_ROWS:
+        result["within_budget"] = result["p95_ms"] <= BUDGET_MS
+    return result
+
+def run_case(case: Case, iterations: int, rows: int) -> dict:
+    """Time ``iterations`` runs of a sync case, then trace one for allocations."""
+    samples = []
+    for _ in range(iterations):
+        args = case.setup() if case.setup else None
+        start = time.perf_counter()
+        case.run(args)
+        samples.append(time.perf_counter() - start)
+    args = case.setup() if case.setup else None
+    tracemalloc.start()
+    case.run(args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _result(samples, peak, rows)
+
+async def run_async_case(case: Case, iterations: int, rows: int) -> dict:
+    """Async counterpart of ``run_case``; ``run`` is a coroutine function."""
+    samples = []
+    for _ in range(iterations):
+        args = case.setup() if case.setup else None
+        start = time.perf_counter()
+        await case.run(args)
+        samples.append(time.perf_counter() - start)
+    args = case.setup() if case.setup else None
+    tracemalloc.start()
+    await case.run(args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _result(samples, peak, rows)
+
+def case_iterations(case: Case, iterations: int, rows: int, full_scan_max: int) -> int:
+    """Iterations for ``case`` at ``rows``; 0 means skip."""
+    if case.full_scan:
+        return min(iterations, 3) if rows <= full_scan_max else 0
+    return iterations
+
+def add_suite_arguments(parser) -> None:
+    """Command-line options shared by the suite runners."""
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--iterations", type=int, default=30, help="timed runs per case and size")
+    parser.add_argument("--full-scan-max", type=int, default=100000,
+                        help="skip whole-table cases above this many seeded rows")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("--output", type=Path, help="result file (default: bench-results/<suite>-<time>.json)")
+
+def selected(cases: List[Case], only: Optional[List[str]]) -> List[Case]:
+    """Filter cases by ``--only`` substrings."""
+    if not only:
+        return cases
+    return [case for case in cases if any(part in case.name for part in only)]
+
+def write_results(suite: str, args, results: Dict[str, dict]) -> Path:
+    """Save a run as JSON for ``compare`` and return the file path."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    now = datetime.now(UTC)
+    path = args.output or RESULTS_DIR / f"{suite}-{now:%Y%m%dT%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "meta": {
+            "suite": suite,
+            "timestamp": now.isoformat(),
+            "commit": commit,
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "budget_ms": BUDGET_MS,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2))
+    return path
+
+def print_result(rows: int, name: str, result: dict) -> None:
+    """One progress line per case."""
+    if result.get("skipped"):
+        print(f"{rows:>8} {name:<46} skipped ({result['skipped']})")
+        return
+    flag = "" if result.get("within_budget", True) else "  OVER BUDGET"
+    print(f"{rows:>8} {name:<46} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+          f"p99 {result['p99_ms']:9.2f} ms  peak {result['peak_alloc_kb']:10.1f} KiB{flag}")
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``samples`` (nearest-rank)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) as milliseconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
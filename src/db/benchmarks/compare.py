@@ -0,0 +1,57 @@
+"""
+Compare two benchmark result files (``bench_repository`` / ``bench_routes``).
+
+Prints p50 and p95 of every case present in both runs with the ratio
+new/old, flags cases slower than ``--threshold`` and, with ``--fail``,
+exits non-zero when any case regressed.
+
+Usage (from ``src/``)::
+
+    python -m db.benchmarks.compare bench-results/repository-A.json bench-results/repository-B.json
+    python -m db.benchmarks.compare old.json new.json --threshold 1.1 --fail
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+def compare(old: dict, new: dict, threshold: float) -> List[Tuple[str, str, dict, dict, float, bool]]:
+    """Rows of (size, case, old, new, p95 ratio, regressed) for shared cases."""
+    rows = []
+    for size, cases in new["results"].items():
+        for name, result in cases.items():
+            before = old["results"].get(size, {}).get(name)
+            if not before or before.get("skipped") or result.get("skipped"):
+                continue
+            ratio = result["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+            rows.append((size, name, before, result, ratio, ratio > threshold))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="flag cases whose p95 grew by more than this factor")
+    parser.add_argument("--fail", action="store_true", help="exit with status 1 on any regression")
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    print(f"old: {old['meta'].get('commit')} {old['meta']['timestamp']}")
+    print(f"new: {new['meta'].get('commit')} {new['meta']['timestamp']}")
+    rows = compare(old, new, args.threshold)
+    for size, name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{size:>8} {name:<46} p50 {before['p50_ms']:9.2f} -> {after['p50_ms']:9.2f} ms  "
+              f"p95 {before['p95_ms']:9.2f} -> {after['p95_ms']:9.2f} ms  x{ratio:5.2f}{flag}")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"{len(rows)} cases compared, {regressions} slower than x{args.threshold}")
+    if args.fail and regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
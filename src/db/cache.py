@@ -0,0 +1,420 @@
+"""
+Read-through cache for single-task lookups and the stats aggregate.
+
+``TaskRepository.get_task_by_id`` consults a ``TaskCache`` before querying
+and every write path invalidates the ids it touched (and the memoized
+stats). Entries are plain
+column snapshots, never ORM instances, so they can be shared between
+sessions and serialized to a shared backend.
+
+Invalidation replaces entries with timestamped tombstones instead of
+deleting them, and a read-through fill only lands if no write invalidated
+the key since the reader's cache lookup (atomically, in a script on
+Redis). A reader that loaded a row just before a write committed
+therefore cannot put the old row back after the writer's invalidation.
+
+Configuration (environment):
+
+- ``TASK_CACHE_ENABLED``: ``true``/``false`` (default ``true``)
+- ``TASK_CACHE_SIZE``: max entries in the in-process LRU (default 1024)
+- ``TASK_CACHE_TTL``: seconds an entry stays valid (default 30)
+- ``TASK_STATS_TTL``: seconds ``get_stats`` results are memoized (default 5;
+  0 disables the memo)
+- ``TASK_CACHE_URL``: use a shared backend instead of the in-process LRU;
+  ``redis://...`` needs the optional ``redis`` package, ``memory://`` is an
+  in-process stand-in with the same semantics for local runs and tests.
+
+The cache is best effort: a backend error is logged and counted, and the
+request goes on as a miss (or without storing or invalidating).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Seconds a Redis call may take before it counts as failed
+REDIS_TIMEOUT = 0.5
+
+# Generated columns are derived by the database and not part of a snapshot
+TASK_COLUMNS = [column.key for column in Task.__table__.columns if column.computed is None]
+DATETIME_COLUMNS = {"due_date", "created_at", "updated_at"}
+
+def snapshot(task) -> dict:
+    """Capture a task's column values."""
+    return {column: getattr(task, column) for column in TASK_COLUMNS}
+
+def restore(values: dict) -> Task:
+    """Build a detached Task from a snapshot."""
+    return Task(**values)
+
+def _tombstone(stamp) -> dict:
+    return {"invalidated": stamp}
+
+def _refuses_fill(entry: Optional[dict], since) -> bool:
+    """Whether a read-through fill from a lookup at ``since`` must not replace ``entry``.
+
+    A live entry is kept, and so is a tombstone written at or after the
+    lookup: the reader may have loaded the row before that write committed.
+    """
+    return entry is not None and ("invalidated" not in entry or entry["invalidated"] >= since)
+
+class LRUCacheBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: dict, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._get(key)
+
+    def lookup(self, key: str) -> Tuple[Optional[dict], float]:
+        """The entry (or tombstone) under ``key`` and the time of the lookup."""
+        with self._lock:
+            return self._get(key), time.monotonic()
+
+    def fill(self, key: str, value: dict, ttl: float, since: float) -> bool:
+        """Store ``value`` unless ``_refuses_fill``; True if stored."""
+        with self._lock:
+            if _refuses_fill(self._get(key), since):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def invalidate(self, keys: Iterable[str], ttl: float) -> None:
+        """Replace ``keys`` with tombstones stamped now."""
+        with self._lock:
+            stamp = time.monotonic()
+            for key in keys:
+                self._store(key, _tombstone(stamp), ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class MemoryCacheBackend:
+    """Local stand-in for a shared cache server.
+
+    Stores JSON-serialized values like a remote backend would, which keeps
+    serialization bugs visible without running a cache server.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return _loads(entry[0])
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._get(key)
+
+    def lookup(self, key: str) -> Tuple[Optional[dict], float]:
+        with self._lock:
+            return self._get(key), time.monotonic()
+
+    def fill(self, key: str, value: dict, ttl: float, since: float) -> bool:
+        with self._lock:
+            if _refuses_fill(self._get(key), since):
+                return False
+            self._entries[key] = (_dumps(value), time.monotonic() + ttl)
+            return True
+
+    def invalidate(self, keys: Iterable[str], ttl: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            raw = _dumps(_tombstone(now))
+            for key in keys:
+                self._entries[key] = (raw, now + ttl)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Redis scripts: the check and the write happen atomically on the server,
+# and tombstones carry the server's clock (TIME, in microseconds) so every
+# worker compares against the same clock.
+REDIS_LOOKUP = """
+local time = redis.call('TIME')
+return {redis.call('GET', KEYS[1]) or false, time[1] .. string.format('%06d', time[2])}
+"""
+REDIS_FILL = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local stamp = string.match(current, '^{"invalidated": (%d+)}$')
+    if not stamp or tonumber(stamp) >= tonumber(ARGV[3]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+REDIS_INVALIDATE = """
+local time = redis.call('TIME')
+local tombstone = '{"invalidated": ' .. time[1] .. string.format('%06d', time[2]) .. '}'
+for _, key in ipairs(KEYS) do
+    redis.call('SET', key, tombstone, 'PX', ARGV[1])
+end
+return #KEYS
+"""
+
+class RedisCacheBackend:
+    """Shared backend on Redis, so every worker sees the same invalidations.
+
+    Calls block on the network, so ``blocking`` is set and
+    ``AsyncTaskRepository`` runs them in a worker thread. A Redis error is
+    logged and turns into a miss, a skipped store or a skipped invalidation
+    (the entry then lives out its TTL). Keys carry ``PREFIX``, so ``len()``
+    counts this cache's entries only.
+    """
+
+    blocking = True
+    PREFIX = "taskmgr:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("TASK_CACHE_URL=redis://... requires the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url, socket_timeout=REDIS_TIMEOUT,
+                                            socket_connect_timeout=REDIS_TIMEOUT)
+        self._lookup = self._client.register_script(REDIS_LOOKUP)
+        self._fill = self._client.register_script(REDIS_FILL)
+        self._invalidate = self._client.register_script(REDIS_INVALIDATE)
+        self._error = redis.RedisError
+        self.errors = 0
+
+    def _failed(self, operation: str, exc: Exception) -> None:
+        self.errors += 1
+        logger.warning("Task cache %s failed: %s", operation, exc)
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            raw = self._client.get(self.PREFIX + key)
+        except self._error as exc:
+            self._failed("get", exc)
+            return None
+        return _loads(raw) if raw is not None else None
+
+    def lookup(self, key: str) -> Tuple[Optional[dict], float]:
+        try:
+            raw, now = self._lookup(keys=[self.PREFIX + key])
+        except self._error as exc:
+            self._failed("get", exc)
+            # An infinitely late lookup never wins a fill against a tombstone
+            return None, float("-inf")
+        return (_loads(raw) if raw is not None else None), int(now)
+
+    def fill(self, key: str, value: dict, ttl: float, since: float) -> bool:
+        if since == float("-inf"):
+            return False
+        try:
+            return bool(self._fill(keys=[self.PREFIX + key], args=[_dumps(value), int(ttl * 1000), since]))
+        except self._error as exc:
+            self._failed("set", exc)
+            return False
+
+    def invalidate(self, keys: Iterable[str], ttl: float) -> None:
+        keys = [self.PREFIX + key for key in keys]
+        if not keys:
+            return
+        try:
+            self._invalidate(keys=keys, args=[int(ttl * 1000)])
+        except self._error as exc:
+            # The write is committed; its stale entries expire with their TTL
+            self._failed("invalidation", exc)
+
+    def __len__(self) -> int:
+        try:
+            return sum(1 for _ in self._client.scan_iter(match=self.PREFIX + "*", count=1000))
+        except self._error as exc:
+            self._failed("size", exc)
+            return 0
+
+def _dumps(value: dict) -> str:
+    return json.dumps({key: v.isoformat() if isinstance(v, datetime) else v
+                       for key, v in value.items()})
+
+def _loads(raw) -> dict:
+    value = json.loads(raw)
+    for key in DATETIME_COLUMNS:
+        if value.get(key) is not None:
+            value[key] = datetime.fromisoformat(value[key])
+    return value
+
+def _live(entry: Optional[dict]) -> Optional[dict]:
+    return None if entry is None or "invalidated" in entry else entry
+
+class TaskCache:
+    """Task snapshots keyed by id, with hit/miss counters.
+
+    A read-through fill is ``lookup``, load, then ``set`` with the lookup's
+    token. Tombstones live as long as entries (``ttl``).
+    """
+
+    STATS_KEY = "task-stats"
+
+    def __init__(self, backend=None, ttl: float = 30.0, stats_ttl: float = 5.0):
+        self.backend = backend if backend is not None else LRUCacheBackend()
+        self.ttl = ttl
+        self.stats_ttl = stats_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def blocking(self) -> bool:
+        """Whether backend calls wait on the network (and belong off the event loop)."""
+        return getattr(self.backend, "blocking", False)
+
+    @staticmethod
+    def _key(task_id: int) -> str:
+        return f"task:{task_id}"
+
+    def lookup_stats(self) -> Tuple[Optional[dict], Optional[float]]:
+        """The memoized task stats (None if absent or expired) and a token for ``set_stats``."""
+        if self.stats_ttl <= 0:
+            return None, None
+        entry, since = self.backend.lookup(self.STATS_KEY)
+        return _live(entry), since
+
+    def get_stats(self) -> Optional[dict]:
+        """Return the memoized task stats, or None if absent or expired."""
+        return self.lookup_stats()[0]
+
+    def set_stats(self, stats: dict, since: float) -> None:
+        """Memoize task stats computed after ``lookup_stats`` returned ``since``."""
+        if self.stats_ttl > 0 and since is not None:
+            self.backend.fill(self.STATS_KEY, stats, self.stats_ttl, since)
+
+    def lookup(self, task_id: int) -> Tuple[Optional[dict], float]:
+        """The cached column values of a task (None on a miss) and a token for ``set``."""
+        entry, since = self.backend.lookup(self._key(task_id))
+        values = _live(entry)
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return values, since
+
+    def get_values(self, task_id: int) -> Optional[dict]:
+        """Return the cached column values of a task, or None on a miss."""
+        return self.lookup(task_id)[0]
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """Return a detached copy of the cached task, or None on a miss."""
+        values = self.get_values(task_id)
+        return restore(values) if values is not None else None
+
+    def set(self, task, since: float) -> None:
+        """Cache a snapshot of ``task`` (a Task or anything with its columns).
+
+        ``since`` is the token from the ``lookup`` that preceded loading it.
+        """
+        self.backend.fill(self._key(task.id), snapshot(task), self.ttl, since)
+
+    def invalidate(self, task_ids: Iterable[int]) -> None:
+        """Tombstone the given tasks, and the stats they feed into."""
+        self.backend.invalidate([self.STATS_KEY, *(self._key(task_id) for task_id in task_ids)], self.ttl)
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "max_size": getattr(self.backend, "max_size", None),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "errors": getattr(self.backend, "errors", 0),
+        }
+
+class ReadOnlyTaskCache:
+    """A view of a ``TaskCache`` that serves hits but stores nothing.
+
+    Used for reads served by a replica: a lagging replica could otherwise
+    put a version older than the latest write back into the cache.
+    """
+
+    def __init__(self, cache: TaskCache):
+        self.cache = cache
+
+    @property
+    def blocking(self) -> bool:
+        return self.cache.blocking
+
+    def lookup_stats(self) -> Tuple[Optional[dict], Optional[float]]:
+        return self.cache.lookup_stats()
+
+    def get_stats(self) -> Optional[dict]:
+        return self.cache.get_stats()
+
+    def set_stats(self, stats: dict, since: float) -> None:
+        pass
+
+    def lookup(self, task_id: int) -> Tuple[Optional[dict], float]:
+        return self.cache.lookup(task_id)
+
+    def get_values(self, task_id: int) -> Optional[dict]:
+        return self.cache.get_values(task_id)
+
+    def get(self, task_id: int) -> Optional[Task]:
+        return self.cache.get(task_id)
+
+    def set(self, task, since: float) -> None:
+        pass
+
+    def invalidate(self, task_ids: Iterable[int]) -> None:
+        self.cache.invalidate(task_ids)
+
+def build_task_cache() -> Optional[TaskCache]:
+    """Build the task cache from environment settings, or None if disabled."""
+    if os.getenv("TASK_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    ttl = float(os.getenv("TASK_CACHE_TTL", "30"))
+    stats_ttl = float(os.getenv("TASK_STATS_TTL", "5"))
+    url = os.getenv("TASK_CACHE_URL")
+    if not url:
+        backend = LRUCacheBackend(int(os.getenv("TASK_CACHE_SIZE", "1024")))
+    elif url.startswith("memory://"):
+        backend = MemoryCacheBackend()
+    elif url.startswith(("redis://", "rediss://")):
+        backend = RedisCacheBackend(url)
+    else:
+        raise ValueError(f"Unsupported TASK_CACHE_URL: {url}")
+    return TaskCache(backend, ttl, stats_ttl)
+
+# Process-wide cache used by the API
+task_cache = build_task_cache()
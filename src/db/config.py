@@ -0,0 +1,112 @@
+"""
+Database settings for the Task Manager application.
+
+One ``DatabaseSettings`` object drives the connection URLs and the pool of
+both the sync and the async engine. Values come from the environment (or
+``.env``):
+
+- ``DB_USER``, ``DB_PASSWORD``, ``DB_HOST``, ``DB_PORT``, ``DB_NAME``
+- ``DB_POOL_SIZE``: connections kept open per engine (default 5)
+- ``DB_MAX_OVERFLOW``: extra connections allowed under load (default 10)
+- ``DB_POOL_TIMEOUT``: seconds to wait for a free connection (default 30)
+- ``DB_POOL_RECYCLE``: seconds before a connection is replaced (default 1800)
+- ``DB_POOL_PRE_PING``: test connections on checkout (default true)
+- ``DB_STATEMENT_TIMEOUT_MS``: server-side per-statement limit, 0 = none
+- ``DB_STARTUP_MODE``: ``migrate`` applies pending migrations at API startup
+  (default); ``check`` only verifies the stored schema version
+- ``DB_POOL_PREWARM``: async connections opened, and warmed with the hot
+  queries, before the API accepts requests (default 0); limited to
+  ``DB_POOL_SIZE + DB_MAX_OVERFLOW``
+- ``DB_SLOW_QUERY_MS``: statements at least this slow are counted in the
+  in-memory summary (``GET /admin/slow-queries``), 0 = off (default 100)
+- ``DB_SLOW_QUERY_EXPLAIN_RATE``: share of slow SELECTs re-run under
+  ``EXPLAIN (ANALYZE, BUFFERS)`` (default 0, since each one runs the query
+  again; 0.01 to 0.1 is enough to collect plans)
+- ``DB_SLOW_QUERY_LOG``: path of a rotating JSON-lines log of every slow
+  statement (default empty = memory only, nothing written to disk)
+- ``DB_SLOW_QUERY_LOG_BYTES`` / ``DB_SLOW_QUERY_LOG_BACKUPS``: rotation size
+  and files kept (default 10 MB, 5)
+- ``DB_REPLICA_URLS``: comma-separated ``postgresql://`` URLs of read
+  replicas, empty = every read goes to the primary (default)
+- ``DB_REPLICA_MAX_WAIT_MS``: how long a read carrying a consistency token
+  waits for a replica to catch up before using the primary (default 200)
+"""
+from typing import List, Literal
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class DatabaseSettings(BaseSettings):
+    """Database connection and pool settings."""
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
+    DB_USER: str = "taskmgr"
+    DB_PASSWORD: str = "taskmgr_password"
+    DB_HOST: str = "localhost"
+    DB_PORT: int = 5432
+    DB_NAME: str = "taskmgr_db"
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    DB_STARTUP_MODE: Literal["migrate", "check"] = "migrate"
+    DB_POOL_PREWARM: int = 0
+
+    DB_SLOW_QUERY_MS: float = 100.0
+    DB_SLOW_QUERY_EXPLAIN_RATE: float = 0.0
+    DB_SLOW_QUERY_LOG: str = ""
+    DB_SLOW_QUERY_LOG_BYTES: int = 10 * 1024 * 1024
+    DB_SLOW_QUERY_LOG_BACKUPS: int = 5
+
+    DB_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_WAIT_MS: float = 200.0
+
+    def url(self, driver: str = "postgresql") -> str:
+        """Connection URL for the given SQLAlchemy driver name."""
+        return f"{driver}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    def prewarm_connections(self) -> int:
+        """``DB_POOL_PREWARM`` limited to the connections the pool can hold open at once.
+
+        Pre-warming keeps every connection checked out until all are open, so
+        more than the pool's capacity would wait out ``DB_POOL_TIMEOUT``.
+        """
+        if self.DB_MAX_OVERFLOW < 0:
+            # Unlimited overflow
+            return self.DB_POOL_PREWARM
+        return min(self.DB_POOL_PREWARM, self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW)
+
+    def replica_urls(self, driver: str = "postgresql") -> List[str]:
+        """Replica connection URLs, rewritten for the given driver name."""
+        urls = [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+        return [driver + url[url.index("://"):] for url in urls]
+
+    @property
+    def DATABASE_URL(self) -> str:
+        return self.url()
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return self.url("postgresql+asyncpg")
+
+    def pool_options(self) -> dict:
+        """Keyword arguments for ``create_engine`` / ``create_async_engine``."""
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+        }
+
+    def connect_args(self, is_async: bool = False) -> dict:
+        """Driver connect arguments applying the statement timeout."""
+        if not self.DB_STATEMENT_TIMEOUT_MS:
+            return {}
+        if is_async:
+            return {"server_settings": {"statement_timeout": str(self.DB_STATEMENT_TIMEOUT_MS)}}
+        return {"options": f"-c statement_timeout={self.DB_STATEMENT_TIMEOUT_MS}"}
+
+settings = DatabaseSettings()
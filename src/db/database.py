@@ -2,42 +2,112 @@
 Database connection and session management for the Task Manager application.
 """
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+from pathlib import Path
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Database connection settings
-DB_USER = os.getenv("DB_USER", "taskmgr")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "taskmgr_password")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "taskmgr_db")
+from .config import settings
+from .pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from .slow_query import SlowQueryLog
+from .replicas import ReplicaRouter
 
 # Create database URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = settings.DATABASE_URL
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL
 
-# Create engine
-engine = create_engine(DATABASE_URL)
+# Create engines; pool sizing and timeouts come from DatabaseSettings
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool,
+                       connect_args=settings.connect_args(), **settings.pool_options())
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool,
+                                   connect_args=settings.connect_args(is_async=True),
+                                   **settings.pool_options())
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read replicas (DB_REPLICA_URLS); each gets its own pool with the same sizing
+replica_engines = [create_async_engine(url, poolclass=InstrumentedAsyncQueuePool,
+                                       connect_args=settings.connect_args(is_async=True),
+                                       **settings.pool_options())
+                   for url in settings.replica_urls("postgresql+asyncpg")]
+
+def _dispose_after_fork():
+    """Drop the pooled connections a forked worker inherited from its parent.
+
+    ``close=False`` leaves the parent's sockets alone; the child just starts
+    with empty pools and opens its own connections.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    for replica in replica_engines:
+        replica.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+# Slow-query log on both engines; None when DB_SLOW_QUERY_MS is 0
+slow_queries = None
+if settings.DB_SLOW_QUERY_MS > 0:
+    slow_queries = SlowQueryLog(settings.DB_SLOW_QUERY_MS, settings.DB_SLOW_QUERY_EXPLAIN_RATE,
+                                settings.DB_SLOW_QUERY_LOG or None, settings.DB_SLOW_QUERY_LOG_BYTES,
+                                settings.DB_SLOW_QUERY_LOG_BACKUPS)
+    slow_queries.install(engine, "sync")
+    slow_queries.install(async_engine.sync_engine, "async")
+    for number, replica in enumerate(replica_engines):
+        slow_queries.install(replica.sync_engine, f"replica{number}")
+
+# Create session factories. Attributes stay loaded after commit: rows
+# returned by a write are handed straight back to the caller, and lazy
+# refreshes are not possible from async code.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
+
+# Routes reads to the replicas; with none configured every read uses the primary
+replicas = ReplicaRouter([async_sessionmaker(autoflush=False, expire_on_commit=False, bind=replica)
+                          for replica in replica_engines], settings.DB_REPLICA_MAX_WAIT_MS)
 
 # Create scoped session
 db_session = scoped_session(SessionLocal)
 
-# Base class for models
-Base = declarative_base()
+# Base class for models; shared with db.models so there is one metadata
+from .models import Base
 Base.query = db_session.query_property()
 
+# Alembic configuration; the migrations are the source of truth for the schema
+ALEMBIC_INI = Path(__file__).parent / "alembic.ini"
+
+# Head revision of the migrations; test_migrations keeps the two in step
+SCHEMA_VERSION = "0006"
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the schema version this code expects."""
+
 def init_db():
-    """Initialize the database by creating all tables."""
-    # Import models here to ensure they are registered with Base
-    from .models import Task
-    
-    Base.metadata.create_all(bind=engine)
+    """Initialize the database by applying any pending migrations."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+async def check_db():
+    """Verify the stored schema version instead of running migrations.
+
+    One query against ``alembic_version`` over the async engine, without
+    loading Alembic. Raises SchemaVersionError unless it reads SCHEMA_VERSION.
+    """
+    try:
+        async with async_engine.connect() as connection:
+            result = await connection.exec_driver_sql("SELECT version_num FROM alembic_version")
+            versions = result.scalars().all()
+    except exc.ProgrammingError:
+        versions = []
+    if versions != [SCHEMA_VERSION]:
+        found = ", ".join(versions) or "unversioned"
+        raise SchemaVersionError(f"Database schema is {found}, expected {SCHEMA_VERSION}; "
+                                 f"run ./manage.sh db-migrate")
 
 def get_db():
     """Get a database session."""
@@ -46,3 +116,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,48 @@
+"""
+Alembic environment for the Task Manager database.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from db.database import engine, settings
+from db.models import Base
+
+config = context.config
+
+# Only configure logging when run from the alembic CLI; init_db() calls in
+# from a running application whose logging is already set up.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout without connecting."""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Apply migrations over a connection from the application engine."""
+    with engine.connect() as connection:
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            # Index builds and backfills may legitimately outlast the app's limit
+            connection.exec_driver_sql("SET statement_timeout = 0")
+            connection.commit()
+        # One transaction per migration, so a CONCURRENTLY index build can step
+        # out of it with autocommit_block() without undoing earlier revisions.
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          transaction_per_migration=True)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
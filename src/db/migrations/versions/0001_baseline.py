@@ -0,0 +1,47 @@
+"""Baseline tasks schema
+
+Matches the schema previously created by scripts/init.sql. Every object is
+created IF NOT EXISTS so databases bootstrapped by that script can simply be
+upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tasks',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('completed', sa.Boolean(), server_default=sa.false(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.current_timestamp(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.current_timestamp(), nullable=True),
+        sa.CheckConstraint("priority IN ('Low', 'Medium', 'High')", name='tasks_priority_check'),
+        if_not_exists=True,
+    )
+    op.create_index('idx_tasks_due_date', 'tasks', ['due_date'], if_not_exists=True)
+    op.create_index('idx_tasks_priority', 'tasks', ['priority'], if_not_exists=True)
+    op.create_index('idx_tasks_completed', 'tasks', ['completed'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tasks')
@@ -0,0 +1,60 @@
+"""Composite and partial indexes for the hot query shapes
+
+- (completed, due_date, id): status filter plus due-date order and keyset
+  pagination.
+- (due_date, id) WHERE completed = false: the pending list, which is the
+  one clients poll, without carrying completed rows.
+- (priority, id): priority filter and keyset pagination.
+
+idx_tasks_priority and idx_tasks_completed are left-prefixes of the new
+indexes and are dropped. All builds and drops run CONCURRENTLY so writes
+are not blocked during a rollout.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_completed_due_date_id', 'tasks', ['completed', 'due_date', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_pending_due_date_id', 'tasks', ['due_date', 'id'],
+                        postgresql_where=sa.text('completed = false'),
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_tasks_priority_id', 'tasks', ['priority', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('idx_tasks_priority', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_tasks_completed', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('idx_tasks_completed', 'tasks', ['completed'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('idx_tasks_priority', 'tasks', ['priority'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_tasks_priority_id', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_pending_due_date_id', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_tasks_completed_due_date_id', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,58 @@
+"""Ordinal priority column and indexes for sorted task listings
+
+- priority_rank: stored generated SMALLINT (Low=1, Medium=2, High=3, no
+  priority=0) so priority sorts in its real order and can be indexed.
+- (sort key, id) and (completed, sort key, id) for each of due date,
+  priority rank and created_at, so sorted keyset pages are index scans
+  with or without the status filter. Due dates are indexed as
+  coalesce(due_date, 'infinity') so undated tasks page like any other.
+
+Adding a stored generated column rewrites the table under an exclusive
+lock; the indexes are then built CONCURRENTLY.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIORITY_RANK_SQL = "CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 3 ELSE 0 END"
+DUE_DATE_SORT_SQL = "coalesce(due_date, 'infinity'::timestamp)"
+
+INDEXES = [
+    ('ix_tasks_due_sort_id', [sa.text(DUE_DATE_SORT_SQL), 'id']),
+    ('ix_tasks_completed_due_sort_id', ['completed', sa.text(DUE_DATE_SORT_SQL), 'id']),
+    ('ix_tasks_priority_rank_id', ['priority_rank', 'id']),
+    ('ix_tasks_completed_priority_rank_id', ['completed', 'priority_rank', 'id']),
+    ('ix_tasks_created_at_id', ['created_at', 'id']),
+    ('ix_tasks_completed_created_at_id', ['completed', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('priority_rank', sa.SmallInteger(),
+                                     sa.Computed(PRIORITY_RANK_SQL, persisted=True), nullable=False))
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'tasks', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tasks', 'priority_rank')
@@ -0,0 +1,48 @@
+"""Full-text search vector over title and description
+
+- search_vector: stored generated tsvector (english), title weighted A and
+  description weighted B so title matches rank first.
+- GIN index on it, built CONCURRENTLY, so matching cost follows the number
+  of hits rather than the size of the table.
+
+Adding a stored generated column rewrites the table under an exclusive
+lock.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = ("setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                     "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                     sa.Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_search_vector', 'tasks', ['search_vector'], postgresql_using='gin',
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_search_vector', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,58 @@
+"""Archive table for long-completed tasks
+
+- tasks_archive: cold copy of the tasks columns plus archived_at; ids are
+  kept, so an archived task is still found by its id. priority_rank is
+  generated as in tasks so archived rows sort by priority the same way.
+- (updated_at, id) WHERE completed = true on tasks: finds the next batch
+  to archive without scanning the pending rows, built CONCURRENTLY.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIORITY_RANK_SQL = "CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 3 ELSE 0 END"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, primary_key=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('priority_rank', sa.SmallInteger(), sa.Computed(PRIORITY_RANK_SQL, persisted=True),
+                  nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.func.current_timestamp(), nullable=False),
+        if_not_exists=True,
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_completed_updated_at_id', 'tasks', ['updated_at', 'id'],
+                        postgresql_where=sa.text('completed = true'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_completed_updated_at_id', table_name='tasks',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_table('tasks_archive')
@@ -0,0 +1,51 @@
+"""Sort indexes on the task archive
+
+- (sort key, id) and (completed, sort key, id) on tasks_archive for each
+  of due date, priority rank and created_at, matching the ones on tasks,
+  so sorted keyset pages with include_archived read both tables in index
+  order instead of sorting the archive.
+
+Built CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DUE_DATE_SORT_SQL = "coalesce(due_date, 'infinity'::timestamp)"
+
+INDEXES = [
+    ('ix_tasks_archive_due_sort_id', [sa.text(DUE_DATE_SORT_SQL), 'id']),
+    ('ix_tasks_archive_completed_due_sort_id', ['completed', sa.text(DUE_DATE_SORT_SQL), 'id']),
+    ('ix_tasks_archive_priority_rank_id', ['priority_rank', 'id']),
+    ('ix_tasks_archive_completed_priority_rank_id', ['completed', 'priority_rank', 'id']),
+    ('ix_tasks_archive_created_at_id', ['created_at', 'id']),
+    ('ix_tasks_archive_completed_created_at_id', ['completed', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'tasks_archive', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks_archive', postgresql_concurrently=True, if_exists=True)
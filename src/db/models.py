@@ -3,28 +3,79 @@ Database models for the Task Manager application.
 """
 from datetime import datetime, UTC
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import (Column, Integer, SmallInteger, String, Text, DateTime, Boolean, CheckConstraint,
+                        Computed, Index, false, func, text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import declarative_base, deferred
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+class UTCDateTime(TypeDecorator):
+    """Naive-UTC ``TIMESTAMP`` that also accepts timezone-aware datetimes.
+
+    psycopg2 silently drops the offset of an aware value bound to a
+    ``TIMESTAMP`` column, asyncpg rejects it; converting to UTC first gives
+    both drivers the same behaviour.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
 class PriorityLevel(str, Enum):
     LOW = "Low"
     MEDIUM = "Medium"
     HIGH = "High"
 
+# Ordinal of each priority, so ORDER BY follows Low < Medium < High
+PRIORITY_RANK_SQL = "CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 3 ELSE 0 END"
+
+# Sort key for due dates: tasks without one sort after every dated task
+DUE_DATE_SORT_SQL = "coalesce(due_date, 'infinity'::timestamp)"
+
+# Weighted full-text document: title matches rank above description matches
+SEARCH_VECTOR_SQL = ("setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                     "setweight(to_tsvector('english', coalesce(description, '')), 'B')")
+
 class Task(Base):
-    """Task model representing a task in the task manager."""
+    """Task model representing a task in the task manager.
+
+    The schema itself is owned by the Alembic migrations in ``migrations/``;
+    keep this model in step with them (tests/test_migrations.py checks it).
+    """
     __tablename__ = "tasks"
+    __table_args__ = (
+        CheckConstraint("priority IN ('Low', 'Medium', 'High')", name="tasks_priority_check"),
+        Index("idx_tasks_due_date", "due_date"),
+        Index("ix_tasks_completed_due_date_id", "completed", "due_date", "id"),
+        Index("ix_tasks_pending_due_date_id", "due_date", "id", postgresql_where="completed = false"),
+        Index("ix_tasks_priority_id", "priority", "id"),
+        Index("ix_tasks_due_sort_id", text(DUE_DATE_SORT_SQL), "id"),
+        Index("ix_tasks_completed_due_sort_id", "completed", text(DUE_DATE_SORT_SQL), "id"),
+        Index("ix_tasks_priority_rank_id", "priority_rank", "id"),
+        Index("ix_tasks_completed_priority_rank_id", "completed", "priority_rank", "id"),
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_completed_created_at_id", "completed", "created_at", "id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_completed_updated_at_id", "updated_at", "id", postgresql_where="completed = true"),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    due_date = Column(DateTime, nullable=True)
+    due_date = Column(UTCDateTime, nullable=True)
     priority = Column(String(20), nullable=True)
-    completed = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
-    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    priority_rank = Column(SmallInteger, Computed(PRIORITY_RANK_SQL, persisted=True), nullable=False)
+    completed = Column(Boolean, default=False, server_default=false())
+    created_at = Column(UTCDateTime, default=lambda: datetime.now(UTC), server_default=func.current_timestamp())
+    updated_at = Column(UTCDateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC),
+                        server_default=func.current_timestamp())
+    # Only used in search predicates; never loaded with the task
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
 
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', priority={self.priority}, completed={self.completed})>"
@@ -41,3 +92,34 @@ class Task(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+class ArchivedTask(Base):
+    """A completed task moved out of ``tasks`` by ``db.archive``.
+
+    Same columns as ``Task`` (ids are kept) plus ``archived_at``. Archived
+    tasks are read-only; reads only include them when asked to. The sort
+    indexes mirror those on ``Task`` so merged pages stay index scans.
+    """
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_due_sort_id", text(DUE_DATE_SORT_SQL), "id"),
+        Index("ix_tasks_archive_completed_due_sort_id", "completed", text(DUE_DATE_SORT_SQL), "id"),
+        Index("ix_tasks_archive_priority_rank_id", "priority_rank", "id"),
+        Index("ix_tasks_archive_completed_priority_rank_id", "completed", "priority_rank", "id"),
+        Index("ix_tasks_archive_created_at_id", "created_at", "id"),
+        Index("ix_tasks_archive_completed_created_at_id", "completed", "created_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    due_date = Column(UTCDateTime, nullable=True)
+    priority = Column(String(20), nullable=True)
+    priority_rank = Column(SmallInteger, Computed(PRIORITY_RANK_SQL, persisted=True), nullable=False)
+    completed = Column(Boolean)
+    created_at = Column(UTCDateTime)
+    updated_at = Column(UTCDateTime)
+    archived_at = Column(UTCDateTime, nullable=False, server_default=func.current_timestamp())
+
+    def __repr__(self):
+        return f"<ArchivedTask(id={self.id}, title='{self.title}', archived_at={self.archived_at})>"
@@ -0,0 +1,191 @@
+"""
+Keyset pagination helpers for task listings.
+
+Pages are ordered by ``Task.id`` (or by a sort key, then id) and continue
+from the last position of the previous page, so fetching page N costs the
+same as fetching page 1 (no OFFSET scan). The position is handed to clients
+as an opaque cursor.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Tuple
+from sqlalchemy import select, func, literal_column, tuple_, union_all
+from sqlalchemy.sql import Select
+from .models import ArchivedTask, Task
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class SortKey(str, Enum):
+    DUE_DATE = "due_date"
+    PRIORITY = "priority"
+    CREATED_AT = "created_at"
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+INFINITY = literal_column("'infinity'::timestamp")
+
+# Sort key -> (column carried in the cursor, indexed ORDER BY expression,
+# bound used when the cursor value is NULL)
+SORT_KEYS = {
+    SortKey.DUE_DATE: (Task.due_date, func.coalesce(Task.due_date, INFINITY), INFINITY),
+    SortKey.PRIORITY: (Task.priority_rank, Task.priority_rank, None),
+    SortKey.CREATED_AT: (Task.created_at, Task.created_at, None),
+}
+DATETIME_SORT_KEYS = {SortKey.DUE_DATE, SortKey.CREATED_AT}
+
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(position, dict) or not isinstance(position.get("id"), int):
+        raise ValueError("Invalid cursor")
+    return position
+
+def sort_columns(sort: SortKey, model=Task) -> tuple:
+    """The cursor column and ORDER BY expression of ``sort`` on ``model``."""
+    if model is Task:
+        return SORT_KEYS[sort][:2]
+    column = getattr(model, SORT_KEYS[sort][0].key)
+    return column, sort_expression(sort, column)
+
+def sort_expression(sort: SortKey, column):
+    """ORDER BY expression for ``sort`` over its raw cursor column."""
+    return func.coalesce(column, INFINITY) if sort is SortKey.DUE_DATE else column
+
+def order_keys(sort: Optional[SortKey] = None, descending: bool = False, model=Task) -> list:
+    """ORDER BY clauses for a sort key, with id as the tie-breaker."""
+    keys = [sort_columns(sort, model)[1], model.id] if sort is not None else [model.id]
+    return [key.desc() for key in keys] if descending else keys
+
+def _sort_bound(sort: SortKey, value):
+    """Turn a cursor's sort value back into a bind value."""
+    null_bound = SORT_KEYS[sort][2]
+    if value is None:
+        if null_bound is None:
+            raise ValueError("Invalid cursor")
+        return null_bound
+    if sort in DATETIME_SORT_KEYS:
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError("Invalid cursor") from exc
+    if not isinstance(value, int):
+        raise ValueError("Invalid cursor")
+    return value
+
+def decode_position(cursor: str, sort: Optional[SortKey] = None, descending: bool = False) -> dict:
+    """Decode a cursor and check it was issued for the same sort and direction."""
+    position = decode_cursor(cursor)
+    if position.get("sort") != (sort.value if sort else None) or bool(position.get("desc")) != descending:
+        raise ValueError("Invalid cursor")
+    return position
+
+def keyset_query(model, columns, limit: Optional[int] = None, position: Optional[dict] = None,
+                 completed: Optional[bool] = None, sort: Optional[SortKey] = None,
+                 descending: bool = False, merge_key: bool = False) -> Select:
+    """Select ``columns`` of ``model`` after ``position`` in keyset order.
+
+    ``columns`` are ``Task`` columns (or ``(Task,)``); for another model
+    the columns of the same name are selected. With ``sort`` the raw sort
+    value follows as ``sort_value``, and with ``merge_key`` also the ORDER
+    BY expression as ``sort_key``, so a union of such queries can be merged
+    from the (sort key, id) indexes without sorting. Without ``limit``
+    every row is kept, unordered (for a caller that sorts the merged result).
+    """
+    if model is not Task:
+        columns = [getattr(model, column.key) for column in columns]
+    if sort is None:
+        query = select(*columns)
+    else:
+        cursor_column, expression = sort_columns(sort, model)
+        query = select(*columns, cursor_column.label("sort_value"))
+        if merge_key:
+            query = query.add_columns(expression.label("sort_key"))
+    if completed is not None:
+        query = query.where(model.completed == completed)
+    if position is not None:
+        if sort is None:
+            keys, bounds = model.id, position["id"]
+        else:
+            # Row comparison keeps the (sort key, id) index usable as a range
+            keys = tuple_(sort_columns(sort, model)[1], model.id)
+            bounds = tuple_(_sort_bound(sort, position.get("after")), position["id"])
+        query = query.where(keys < bounds if descending else keys > bounds)
+    if limit is None:
+        return query
+    return query.order_by(*order_keys(sort, descending, model)).limit(limit)
+
+def with_archived(parts: list, sort: Optional[SortKey] = None, descending: bool = False,
+                  limit: Optional[int] = None, sort_value: bool = True) -> Select:
+    """Merge keyset queries over ``Task`` and ``ArchivedTask`` back into keyset order.
+
+    ``parts`` are built with ``keyset_query(..., merge_key=True)``.
+    ``sort_value=False`` leaves the raw sort value out of the result.
+    """
+    rows = union_all(*parts).subquery("tasks_with_archived")
+    keys = [rows.c.id] if sort is None else [rows.c.sort_key, rows.c.id]
+    hidden = {"sort_key"} if sort_value else {"sort_key", "sort_value"}
+    columns = [column for column in rows.c if column.key not in hidden]
+    query = select(*columns).order_by(*[key.desc() for key in keys] if descending else keys)
+    return query.limit(limit) if limit is not None else query
+
+def build_page_query(limit: int, cursor: Optional[str] = None,
+                     completed: Optional[bool] = None, columns=(Task,),
+                     sort: Optional[SortKey] = None, descending: bool = False,
+                     include_archived: bool = False) -> Select:
+    """Build the keyset query for one page of ``columns``.
+
+    One row more than ``limit`` is selected so callers can tell whether
+    another page follows without a separate COUNT. With ``sort``, the raw
+    sort value is selected after ``columns`` for ``split_page`` to put in
+    the next cursor.
+
+    With ``include_archived`` (column projections only), the live and the
+    archived tasks each contribute their own next ``limit + 1`` rows and the
+    union is re-sorted, so the live side still reads a range of its index.
+    """
+    position = decode_position(cursor, sort, descending) if cursor is not None else None
+    if not include_archived:
+        return keyset_query(Task, columns, limit + 1, position, completed, sort, descending)
+    parts = [keyset_query(model, columns, limit + 1, position, completed, sort, descending, merge_key=True)
+             for model in (Task, ArchivedTask)]
+    return with_archived(parts, sort, descending, limit + 1)
+
+def split_page(rows: list, limit: int, sort: Optional[SortKey] = None,
+               descending: bool = False) -> Tuple[list, Optional[str]]:
+    """Trim the look-ahead row and derive the cursor for the next page.
+
+    For sorted pages the trailing sort value is stripped from each row.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        position = {"id": last.id}
+        if sort is not None:
+            value = last[-1]
+            position["after"] = value.isoformat() if isinstance(value, datetime) else value
+            position["sort"] = sort.value
+        if descending:
+            position["desc"] = True
+        next_cursor = encode_cursor(position)
+    if sort is not None:
+        rows = [tuple(row[:-1]) for row in rows]
+    return rows, next_cursor
@@ -0,0 +1,96 @@
+"""
+Connection pools that record how long callers wait for a connection.
+
+``InstrumentedQueuePool`` (sync) and ``InstrumentedAsyncQueuePool`` time
+every checkout into a ``PoolStats`` histogram; ``pool_status`` combines it
+with the pool's live counters. A high share of slow checkouts or any
+timeouts means the pool is too small for the number of concurrent
+requests (or connections are held too long).
+"""
+import bisect
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Upper bounds (milliseconds) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class PoolStats:
+    """Thread-safe checkout wait histogram."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        """Record one checkout that took ``seconds``."""
+        index = bisect.bisect_left(WAIT_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            self.buckets[index] += 1
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        """Counters and per-bucket checkout counts keyed by upper bound."""
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in WAIT_BUCKETS_MS] + ["inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "wait_histogram": dict(zip(labels, self.buckets)),
+            }
+
+class _InstrumentedPoolMixin:
+    """Times ``_do_get``: queue wait, plus connect time when the pool grows."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.observe(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the history
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout wait statistics."""
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait statistics."""
+
+def pool_status(pool) -> dict:
+    """Live pool counters plus checkout wait statistics, when recorded."""
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout_seconds=pool.timeout(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
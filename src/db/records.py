@@ -0,0 +1,74 @@
+"""
+Lightweight read-only task records for the fast read path.
+
+Listing endpoints do not need change tracking, so they select plain column
+tuples and wrap each in a slotted dataclass instead of building ``Task``
+instances through the ORM identity map.
+
+A request may also project a subset of fields; each subset gets its own
+slotted record type (built once and cached) and only those columns are
+selected, so unused wide columns such as ``description`` are never read.
+"""
+from dataclasses import dataclass, fields, make_dataclass
+from datetime import datetime
+from functools import lru_cache
+from itertools import starmap
+from typing import Iterable, List, Optional, Tuple
+from .models import Task
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Immutable-by-convention snapshot of one task row."""
+    id: int
+    title: str
+    description: Optional[str]
+    due_date: Optional[datetime]
+    priority: Optional[str]
+    completed: Optional[bool]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+@dataclass(slots=True)
+class TaskSearchRecord(TaskRecord):
+    """A task matched by full-text search, with its rank and highlights."""
+    rank: float
+    title_highlight: str
+    description_highlight: Optional[str]
+
+# Selected in TaskRecord field order so rows unpack positionally
+RECORD_COLUMNS = (Task.id, Task.title, Task.description, Task.due_date, Task.priority,
+                  Task.completed, Task.created_at, Task.updated_at)
+
+RECORD_FIELDS = tuple(field.name for field in fields(TaskRecord))
+
+def select_fields(names: Iterable[str]) -> Tuple[str, ...]:
+    """Normalize requested field names into record order.
+
+    ``id`` is always included since keyset cursors and ETags need it.
+    Raises ValueError for unknown names.
+    """
+    requested = set(names)
+    unknown = requested.difference(RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in RECORD_FIELDS if name in requested)
+
+@lru_cache(maxsize=None)
+def projection(field_names: Optional[Tuple[str, ...]] = None) -> Tuple[type, tuple]:
+    """Return the record type and columns for ``field_names`` (all when None)."""
+    if field_names is None or field_names == RECORD_FIELDS:
+        return TaskRecord, RECORD_COLUMNS
+    record = make_dataclass("PartialTaskRecord",
+                            [(name, TaskRecord.__annotations__[name]) for name in field_names],
+                            slots=True)
+    return record, tuple(getattr(Task, name) for name in field_names)
+
+def narrow(records: Iterable, field_names: Tuple[str, ...]) -> list:
+    """Records loaded with extra fields, reduced to ``field_names``."""
+    record, _ = projection(field_names)
+    return [record(*(getattr(item, name) for name in field_names)) for item in records]
+
+def to_records(rows: Iterable[tuple], record: type = TaskRecord) -> list:
+    """Wrap column tuples selected with the matching projection columns."""
+    return list(starmap(record, rows))
@@ -0,0 +1,115 @@
+"""
+Read-replica routing with read-your-writes consistency.
+
+``ReplicaRouter`` hands out sessions on replica engines for read-only
+work; writes always go to the primary. After a write, ``write_token``
+returns the primary's WAL position (``pg_current_wal_lsn()``) as an opaque
+consistency token. A read that carries the token is only served by a
+replica whose replay position has reached it: the router polls the
+replicas for up to ``max_wait_ms``. If none catches up in time, or no
+replica can be reached, the read falls back to the primary (the caller's
+primary session is used when ``read_session`` yields None). Replica
+sessions are marked with ``session.info["replica"] = True``.
+
+A "replica" that is not in recovery (for instance the primary itself
+under a second URL, for local testing) always counts as caught up.
+"""
+import asyncio
+import itertools
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# A pg_lsn as printed by Postgres: two hex numbers separated by a slash
+TOKEN_PATTERN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+# Delay between catch-up checks while a tokened read waits for a replica
+POLL_INTERVAL = 0.01
+
+WRITE_POSITION = text("SELECT pg_current_wal_lsn()::text")
+# The token is bound as text: asyncpg would encode a pg_lsn parameter as an integer
+CAUGHT_UP = text("SELECT NOT pg_is_in_recovery() OR pg_last_wal_replay_lsn() >= CAST(CAST(:token AS text) AS pg_lsn)")
+
+def valid_token(token: str) -> bool:
+    return bool(TOKEN_PATTERN.match(token))
+
+class ReplicaRouter:
+    """Chooses a replica session for each read, or None for the primary."""
+
+    def __init__(self, session_factories: List[Callable[[], AsyncSession]], max_wait_ms: float = 200.0):
+        self.session_factories = list(session_factories)
+        self.max_wait = max_wait_ms / 1000
+        self._next = itertools.count()
+        self.counts = {"replica_reads": 0, "primary_fallbacks": 0, "waits": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.session_factories)
+
+    async def write_token(self, session: AsyncSession) -> Optional[str]:
+        """The primary's WAL position after a committed write, or None without replicas."""
+        if not self.enabled:
+            return None
+        return await session.scalar(WRITE_POSITION)
+
+    async def caught_up(self, session: AsyncSession, token: str) -> bool:
+        return bool(await session.scalar(CAUGHT_UP, {"token": token}))
+
+    @asynccontextmanager
+    async def read_session(self, token: Optional[str] = None) -> AsyncIterator[Optional[AsyncSession]]:
+        """A replica session that has replayed ``token``; None means read from the primary.
+
+        Raises ValueError for a malformed token.
+        """
+        if token is not None and not valid_token(token):
+            raise ValueError("Invalid consistency token")
+        session = await self._choose(token) if self.enabled else None
+        try:
+            yield session
+        finally:
+            if session is not None:
+                await session.close()
+
+    async def _choose(self, token: Optional[str]) -> Optional[AsyncSession]:
+        start = next(self._next) % len(self.session_factories)
+        order = self.session_factories[start:] + self.session_factories[:start]
+        sessions: Dict[int, AsyncSession] = {}
+        chosen = None
+        deadline = time.monotonic() + self.max_wait
+        try:
+            while order and chosen is None:
+                for factory in list(order):
+                    if id(factory) not in sessions:
+                        sessions[id(factory)] = factory()
+                    session = sessions[id(factory)]
+                    try:
+                        if token is None:
+                            await session.connection()
+                        elif not await self.caught_up(session, token):
+                            continue
+                    except (DBAPIError, OSError):
+                        # Unreachable or failing replica: skip it for this read
+                        self.counts["errors"] += 1
+                        order.remove(factory)
+                        continue
+                    chosen = session
+                    chosen.info["replica"] = True
+                    break
+                if chosen is None:
+                    if token is None or time.monotonic() >= deadline:
+                        break
+                    self.counts["waits"] += 1
+                    await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            for session in sessions.values():
+                if session is not chosen:
+                    await session.close()
+        self.counts["replica_reads" if chosen is not None else "primary_fallbacks"] += 1
+        return chosen
+
+    def stats(self) -> dict:
+        return {"replicas": len(self.session_factories), "max_wait_ms": self.max_wait * 1000, **self.counts}
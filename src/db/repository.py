@@ -1,28 +1,426 @@
 """
 Repository module for database operations.
 """
-from typing import List, Optional
-from datetime import datetime, UTC
+import os
+from typing import Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import select, insert, update, delete, func, true, union_all
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.orm import Session
-from .models import Task, PriorityLevel
+from .models import ArchivedTask, Task, PriorityLevel
+from .pagination import SortKey, build_page_query, split_page, order_keys, keyset_query, with_archived
+from .cache import TASK_COLUMNS, TaskCache, restore
+from .records import TaskRecord, TaskSearchRecord, RECORD_COLUMNS, projection, to_records
+
+# Rows fetched per round trip when streaming
+STREAM_BATCH_SIZE = 1000
+
+# Hits returned by search_tasks unless a limit is given
+SEARCH_LIMIT = 20
+
+# ts_headline markup; the text is HTML-escaped first (html_escape), so <mark> is the only markup
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+# Replaced in order, so the ampersands of the later entities are not escaped again
+HTML_ENTITIES = [("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#39;")]
+
+# Rows per multi-row INSERT in create_tasks_bulk
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+# Tasks moved per transaction by archive_tasks
+ARCHIVE_BATCH_SIZE = 1000
+
+def build_stream_query(completed: Optional[bool] = None):
+    """Build the ORM-free query used to stream the task table."""
+    query = select(*RECORD_COLUMNS)
+    if completed is not None:
+        query = query.where(Task.completed == completed)
+    return query.order_by(Task.id)
+
+def build_bulk_insert(tasks: List[dict], chunk_size: int):
+    """Build the bulk ``INSERT ... RETURNING`` for ``tasks``.
+
+    Returns the statement and its parameter rows. SQLAlchemy sends the rows
+    as multi-row VALUES statements of ``chunk_size`` rows each and returns
+    the created tasks in input order.
+    """
+    now = datetime.now(UTC)
+    rows = [
+        {
+            "title": task["title"],
+            "description": task.get("description"),
+            "due_date": task.get("due_date"),
+            "priority": task.get("priority"),
+            "completed": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for task in tasks
+    ]
+    statement = (
+        insert(Task)
+        .returning(Task, sort_by_parameter_order=True)
+        .execution_options(insertmanyvalues_page_size=chunk_size)
+    )
+    return statement, rows
+
+# Columns that bulk updates may set
+UPDATABLE_COLUMNS = ("title", "description", "due_date", "priority", "completed")
+
+def build_task_filter(ids: Optional[List[int]] = None, completed: Optional[bool] = None,
+                      priority: Optional[str] = None, due_before: Optional[datetime] = None,
+                      due_after: Optional[datetime] = None) -> list:
+    """Build WHERE conditions selecting tasks by id list and/or filter.
+
+    Raises ValueError when no criterion is given, so a bulk statement can
+    never touch the whole table by accident.
+    """
+    conditions = []
+    if ids is not None:
+        conditions.append(Task.id.in_(ids))
+    if completed is not None:
+        conditions.append(Task.completed == completed)
+    if priority is not None:
+        conditions.append(Task.priority == priority)
+    if due_before is not None:
+        conditions.append(Task.due_date < due_before)
+    if due_after is not None:
+        conditions.append(Task.due_date >= due_after)
+    if not conditions:
+        raise ValueError("At least one of ids or a filter is required")
+    return conditions
+
+def build_create(title: str, description: Optional[str] = None,
+                 due_date: Optional[datetime] = None, priority: Optional[str] = None):
+    """Build the ``INSERT ... RETURNING`` for one task."""
+    now = datetime.now(UTC)
+    return insert(Task).values(
+        title=title,
+        description=description,
+        due_date=due_date,
+        priority=priority,
+        completed=False,
+        created_at=now,
+        updated_at=now
+    ).returning(Task)
+
+def build_update(task_id: int, values: dict, if_updated_at: Optional[datetime] = None):
+    """Build the ``UPDATE ... RETURNING`` for one task.
+
+    Unknown keys are ignored; returns None when nothing is left to set. With
+    ``if_updated_at`` the row only matches if it has not been modified since.
+    """
+    values = {key: value for key, value in values.items() if key in UPDATABLE_COLUMNS}
+    if not values:
+        return None
+    conditions = [Task.id == task_id]
+    if if_updated_at is not None:
+        conditions.append(Task.updated_at == if_updated_at)
+    return (
+        update(Task)
+        .where(*conditions)
+        .values(**values)
+        .returning(Task)
+        .execution_options(populate_existing=True)
+    )
+
+def build_records_query(completed: Optional[bool] = None, columns=RECORD_COLUMNS,
+                        sort: Optional[SortKey] = None, descending: bool = False,
+                        include_archived: bool = False):
+    """Build the column-only query behind the read-only record listings.
+
+    With ``include_archived``, archived tasks are merged in, in id order
+    unless sorted.
+    """
+    if include_archived:
+        parts = [keyset_query(model, columns, completed=completed, sort=sort, descending=descending,
+                              merge_key=True)
+                 for model in (Task, ArchivedTask)]
+        return with_archived(parts, sort, descending, sort_value=False)
+    query = select(*columns)
+    if completed is not None:
+        query = query.where(Task.completed == completed)
+    if sort is not None or descending:
+        query = query.order_by(*order_keys(sort, descending))
+    return query
+
+def html_escape(column):
+    """SQL expression for ``column`` with HTML special characters escaped."""
+    for char, entity in HTML_ENTITIES:
+        column = func.replace(column, char, entity)
+    return column
+
+def build_search_query(text: str, completed: Optional[bool] = None, limit: int = SEARCH_LIMIT):
+    """Build the ranked full-text search over title and description.
+
+    ``text`` uses web-search syntax (quoted phrases, ``or``, ``-word``).
+    Matching goes through the GIN index on ``search_vector``; headlines are
+    only computed for the ``limit`` best hits. Headlines are built from the
+    HTML-escaped text, so they are safe to render as HTML.
+    """
+    tsquery = func.websearch_to_tsquery("english", text)
+    rank = func.ts_rank_cd(Task.search_vector, tsquery).label("rank")
+    hits = select(Task.id, rank).where(Task.search_vector.bool_op("@@")(tsquery))
+    if completed is not None:
+        hits = hits.where(Task.completed == completed)
+    hits = hits.order_by(rank.desc(), Task.id).limit(limit).subquery()
+    return (
+        select(*RECORD_COLUMNS, hits.c.rank,
+               func.ts_headline("english", html_escape(Task.title), tsquery, HEADLINE_OPTIONS),
+               func.ts_headline("english", html_escape(Task.description), tsquery, HEADLINE_OPTIONS))
+        .join(hits, hits.c.id == Task.id)
+        .order_by(hits.c.rank.desc(), Task.id)
+    )
+
+def build_stats_query(now: datetime):
+    """Build the single-pass aggregate behind ``get_stats``."""
+    pending = Task.completed.is_(False)
+    return select(
+        func.count().label("total"),
+        func.count().filter(Task.completed.is_(True)).label("completed"),
+        func.count().filter(pending).label("pending"),
+        func.count().filter(pending, Task.due_date < now).label("overdue"),
+        func.count().filter(pending, Task.due_date >= now,
+                            Task.due_date < now + timedelta(days=7)).label("due_this_week"),
+        *(func.count().filter(Task.priority == level.value).label(level.value) for level in PriorityLevel),
+        func.count().filter(Task.priority.is_(None)).label("none"),
+    )
+
+def stats_from_row(row) -> dict:
+    """Shape a ``build_stats_query`` row as the stats document."""
+    values = row._mapping
+    return {
+        "total": values["total"],
+        "completed": values["completed"],
+        "pending": values["pending"],
+        "overdue": values["overdue"],
+        "due_this_week": values["due_this_week"],
+        "by_priority": {key: values[key] for key in (*(level.value for level in PriorityLevel), "none")},
+    }
+
+def build_version_query(completed: Optional[bool] = None, include_archived: bool = False):
+    """Build the ``max(updated_at), count(*)`` aggregate for a task listing."""
+    if include_archived:
+        parts = [select(model.updated_at).where(*([model.completed == completed] if completed is not None else []))
+                 for model in (Task, ArchivedTask)]
+        rows = union_all(*parts).subquery()
+        return select(func.max(rows.c.updated_at), func.count())
+    query = select(func.max(Task.updated_at), func.count())
+    if completed is not None:
+        query = query.where(Task.completed == completed)
+    return query
+
+def build_archived_query(completed: Optional[bool] = None):
+    """Build the query for archived tasks, optionally filtered by status."""
+    query = select(ArchivedTask)
+    if completed is not None:
+        query = query.where(ArchivedTask.completed == completed)
+    return query.order_by(ArchivedTask.id)
+
+def build_archived_record_query(task_id: int):
+    """Build the record lookup of one archived task."""
+    return select(*(getattr(ArchivedTask, column.key) for column in RECORD_COLUMNS)).where(ArchivedTask.id == task_id)
+
+def restore_archived(archived: ArchivedTask) -> Task:
+    """Build a detached Task from an archived row."""
+    return Task(**{column: getattr(archived, column) for column in TASK_COLUMNS})
+
+def build_archive_batch(before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE):
+    """Build the statement that moves one batch of tasks into ``tasks_archive``.
+
+    Takes up to ``batch_size`` tasks completed and not updated since
+    ``before``, oldest first, and deletes and archives them in one
+    ``WITH moved AS (DELETE ... RETURNING) INSERT ... SELECT``. Rows locked
+    by a concurrent write are skipped rather than waited for; the next run
+    picks them up if they still qualify.
+    """
+    tasks, archive = Task.__table__, ArchivedTask.__table__
+    batch = (
+        select(tasks.c.id)
+        .where(tasks.c.completed == true(), tasks.c.updated_at < before)
+        .order_by(tasks.c.updated_at, tasks.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(tasks)
+        .where(tasks.c.id.in_(batch.scalar_subquery()))
+        .returning(*(tasks.c[column] for column in TASK_COLUMNS))
+        .cte("moved")
+    )
+    return (
+        insert(archive)
+        .from_select(TASK_COLUMNS, select(*(moved.c[column] for column in TASK_COLUMNS)))
+        .returning(archive.c.id)
+    )
+
+def build_delete(task_id: int):
+    """Build the ``DELETE ... RETURNING id`` for one task."""
+    return delete(Task).where(Task.id == task_id).returning(Task.id)
+
+def build_bulk_update(values: dict, **criteria):
+    """Build a single ``UPDATE ... RETURNING id`` for the selected tasks."""
+    values = {key: value for key, value in values.items() if key in UPDATABLE_COLUMNS}
+    if not values:
+        raise ValueError("No fields to update")
+    return (
+        update(Task)
+        .where(*build_task_filter(**criteria))
+        .values(**values)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+
+def build_bulk_delete(**criteria):
+    """Build a single ``DELETE ... RETURNING id`` for the selected tasks."""
+    return (
+        delete(Task)
+        .where(*build_task_filter(**criteria))
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
 
 class TaskRepository:
     """Repository for Task operations."""
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, cache: Optional[TaskCache] = None):
         self.db_session = db_session
+        self.cache = cache
+
+    def _invalidate(self, task_ids) -> None:
+        if self.cache is not None and task_ids:
+            self.cache.invalidate(task_ids)
+
+    def get_all_tasks(self, include_archived: bool = False) -> List[Task]:
+        """Get all tasks; archived tasks follow as detached Tasks when asked for."""
+        tasks = self.db_session.query(Task).all()
+        if include_archived:
+            tasks += map(restore_archived, self.db_session.scalars(build_archived_query()))
+        return tasks
+
+    def get_task_by_id(self, task_id: int, include_archived: bool = False) -> Optional[Task]:
+        """Get a task by ID, through the cache when one is configured.
+
+        With ``include_archived``, a task missing from ``tasks`` is looked up
+        in the archive (archived tasks are never cached).
+        """
+        if self.cache is not None:
+            values, since = self.cache.lookup(task_id)
+            if values is not None:
+                return restore(values)
+        task = self.db_session.query(Task).filter(Task.id == task_id).first()
+        if task is not None and self.cache is not None:
+            self.cache.set(task, since)
+        if task is None and include_archived:
+            archived = self.db_session.get(ArchivedTask, task_id)
+            task = restore_archived(archived) if archived is not None else None
+        return task
+
+    def get_task_version(self, task_id: int, include_archived: bool = False) -> Optional[datetime]:
+        """Get a task's ``updated_at`` without loading the row, or None if missing."""
+        if self.cache is not None:
+            task = self.cache.get(task_id)
+            if task is not None:
+                return task.updated_at
+        version = self.db_session.scalar(select(Task.updated_at).where(Task.id == task_id))
+        if version is None and include_archived:
+            version = self.db_session.scalar(select(ArchivedTask.updated_at).where(ArchivedTask.id == task_id))
+        return version
+
+    def get_tasks_version(self, completed: Optional[bool] = None,
+                          include_archived: bool = False) -> Tuple[Optional[datetime], int]:
+        """Get ``(max(updated_at), count)`` for a listing, to validate it cheaply."""
+        latest, count = self.db_session.execute(build_version_query(completed, include_archived)).one()
+        return latest, count
+
+    def get_stats(self) -> dict:
+        """Count tasks by status and priority, plus overdue and due-this-week.
+
+        Overdue and due-this-week (the next 7 days) only count pending tasks.
+        Memoized for a few seconds when a cache is configured.
+        """
+        if self.cache is not None:
+            stats, since = self.cache.lookup_stats()
+            if stats is not None:
+                return stats
+        stats = stats_from_row(self.db_session.execute(build_stats_query(datetime.now(UTC))).one())
+        if self.cache is not None:
+            self.cache.set_stats(stats, since)
+        return stats
+
+    def get_tasks_by_status(self, completed: bool, include_archived: bool = False) -> List[Task]:
+        """Get tasks by completion status; archived ones too when asked for."""
+        tasks = self.db_session.query(Task).filter(Task.completed == completed).all()
+        if include_archived:
+            tasks += map(restore_archived, self.db_session.scalars(build_archived_query(completed)))
+        return tasks
+
+    def get_task_records(self, completed: Optional[bool] = None,
+                         fields: Optional[Tuple[str, ...]] = None,
+                         sort: Optional[SortKey] = None, descending: bool = False,
+                         include_archived: bool = False) -> List[TaskRecord]:
+        """Get all tasks as read-only records, optionally filtered by status.
+
+        Skips the ORM identity map; use for responses that are only read.
+        ``fields`` (from ``select_fields``) limits the selected columns and
+        ``sort`` orders by an indexed sort key, then id. ``include_archived``
+        merges in the archived tasks.
+        """
+        record, columns = projection(fields)
+        query = build_records_query(completed, columns, sort, descending, include_archived)
+        return to_records(self.db_session.execute(query).tuples(), record)
 
-    def get_all_tasks(self) -> List[Task]:
-        """Get all tasks."""
-        return self.db_session.query(Task).all()
+    def get_task_record(self, task_id: int, include_archived: bool = False) -> Optional[TaskRecord]:
+        """Get one task as a read-only record, through the cache when configured.
 
-    def get_task_by_id(self, task_id: int) -> Optional[Task]:
-        """Get a task by ID."""
-        return self.db_session.query(Task).filter(Task.id == task_id).first()
+        With ``include_archived``, falls back to the archive (never cached).
+        """
+        if self.cache is not None:
+            values, since = self.cache.lookup(task_id)
+            if values is not None:
+                return TaskRecord(**values)
+        rows = self.db_session.execute(select(*RECORD_COLUMNS).where(Task.id == task_id)).tuples()
+        records = to_records(rows)
+        if records and self.cache is not None:
+            self.cache.set(records[0], since)
+        if not records and include_archived:
+            rows = self.db_session.execute(build_archived_record_query(task_id)).tuples()
+            records = to_records(rows)
+        return records[0] if records else None
 
-    def get_tasks_by_status(self, completed: bool) -> List[Task]:
-        """Get tasks by completion status."""
-        return self.db_session.query(Task).filter(Task.completed == completed).all()
+    def get_task_records_page(self, limit: int, cursor: Optional[str] = None,
+                              completed: Optional[bool] = None,
+                              fields: Optional[Tuple[str, ...]] = None,
+                              sort: Optional[SortKey] = None,
+                              descending: bool = False,
+                              include_archived: bool = False) -> Tuple[List[TaskRecord], Optional[str]]:
+        """Get one keyset page of read-only records and the next cursor."""
+        record, columns = projection(fields)
+        query = build_page_query(limit, cursor, completed, columns, sort, descending, include_archived)
+        rows, next_cursor = split_page(self.db_session.execute(query).all(), limit, sort, descending)
+        return to_records(rows, record), next_cursor
+
+    def search_tasks(self, text: str, completed: Optional[bool] = None,
+                     limit: int = SEARCH_LIMIT) -> List[TaskSearchRecord]:
+        """Full-text search over title and description, best matches first."""
+        rows = self.db_session.execute(build_search_query(text, completed, limit)).tuples()
+        return to_records(rows, TaskSearchRecord)
+
+    def get_tasks_page(self, limit: int, cursor: Optional[str] = None,
+                       completed: Optional[bool] = None) -> Tuple[List[Task], Optional[str]]:
+        """Get one keyset page of tasks and the cursor for the next page."""
+        rows = self.db_session.scalars(build_page_query(limit, cursor, completed)).all()
+        return split_page(list(rows), limit)
+
+    def stream_tasks(self, completed: Optional[bool] = None,
+                     batch_size: int = STREAM_BATCH_SIZE) -> Iterator[RowMapping]:
+        """Stream task rows from a server-side cursor, ``batch_size`` at a time.
+
+        Yields plain column mappings rather than Task instances so memory
+        stays flat regardless of table size.
+        """
+        result = self.db_session.execute(build_stream_query(completed).execution_options(yield_per=batch_size))
+        yield from result.mappings()
 
     def get_tasks_by_priority(self, priority: PriorityLevel) -> List[Task]:
         """Get tasks by priority."""
@@ -31,42 +429,83 @@ class TaskRepository:
     def create_task(self, title: str, description: Optional[str] = None,
                    due_date: Optional[datetime] = None,
                    priority: Optional[PriorityLevel] = None) -> Task:
-        """Create a new task."""
-        task = Task(
-            title=title,
-            description=description,
-            due_date=due_date,
-            priority=priority,
-            completed=False
-        )
-        self.db_session.add(task)
+        """Create a new task with a single INSERT ... RETURNING."""
+        task = self.db_session.scalars(build_create(title, description, due_date, priority)).one()
         self.db_session.commit()
-        self.db_session.refresh(task)
+        self._invalidate([task.id])
         return task
 
-    def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
-        """Update a task."""
-        task = self.get_task_by_id(task_id)
-        if not task:
-            return None
+    def create_tasks_bulk(self, tasks: List[dict],
+                          chunk_size: int = BULK_CHUNK_SIZE) -> List[Task]:
+        """Create many tasks in one transaction.
 
-        for key, value in kwargs.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
+        Each chunk of ``chunk_size`` tasks is written with a single multi-row
+        ``INSERT ... RETURNING``; nothing is committed unless every chunk
+        succeeds.
+        """
+        statement, rows = build_bulk_insert(tasks, chunk_size)
+        created = self.db_session.scalars(statement, rows).all()
+        self.db_session.commit()
+        self._invalidate([task.id for task in created])
+        return list(created)
+
+    def update_task(self, task_id: int, if_updated_at: Optional[datetime] = None,
+                    **kwargs) -> Optional[Task]:
+        """Update a task with a single UPDATE ... RETURNING.
 
+        Returns None if the task does not exist, or if ``if_updated_at`` is
+        given and the task was modified after it.
+        """
+        statement = build_update(task_id, kwargs, if_updated_at)
+        if statement is None:
+            task = self.get_task_by_id(task_id)
+            if task is not None and if_updated_at is not None and task.updated_at != if_updated_at:
+                return None
+            return task
+        task = self.db_session.scalars(statement).first()
         self.db_session.commit()
-        self.db_session.refresh(task)
+        if task is not None:
+            self._invalidate([task.id])
         return task
 
     def delete_task(self, task_id: int) -> bool:
-        """Delete a task."""
-        task = self.get_task_by_id(task_id)
-        if not task:
-            return False
+        """Delete a task with a single DELETE ... RETURNING."""
+        deleted_id = self.db_session.scalar(build_delete(task_id))
+        self.db_session.commit()
+        self._invalidate([task_id])
+        return deleted_id is not None
+
+    def update_tasks(self, values: dict, **criteria) -> List[int]:
+        """Update every task matching ``criteria`` in one statement.
+
+        ``criteria`` are the keyword arguments of ``build_task_filter``.
+        Returns the ids of the updated tasks.
+        """
+        ids = self.db_session.scalars(build_bulk_update(values, **criteria)).all()
+        self.db_session.commit()
+        self._invalidate(ids)
+        return list(ids)
+
+    def delete_tasks(self, **criteria) -> List[int]:
+        """Delete every task matching ``criteria`` in one statement.
+
+        Returns the ids of the deleted tasks.
+        """
+        ids = self.db_session.scalars(build_bulk_delete(**criteria)).all()
+        self.db_session.commit()
+        self._invalidate(ids)
+        return list(ids)
+
+    def archive_tasks(self, before: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> List[int]:
+        """Move one batch of tasks completed and untouched since ``before`` to the archive.
 
-        self.db_session.delete(task)
+        Commits, so row locks are only held for one batch. Returns the moved
+        ids; an empty list means nothing is left to archive.
+        """
+        ids = self.db_session.scalars(build_archive_batch(before, batch_size)).all()
         self.db_session.commit()
-        return True
+        self._invalidate(ids)
+        return list(ids)
 
     def mark_task_completed(self, task_id: int) -> Optional[Task]:
         """Mark a task as completed."""
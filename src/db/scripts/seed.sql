@@ -0,0 +1,11 @@
+-- Sample data for the Task Manager application.
+-- The schema is created by the Alembic migrations (./manage.sh db-migrate);
+-- load this afterwards with ./manage.sh db-seed.
+
+INSERT INTO tasks (title, description, due_date, priority, completed)
+VALUES 
+('Complete project proposal', 'Write up the initial project proposal document', CURRENT_TIMESTAMP + INTERVAL '3 days', 'High', FALSE),
+('Review code changes', 'Review pull requests from team members', CURRENT_TIMESTAMP + INTERVAL '1 day', 'Medium', FALSE),
+('Update documentation', 'Update the API documentation with recent changes', CURRENT_TIMESTAMP + INTERVAL '5 days', 'Low', FALSE),
+('Fix login bug', 'Address the issue with login timeout', CURRENT_TIMESTAMP + INTERVAL '2 days', 'High', FALSE),
+('Weekly team meeting', 'Prepare agenda for weekly team sync', CURRENT_TIMESTAMP + INTERVAL '4 days', 'Medium', TRUE);
@@ -0,0 +1,224 @@
+"""
+Slow-query log with EXPLAIN capture.
+
+``SlowQueryLog.install(engine)`` times every statement with the
+``before_cursor_execute`` / ``after_cursor_execute`` events. Statements
+slower than the threshold are:
+
+- aggregated in memory by normalized text (literals and placeholders
+  replaced by ``?``, IN lists collapsed) for ``top()``
+- written as one JSON record per line to a rotating log file
+
+Parameter values are never logged, only their types. For a sampled share
+of slow single-statement SELECTs, ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``
+is run on the same connection with the same parameters and the plan is
+added to the record. That executes the query a second time, so the
+sample rate should stay low. Only plain reads are explained (``is_read``):
+no INSERT/UPDATE/DELETE, including inside a ``WITH``. The EXPLAIN runs
+inside a savepoint that is always rolled back, so neither a failure nor a
+side effect of the second run reaches the caller's transaction.
+"""
+import json
+import logging
+import logging.handlers
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from enum import Enum
+from typing import Dict, List, Optional
+from sqlalchemy import event
+
+# Distinct normalized statements kept for top(); the least costly is evicted
+MAX_STATEMENTS = 500
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|%s")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_WRITE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+class SlowQueryOrder(str, Enum):
+    """What ``SlowQueryLog.top`` ranks statements by."""
+    TOTAL = "total_ms"
+    MAX = "max_ms"
+    MEAN = "mean_ms"
+    COUNT = "count"
+
+def normalize(statement: str) -> str:
+    """Statement text with values removed, for grouping."""
+    text = _STRING.sub("?", statement)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?, ...)", text)
+    return _SPACE.sub(" ", text).strip()
+
+def redact(parameters, executemany: bool = False):
+    """Parameter types in place of values."""
+    if executemany:
+        return {"executemany": len(parameters)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+def is_read(statement: str, context=None) -> bool:
+    """Whether ``statement`` is a plain SELECT, safe to run a second time.
+
+    A ``WITH`` query counts only if none of its parts writes: a
+    data-modifying CTE such as ``WITH moved AS (DELETE ...) INSERT ...`` is
+    a write.
+    """
+    if context is not None and (context.isinsert or context.isupdate or context.isdelete):
+        return False
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return False
+    return not _WRITE.search(_STRING.sub("?", statement))
+
+def plan_summary(plan: dict) -> dict:
+    """Headline numbers of an ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` plan."""
+    root = plan.get("Plan", {})
+    return {
+        "node": root.get("Node Type"),
+        "planning_ms": plan.get("Planning Time"),
+        "execution_ms": plan.get("Execution Time"),
+        "rows": root.get("Actual Rows"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks"),
+        "shared_read_blocks": root.get("Shared Read Blocks"),
+    }
+
+@dataclass
+class StatementStats:
+    """Aggregate of the slow executions of one normalized statement."""
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[str] = None
+    last_plan: Optional[dict] = field(default=None, repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": self.last_seen,
+            "last_plan": self.last_plan,
+        }
+
+class SlowQueryLog:
+    """Records statements slower than ``threshold_ms`` on the engines it is installed on."""
+
+    def __init__(self, threshold_ms: float, explain_rate: float = 0.0, log_path: Optional[str] = None,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+        self._logger = None
+        if log_path:
+            self._logger = logging.getLogger(f"taskmgr.slow_query.{id(self)}")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                                           backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def install(self, engine, label: str = "sync") -> None:
+        """Listen on ``engine`` (for an AsyncEngine, pass ``async_engine.sync_engine``)."""
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+            if elapsed >= self.threshold and not conn.info.get("slow_query_explaining"):
+                self._record(label, conn, cursor, statement, parameters, context, executemany, elapsed)
+
+        def failed(context):
+            # after_cursor_execute does not fire for a statement that raised
+            starts = context.connection.info.get("slow_query_start") if context.connection else None
+            if starts and context.cursor is not None:
+                starts.pop()
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+        event.listen(engine, "handle_error", failed)
+
+    def _record(self, label, conn, cursor, statement, parameters, context, executemany, elapsed) -> None:
+        duration_ms = elapsed * 1000
+        record = {
+            "ts": datetime.now(UTC).isoformat(),
+            "engine": label,
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "normalized": normalize(statement),
+            "parameters": redact(parameters, executemany),
+            "rowcount": getattr(cursor, "rowcount", None),
+        }
+        if self._should_explain(conn, statement, context, executemany):
+            record["plan"] = self._explain(conn, statement, parameters)
+        with self._lock:
+            stats = self._stats.get(record["normalized"])
+            if stats is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    cheapest = min(self._stats.values(), key=lambda item: item.total_ms)
+                    del self._stats[cheapest.statement]
+                stats = self._stats[record["normalized"]] = StatementStats(record["normalized"])
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.last_seen = record["ts"]
+            if isinstance(record.get("plan"), dict) and "error" not in record["plan"]:
+                stats.last_plan = plan_summary(record["plan"])
+        if self._logger is not None:
+            self._logger.info(json.dumps(record, default=str))
+
+    def _should_explain(self, conn, statement, context, executemany) -> bool:
+        if executemany or not self.explain_rate or random.random() >= self.explain_rate:
+            return False
+        # EXPLAIN ANALYZE executes the statement again: only plain reads, and
+        # only inside a transaction so the savepoint can undo any side effect
+        if not is_read(statement, context) or not conn.in_transaction():
+            return False
+        # A server-side cursor is still open on the connection while it streams
+        options = context.execution_options if context is not None else {}
+        return not (options.get("stream_results") or options.get("yield_per"))
+
+    def _explain(self, conn, statement, parameters) -> dict:
+        """Run EXPLAIN ANALYZE for ``statement`` inside a savepoint on the same connection.
+
+        The savepoint is always rolled back, so the second execution leaves
+        nothing behind.
+        """
+        conn.info["slow_query_explaining"] = True
+        explain = conn.connection.dbapi_connection.cursor()
+        try:
+            explain.execute("SAVEPOINT slow_query_explain")
+            try:
+                explain.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+                plan = explain.fetchone()[0]
+            except Exception as error:
+                return {"error": f"{type(error).__name__}: {error}"}
+            finally:
+                explain.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]
+        finally:
+            explain.close()
+            conn.info["slow_query_explaining"] = False
+
+    def top(self, limit: int = 10, order: SlowQueryOrder = SlowQueryOrder.TOTAL) -> List[dict]:
+        """The ``limit`` costliest normalized statements."""
+        with self._lock:
+            entries = [stats.as_dict() for stats in self._stats.values()]
+        return sorted(entries, key=lambda entry: entry[SlowQueryOrder(order).value], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
@@ -71,6 +71,31 @@ def test_get_tasks_by_status(task_repository):
     for task in pending_tasks:
         assert task.completed is False
 
+def test_get_tasks_page(task_repository):
+    """Test keyset pagination over all tasks."""
+    all_ids = sorted(task.id for task in task_repository.get_all_tasks())
+
+    seen_ids = []
+    cursor = None
+    while True:
+        page, cursor = task_repository.get_tasks_page(2, cursor)
+        assert len(page) <= 2
+        seen_ids.extend(task.id for task in page)
+        if cursor is None:
+            break
+
+    assert seen_ids == all_ids
+
+def test_get_tasks_page_invalid_cursor(task_repository):
+    """Test that a malformed cursor raises ValueError."""
+    with pytest.raises(ValueError):
+        task_repository.get_tasks_page(2, "garbage")
+
+def test_stream_tasks(task_repository):
+    """Test streaming task rows in small batches."""
+    streamed_ids = [row["id"] for row in task_repository.stream_tasks(batch_size=2)]
+    assert streamed_ids == sorted(task.id for task in task_repository.get_all_tasks())
+
 def test_create_task(task_repository):
     """Test creating a new task."""
     # Create a new task
@@ -95,6 +120,127 @@ def test_create_task(task_repository):
     assert task.priority == priority
     assert task.completed is False
 
+def test_task_records_match_orm_tasks(task_repository):
+    """Test that the record read path returns the same rows as the ORM path."""
+    tasks = task_repository.get_tasks_by_status(False)
+    records = task_repository.get_task_records(False)
+    assert [record.id for record in records] == [task.id for task in tasks]
+    assert records[0].title == tasks[0].title
+    assert records[0].updated_at == tasks[0].updated_at
+    assert not hasattr(records[0], "__dict__")  # slotted, no per-row dict
+
+    page, next_cursor = task_repository.get_task_records_page(2)
+    assert len(page) == 2 and next_cursor is not None
+    assert task_repository.get_task_record(page[0].id) == page[0]
+    assert task_repository.get_task_record(999999) is None
+
+def test_task_records_projection(task_repository):
+    """Test that projected records carry only the selected fields."""
+    from db.records import select_fields
+    fields = select_fields(["priority", "title"])
+    assert fields == ("id", "title", "priority")
+    records = task_repository.get_task_records(fields=fields)
+    assert records and not hasattr(records[0], "description")
+    assert type(records[0]) is type(task_repository.get_task_records_page(1, fields=fields)[0][0])
+    with pytest.raises(ValueError):
+        select_fields(["title", "nope"])
+
+@pytest.mark.parametrize("sort", ["due_date", "priority", "created_at"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_record_pages(task_repository, sort, descending):
+    """Test that sorted keyset pages walk the filtered set in sort order."""
+    from db.pagination import SortKey
+    undated = task_repository.create_task(title="Undated")  # no due date or priority
+    try:
+        rank = {None: 0, "Low": 1, "Medium": 2, "High": 3}
+        sort_value = {
+            "due_date": lambda task: task.due_date or datetime.max,
+            "priority": lambda task: rank[task.priority],
+            "created_at": lambda task: task.created_at,
+        }[sort]
+        expected = sorted(task_repository.get_task_records(completed=False),
+                          key=lambda task: (sort_value(task), task.id), reverse=descending)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = task_repository.get_task_records_page(
+                2, cursor, completed=False, sort=SortKey(sort), descending=descending)
+            seen.extend(task.id for task in page)
+            if cursor is None:
+                break
+        assert seen == [task.id for task in expected]
+        assert undated.id in seen
+        assert [task.id for task in task_repository.get_task_records(
+            completed=False, sort=SortKey(sort), descending=descending)] == seen
+    finally:
+        task_repository.delete_task(undated.id)
+
+def test_sorted_cursor_must_match_sort(task_repository):
+    """Test that a cursor cannot be replayed under a different ordering."""
+    from db.pagination import SortKey
+    _, cursor = task_repository.get_task_records_page(1, sort=SortKey.PRIORITY)
+    with pytest.raises(ValueError):
+        task_repository.get_task_records_page(1, cursor, sort=SortKey.DUE_DATE)
+    with pytest.raises(ValueError):
+        task_repository.get_task_records_page(1, cursor, sort=SortKey.PRIORITY, descending=True)
+
+def test_search_tasks(task_repository):
+    """Test full-text search over title and description."""
+    task = task_repository.create_task(title="Calibrate the spectrometer",
+                                       description="Use the reference samples")
+    try:
+        hits = task_repository.search_tasks("spectrometer calibration")
+        assert [hit.id for hit in hits] == [task.id]
+        assert hits[0].rank > 0
+        assert "<mark>spectrometer</mark>" in hits[0].title_highlight
+        assert task_repository.search_tasks("reference", completed=True) == []
+        assert task_repository.search_tasks("the") == []  # stop words only
+    finally:
+        task_repository.delete_task(task.id)
+
+def test_create_tasks_bulk(task_repository):
+    """Test creating several tasks in chunks."""
+    tasks = [{"title": f"Bulk Task {i}", "priority": "High"} for i in range(5)]
+
+    created = task_repository.create_tasks_bulk(tasks, chunk_size=2)
+
+    # Created tasks come back in input order with ids assigned
+    assert [task.title for task in created] == [task["title"] for task in tasks]
+    assert all(task.id is not None for task in created)
+    assert all(task.completed is False for task in created)
+    assert task_repository.get_task_by_id(created[0].id).title == "Bulk Task 0"
+
+def test_update_tasks_by_ids(task_repository):
+    """Test updating a list of tasks in one statement."""
+    created = task_repository.create_tasks_bulk([{"title": "Set Update 1"}, {"title": "Set Update 2"}])
+    ids = [task.id for task in created]
+
+    updated_ids = task_repository.update_tasks({"completed": True}, ids=ids)
+
+    assert sorted(updated_ids) == sorted(ids)
+    for task_id in ids:
+        task = task_repository.get_task_by_id(task_id)
+        task_repository.db_session.refresh(task)
+        assert task.completed is True
+        assert task.updated_at > task.created_at
+
+def test_delete_tasks_by_filter(task_repository):
+    """Test deleting tasks selected by a filter."""
+    due_date = datetime(2000, 1, 1)
+    task_id = task_repository.create_tasks_bulk([{"title": "Ancient Task", "due_date": due_date}])[0].id
+
+    deleted_ids = task_repository.delete_tasks(due_before=due_date + timedelta(seconds=1))
+
+    assert task_id in deleted_ids
+    assert task_repository.get_task_by_id(task_id) is None
+
+def test_bulk_operations_require_criteria(task_repository):
+    """Test that bulk statements refuse to touch the whole table."""
+    with pytest.raises(ValueError):
+        task_repository.update_tasks({"completed": True})
+    with pytest.raises(ValueError):
+        task_repository.delete_tasks()
+
 def test_update_task(task_repository):
     """Test updating a task."""
     # Create a new task
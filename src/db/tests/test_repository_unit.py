@@ -94,60 +94,59 @@ def test_get_tasks_by_status(task_repository, mock_db_session, sample_task):
     assert tasks[0].id == sample_task.id
     assert tasks[0].title == sample_task.title
 
-def test_create_task(task_repository, mock_db_session):
+def test_create_task(task_repository, mock_db_session, sample_task):
     """Test creating a task."""
-    # Configure the mock to simulate adding a task
-    mock_db_session.add = MagicMock()
-    mock_db_session.commit = MagicMock()
-    mock_db_session.refresh = MagicMock()
+    # Configure the mock to return the inserted row
+    mock_db_session.scalars.return_value.one.return_value = sample_task
     
     # Call the method
     task = task_repository.create_task(
-        title="New Task",
-        description="This is a new task",
-        priority="Medium"
+        title="Test Task",
+        description="This is a test task",
+        priority="High"
     )
     
-    # Assert that the session methods were called correctly
-    mock_db_session.add.assert_called_once()
+    # Assert that a single INSERT ... RETURNING was executed and committed
+    mock_db_session.scalars.assert_called_once()
+    statement = mock_db_session.scalars.call_args.args[0]
+    assert statement.is_insert
+    assert "RETURNING" in str(statement.compile())
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once()
+    mock_db_session.refresh.assert_not_called()
     
-    # Assert that the task was created with the correct values
-    assert task.title == "New Task"
-    assert task.description == "This is a new task"
-    assert task.priority == "Medium"
-    assert task.completed is False
+    # Assert that the returned row is passed through
+    assert task is sample_task
 
 def test_update_task(task_repository, mock_db_session, sample_task):
     """Test updating a task."""
-    # Configure the mock to return a task and simulate updating it
-    mock_db_session.commit = MagicMock()
-    mock_db_session.refresh = MagicMock()
-    
-    # Mock the get_task_by_id method to return the sample task
-    task_repository.get_task_by_id = MagicMock(return_value=sample_task)
+    # Configure the mock to return the updated row
+    mock_db_session.scalars.return_value.first.return_value = sample_task
     
     # Call the method
     updated_task = task_repository.update_task(
         1,
         title="Updated Task",
-        description="This task has been updated"
+        description="This task has been updated",
+        not_a_column="ignored"
     )
     
-    # Assert that the methods were called correctly
-    task_repository.get_task_by_id.assert_called_once_with(1)
+    # Assert that a single UPDATE ... RETURNING was executed and committed
+    mock_db_session.scalars.assert_called_once()
+    statement = mock_db_session.scalars.call_args.args[0]
+    assert statement.is_update
+    assert set(statement.compile().params) >= {"title", "description"}
+    assert "not_a_column" not in statement.compile().params
     mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once()
+    mock_db_session.query.assert_not_called()
+    mock_db_session.refresh.assert_not_called()
     
-    # Assert that the task was updated with the correct values
-    assert updated_task.title == "Updated Task"
-    assert updated_task.description == "This task has been updated"
+    # Assert that the returned row is passed through
+    assert updated_task is sample_task
 
 def test_update_nonexistent_task(task_repository, mock_db_session):
     """Test updating a non-existent task."""
-    # Configure the mock to return None for get_task_by_id
-    task_repository.get_task_by_id = MagicMock(return_value=None)
+    # Configure the mock so the UPDATE matches no row
+    mock_db_session.scalars.return_value.first.return_value = None
     
     # Call the method
     updated_task = task_repository.update_task(
@@ -155,43 +154,34 @@ def test_update_nonexistent_task(task_repository, mock_db_session):
         title="Updated Non-existent Task"
     )
     
-    # Assert that get_task_by_id was called correctly
-    task_repository.get_task_by_id.assert_called_once_with(999)
-    
     # Assert that the result is None
     assert updated_task is None
 
-def test_delete_task(task_repository, mock_db_session, sample_task):
+def test_delete_task(task_repository, mock_db_session):
     """Test deleting a task."""
-    # Configure the mock to return a task and simulate deleting it
-    mock_db_session.delete = MagicMock()
-    mock_db_session.commit = MagicMock()
-    
-    # Mock the get_task_by_id method to return the sample task
-    task_repository.get_task_by_id = MagicMock(return_value=sample_task)
+    # Configure the mock to return the deleted id
+    mock_db_session.scalar.return_value = 1
     
     # Call the method
     result = task_repository.delete_task(1)
     
-    # Assert that the methods were called correctly
-    task_repository.get_task_by_id.assert_called_once_with(1)
-    mock_db_session.delete.assert_called_once_with(sample_task)
+    # Assert that a single DELETE ... RETURNING was executed and committed
+    mock_db_session.scalar.assert_called_once()
+    assert mock_db_session.scalar.call_args.args[0].is_delete
     mock_db_session.commit.assert_called_once()
+    mock_db_session.query.assert_not_called()
     
     # Assert that the result is True
     assert result is True
 
 def test_delete_nonexistent_task(task_repository, mock_db_session):
     """Test deleting a non-existent task."""
-    # Configure the mock to return None for get_task_by_id
-    task_repository.get_task_by_id = MagicMock(return_value=None)
+    # Configure the mock so the DELETE matches no row
+    mock_db_session.scalar.return_value = None
     
     # Call the method
     result = task_repository.delete_task(999)
     
-    # Assert that get_task_by_id was called correctly
-    task_repository.get_task_by_id.assert_called_once_with(999)
-    
     # Assert that the result is False
     assert result is False
 
@@ -0,0 +1,72 @@
+"""
+Connection pool pre-warming for API startup.
+
+``prewarm(session_factory, connections)`` opens ``connections`` pooled
+connections at once and runs the hot ``AsyncTaskRepository`` statements
+on each of them, inside a transaction that is rolled back. That moves
+three first-request costs into startup:
+
+- opening the connection (TCP, auth, asyncpg setup)
+- SQLAlchemy compiling each statement (the engine's compiled cache is
+  shared by every connection, so the first connection fills it)
+- asyncpg preparing each statement (its statement cache is per
+  connection, so every warmed connection gets its own)
+
+Writes target an id that does not exist and are rolled back, so nothing
+changes; INSERTs are left out because they would consume sequence values.
+Statements that scan the whole table (the unpaginated listing, the
+listing version aggregate, stats) are left out too, since their cost grows
+with the table.
+
+Every connection is held until all are open, so ``connections`` must not
+exceed what the pool can hand out at once (see
+``DatabaseSettings.prewarm_connections``).
+"""
+import asyncio
+import time
+from typing import Callable, List
+from sqlalchemy import select
+
+from .models import Task
+from .pagination import DEFAULT_PAGE_SIZE, SortKey, build_page_query
+from .records import RECORD_COLUMNS
+from .repository import build_delete, build_search_query, build_update
+
+# Matches no task, so warm-up writes touch no rows
+WARMUP_TASK_ID = -1
+
+def warmup_statements() -> List:
+    """The statements behind the hot routes, in the shape the repository builds them."""
+    statements = [
+        select(*RECORD_COLUMNS).where(Task.id == WARMUP_TASK_ID),
+        select(Task.updated_at).where(Task.id == WARMUP_TASK_ID),
+        build_search_query("warmup"),
+        build_delete(WARMUP_TASK_ID),
+    ]
+    for completed in (None, False, True):
+        statements.append(build_page_query(DEFAULT_PAGE_SIZE, completed=completed, columns=RECORD_COLUMNS))
+    for sort in SortKey:
+        statements.append(build_page_query(DEFAULT_PAGE_SIZE, columns=RECORD_COLUMNS, sort=sort))
+    for values in ({"completed": True}, {"completed": False}, {"priority": "Low"}, {"title": "warmup"}):
+        statements.append(build_update(WARMUP_TASK_ID, values))
+    return statements
+
+async def prewarm(session_factory: Callable, connections: int) -> dict:
+    """Open ``connections`` connections together and warm each; returns timings in ms."""
+    started = time.perf_counter()
+    opened = asyncio.Barrier(connections)
+
+    async def warm_one() -> int:
+        async with session_factory() as session:
+            # Hold every connection until all are open, so the pool creates distinct ones
+            await session.connection()
+            await opened.wait()
+            statements = warmup_statements()
+            for statement in statements:
+                await session.execute(statement)
+            await session.rollback()
+            return len(statements)
+
+    counts = await asyncio.gather(*(warm_one() for _ in range(connections)))
+    return {"connections": connections, "statements": sum(counts),
+            "ms": round((time.perf_counter() - started) * 1000, 1)}
@@ -15,6 +15,13 @@ export interface Task {
   updated_at: string;
 }
 
+// Define the interface for a full-text search hit
+export interface TaskSearchResult extends Task {
+  rank: number;
+  title_highlight: string;
+  description_highlight: string | null;
+}
+
 // Define the interface for creating a new task
 export interface CreateTaskData {
   title: string;
@@ -47,6 +54,12 @@ export const getTasks = async (completed?: boolean): Promise<Task[]> => {
   return response.data;
 };
 
+export const searchTasks = async (q: string, completed?: boolean): Promise<TaskSearchResult[]> => {
+  const params = completed !== undefined ? { q, completed } : { q };
+  const response = await api.get('/tasks/search', { params });
+  return response.data;
+};
+
 export const getTaskById = async (id: number): Promise<Task> => {
   const response = await api.get(`/tasks/${id}`);
   return response.data;
@@ -78,6 +91,7 @@ export const markTaskPending = async (id: number): Promise<Task> => {
 
 export default {
   getTasks,
+  searchTasks,
   getTaskById,
   createTask,
   updateTask,